@@ -0,0 +1,150 @@
+"""
+Decisões das peças fora da thread principal
+
+Uma decisão cara (ex.: a busca do modo tático, ver tactics.py) não pode rodar
+dentro do update() do PGZero sem atrasar o quadro. Com o AIJobs a peça
+entrega um pedido (um retrato do estado, só números e textos) a um pool de
+threads ou de processos e segue com o comportamento que já tinha (girar
+parada, patrulhar...). A cada tick o World recolhe as respostas prontas e as
+aplica; uma resposta nunca é aplicada no mesmo tick do pedido.
+
+Cada pedido tem um prazo em ticks. Se a resposta não chegar até lá, o
+pedido é abandonado e a peça simplesmente continua com o comportamento
+atual; no próximo turno ela pede de novo.
+
+Threads ou processos:
+  - "thread": sem custo de cópia, mas a busca disputa o GIL com o jogo.
+    Enquanto houver pedidos em andamento, o intervalo de troca do GIL é
+    reduzido (SWITCH_INTERVAL) para que a thread principal nunca espere
+    muito por ele; sem pedidos, o intervalo volta ao que era;
+  - "process": a busca roda em paralelo de verdade; o pedido e a resposta
+    são copiados (pickle) entre os processos. Os processos são iniciados
+    com "spawn" (nunca um fork do jogo, que já tem a janela e threads
+    rodando) e só importam o tactics; o script principal é executado de
+    novo neles como __mp_main__, então ele não pode abrir a janela nem
+    montar o jogo nesse caso (ver main.py).
+
+Variáveis de ambiente (ver ai_jobs_from_env):
+    ROGUELIKE_AI_WORKERS   quantos workers (padrão: 0 = decide na thread principal)
+    ROGUELIKE_AI_POOL      "thread" (padrão) ou "process"
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Ticks até um pedido ser abandonado (meio segundo a 60 Hz)
+DEFAULT_DEADLINE_TICKS = 30
+# Intervalo de troca do GIL (segundos) com o pool de threads (o padrão do Python é 0.005)
+SWITCH_INTERVAL = 0.001
+POOL_KINDS = ("thread", "process")
+# Único módulo que os processos do pool precisam (as buscas vêm dele)
+WORKER_MODULE = "tactics"
+
+
+class Job:
+    """Pedido em andamento de uma peça"""
+    __slots__ = ("future", "posted", "deadline")
+
+    def __init__(self, future, posted, deadline):
+        self.future = future
+        self.posted = posted        # Tick em que o pedido foi feito
+        self.deadline = deadline    # Último tick em que a resposta ainda vale
+
+
+class AIJobs:
+    """Pool de workers com um pedido em andamento por peça"""
+    def __init__(self, workers=1, pool="thread", deadline_ticks=DEFAULT_DEADLINE_TICKS):
+        if pool not in POOL_KINDS:
+            raise ValueError(f"Pool '{pool}' desconhecido (use {' ou '.join(POOL_KINDS)}).")
+        self.workers = workers
+        self.pool = pool
+        self.deadline_ticks = deadline_ticks
+        self._switch_interval = None    # Intervalo do GIL anterior, enquanto houver pedidos
+        if pool == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai")
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=importlib.import_module,
+                                                initargs=(WORKER_MODULE,))
+        self.jobs = {}          # peça -> Job
+        # Estatísticas
+        self.posted = 0
+        self.completed = 0
+        self.expired = 0
+        self.failed = 0
+
+    def __contains__(self, key):
+        return key in self.jobs
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def post(self, key, tick, func, *args):
+        """
+        Pede func(*args) para 'key' (a peça) no tick 'tick'. Devolve False se
+        'key' já tiver um pedido em andamento.
+        """
+        if key in self.jobs:
+            return False
+        future = self.executor.submit(func, *args)
+        if not self.jobs and self.pool == "thread":
+            # Primeiro pedido em andamento: a thread principal passa a disputar o GIL
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, SWITCH_INTERVAL))
+        self.jobs[key] = Job(future, tick, tick + self.deadline_ticks)
+        self.posted += 1
+        return True
+
+    def _restore_switch_interval(self):
+        """Devolve o intervalo do GIL quando não há mais pedidos em andamento."""
+        if not self.jobs and self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+
+    def collect(self, tick):
+        """
+        Respostas prontas até o tick 'tick': lista de (peça, resultado), na
+        ordem dos pedidos. Pedidos vencidos são abandonados (a peça segue como estava).
+        """
+        if not self.jobs:
+            return []
+        ready = []
+        for key, job in list(self.jobs.items()):
+            future = job.future
+            if tick > job.deadline:
+                del self.jobs[key]
+                future.cancel()
+                self.expired += 1
+            elif job.posted < tick and future.done():
+                del self.jobs[key]
+                error = future.exception()
+                if error is not None:
+                    self.failed += 1
+                    print(f"Erro na decisão de {getattr(key, 'kind', key)}: {error!r}")
+                    continue
+                ready.append((key, future.result()))
+                self.completed += 1
+        self._restore_switch_interval()
+        return ready
+
+    def cancel_all(self):
+        """Abandona todos os pedidos (ex.: o herói mudou de sala)."""
+        for job in self.jobs.values():
+            job.future.cancel()
+        self.jobs.clear()
+        self._restore_switch_interval()
+
+    def close(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ai_jobs_from_env():
+    """AIJobs conforme ROGUELIKE_AI_WORKERS e ROGUELIKE_AI_POOL; None se os workers estiverem desligados."""
+    workers = int(os.environ.get("ROGUELIKE_AI_WORKERS", "0"))
+    if workers <= 0:
+        return None
+    return AIJobs(workers, os.environ.get("ROGUELIKE_AI_POOL", "thread"))
@@ -0,0 +1,100 @@
+"""
+Relógio central das animações das peças
+
+Cada peça tem uma Timeline: a sequência de imagens que ela quer mostrar, o
+tempo de cada imagem e quanto dessa sequência já passou. A lógica da peça
+só escolhe a sequência (play/stop); quem anda com o tempo e troca a imagem
+do Actor é o AnimationClock, e só para as peças que alguém pode ver.
+
+Uma peça fora da tela não custa nada: a Timeline dela guarda o instante da
+última sincronização e, quando a peça volta a ser vista, avança de uma vez
+todo o tempo que ficou para trás. O 'actor.image' só é atribuído quando o
+frame realmente muda (a atribuição recarrega a imagem e recalcula a âncora).
+"""
+
+# Folga para erros de arredondamento ao somar vários dt
+TIME_EPSILON = 1e-9
+
+
+class Timeline:
+    """Sequência de imagens de uma peça e o tempo já decorrido nela"""
+    __slots__ = ("frames", "frame_time", "loop", "elapsed", "playing", "shown", "synced")
+
+    def __init__(self, frames, frame_time, loop=True, shown=None):
+        self.frames = frames
+        self.frame_time = frame_time
+        self.loop = loop
+        self.elapsed = 0.0
+        self.playing = True
+        # Imagem atribuída ao Actor por último (evita atribuições repetidas)
+        self.shown = shown
+        # Instante do relógio na última sincronização (None = ainda não sincronizada)
+        self.synced = None
+
+    def play(self, frames, frame_time, loop=True, restart=False):
+        """
+        Passa a tocar 'frames'. Trocar só a sequência (ex.: a direção da
+        caminhada) mantém o tempo decorrido, como fazia o contador antigo;
+        'restart' recomeça do primeiro frame. Repetir a chamada com a mesma
+        sequência (a cada tick) não muda nada.
+        """
+        if restart:
+            self.elapsed = 0.0
+        elif frames is not self.frames and (frame_time != self.frame_time or not self.loop):
+            # Outro tipo de animação (ex.: de parado para andando, ou o fim de
+            # uma sequência sem repetição): a nova começa do primeiro frame
+            self.elapsed = 0.0
+        self.frames = frames
+        self.frame_time = frame_time
+        self.loop = loop
+        self.playing = True
+
+    def stop(self):
+        """Congela a sequência no frame atual."""
+        self.playing = False
+
+    @property
+    def index(self):
+        count = len(self.frames)
+        if count <= 1:
+            return 0
+        step = int((self.elapsed + TIME_EPSILON) / self.frame_time)
+        return step % count if self.loop else min(step, count - 1)
+
+    @property
+    def frame(self):
+        return self.frames[self.index] if self.frames else ""
+
+    @property
+    def finished(self):
+        """Indica se uma sequência sem repetição já chegou ao fim."""
+        return not self.loop and self.elapsed + TIME_EPSILON >= self.frame_time * len(self.frames)
+
+
+class AnimationClock:
+    """Tempo das animações e sincronização das Timelines com os Actors"""
+    def __init__(self):
+        self.time = 0.0
+
+    def advance(self, dt):
+        self.time += dt
+
+    def apply(self, pieces):
+        """
+        Sincroniza as peças dadas (as visíveis): avança cada Timeline pelo
+        tempo passado desde a última sincronização e troca a imagem do Actor
+        se o frame mudou. Devolve quantas imagens foram trocadas.
+        """
+        now = self.time
+        changed = 0
+        for piece in pieces:
+            timeline = piece.timeline
+            if timeline.synced is not None and timeline.playing:
+                timeline.elapsed += now - timeline.synced
+            timeline.synced = now
+            frame = timeline.frame
+            if frame != timeline.shown:
+                piece.actor.image = frame
+                timeline.shown = frame
+                changed += 1
+        return changed
@@ -0,0 +1,114 @@
+"""
+Índice das imagens do jogo
+
+Percorre a pasta images/ uma única vez (ou lê um manifesto pronto) e guarda,
+para cada subpasta, a lista ordenada dos arquivos .png que ela contém.
+Assim as peças e as lutas consultam o índice em memória em vez de listar
+as pastas do disco a cada instância criada.
+
+Para gerar o manifesto (útil nas máquinas de produção):
+
+    python asset_index.py
+
+Um manifesto mais antigo que alguma pasta de images/ (um arquivo ou uma
+subpasta foi criado, renomeado ou apagado depois dele) é ignorado: a pasta
+é varrida de novo e o manifesto, regravado.
+"""
+import json
+import os
+
+# Pasta base das imagens, a mesma usada pelo PGZero
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+# Manifesto opcional, gerado por este módulo. Se existir, dispensa a varredura.
+MANIFEST_FILE = os.path.join(IMAGES_DIR, "manifest.json")
+
+
+def manifest_is_current(folders, root, manifest_time):
+    """
+    Indica se nenhuma pasta do manifesto mudou depois dele ('manifest_time',
+    em ns). O índice só guarda nomes, e criar, renomear ou apagar um arquivo
+    ou uma subpasta muda a data da pasta que o contém; então basta um stat
+    por pasta, sem listar nada. Uma pasta que sumiu também invalida o manifesto.
+    """
+    for folder in folders:
+        try:
+            if os.stat(os.path.join(root, folder)).st_mtime_ns > manifest_time:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class AssetIndex:
+    """Mapa 'pasta relativa' -> arquivos .png (ordenados) e subpastas"""
+    def __init__(self, folders):
+        # Ex.: {"bishop": {"dirs": ["down", ...], "files": []}, "bishop/down": {...}}
+        self.folders = folders
+
+    @classmethod
+    def scan(cls, root=IMAGES_DIR):
+        """Percorre a árvore de imagens uma única vez."""
+        folders = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            if relative == ".":
+                relative = ""
+            folders[relative] = {
+                "dirs": list(dirnames),
+                "files": sorted(f for f in filenames if f.lower().endswith(".png")),
+            }
+        return cls(folders)
+
+    @classmethod
+    def load(cls, root=IMAGES_DIR, manifest=MANIFEST_FILE):
+        """Usa o manifesto se ele existir e estiver em dia; caso contrário, varre a pasta."""
+        if manifest and os.path.isfile(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                folders = json.load(f)["folders"]
+            if manifest_is_current(folders, root, os.stat(manifest).st_mtime_ns):
+                return cls(folders)
+            print(f"Manifesto {manifest} desatualizado: varrendo {root} de novo.")
+            index = cls.scan(root)
+            try:
+                index.save_manifest(manifest)
+            except OSError as error:
+                print(f"Não foi possível regravar o manifesto: {error}")
+            return index
+        return cls.scan(root)
+
+    def save_manifest(self, path=MANIFEST_FILE):
+        """
+        Grava o índice em disco para os próximos inícios do jogo. O arquivo é
+        gravado no lugar, sem temporário: trocar o arquivo mudaria a data da
+        pasta images/ para depois da do manifesto, e ele pareceria desatualizado.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"folders": self.folders}, f, indent=1, sort_keys=True)
+
+    def has_folder(self, folder):
+        return folder in self.folders
+
+    def subfolders(self, folder):
+        """Subpastas diretas de 'folder' (ex.: "bishop" -> ["down", "left", ...])."""
+        return self.folders.get(folder, {}).get("dirs", [])
+
+    def files(self, folder):
+        """Arquivos .png de 'folder', em ordem alfabética."""
+        return tuple(self.folders.get(folder, {}).get("files", ()))
+
+
+_index = None
+
+def get_index():
+    """Índice compartilhado, criado na primeira chamada."""
+    global _index
+    if _index is None:
+        _index = AssetIndex.load()
+    return _index
+
+
+if __name__ == "__main__":
+    index = AssetIndex.scan()
+    index.save_manifest()
+    print(f"Manifesto gravado em {MANIFEST_FILE} ({len(index.folders)} pastas).")
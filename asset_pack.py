@@ -0,0 +1,166 @@
+#!/usr/bin/python
+"""
+Pacote único com os pixels de todas as imagens do jogo
+
+Em vez de abrir e decodificar centenas de PNGs no início do jogo, o
+empacotador grava um único arquivo (images.pack) com os pixels de cada
+imagem já no formato da tela (o mesmo que convert_alpha() produz), mais um
+índice no cabeçalho. O jogo mapeia o arquivo na memória (mmap) e cria cada
+superfície direto sobre esses bytes (pygame.image.frombuffer), sem
+decodificar PNG nem copiar dados; o sistema só lê do disco as páginas que
+forem realmente usadas.
+
+Para gerar (de novo, sempre que as imagens mudarem):
+
+    python asset_pack.py
+
+Sem o pacote (ex.: durante o desenvolvimento) o jogo usa os PNGs soltos.
+
+Formato do arquivo:
+    MAGIC (8 bytes) | tamanho do cabeçalho (uint32, little-endian) |
+    cabeçalho JSON  | dados (cada imagem alinhada em 16 bytes)
+O cabeçalho guarda o formato dos pixels e, para cada imagem, o deslocamento
+(a partir do início dos dados), a largura e a altura.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import pygame
+
+from asset_index import IMAGES_DIR
+
+MAGIC = b"RGLPACK1"
+PACK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images.pack")
+# Pastas que não entram no pacote (os atlas são outra forma de guardar as mesmas imagens)
+SKIP_FOLDERS = {"atlases", "not_used_yet"}
+ALIGNMENT = 16
+# Ordem dos bytes que corresponde às máscaras da superfície (formato do pygame.image.tobytes)
+FORMATS = {
+    (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000): "BGRA",
+    (0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000): "RGBA",
+}
+
+# O mmap precisa viver enquanto as superfícies criadas sobre ele existirem
+_mapped = []
+
+
+def _display_format():
+    """Formato em que convert_alpha() deixa os pixels nesta máquina (ex.: "BGRA")."""
+    probe = pygame.Surface((1, 1), pygame.SRCALPHA, 32)
+    if pygame.display.get_surface() is not None:
+        probe = probe.convert_alpha()
+    return FORMATS.get(tuple(probe.get_masks()), "RGBA")
+
+
+def collect_images(root=IMAGES_DIR):
+    """Nomes (relativos a images/, como o Actor usa) de todos os PNGs a empacotar."""
+    names = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_FOLDERS)
+        relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        prefix = "" if relative == "." else relative + "/"
+        names.extend(prefix + f for f in sorted(filenames) if f.lower().endswith(".png"))
+    return names
+
+
+def build(root=IMAGES_DIR, path=PACK_FILE):
+    """Gera o pacote (precisa de uma tela aberta, ver main). Devolve o cabeçalho gravado."""
+    pixel_format = _display_format()
+    images = {}
+    chunks = []
+    offset = 0
+    seen = {}   # bytes -> deslocamento (imagens idênticas são gravadas uma vez)
+    for name in collect_images(root):
+        # convert_alpha aplica a colorkey das imagens com paleta, como o PGZero faz ao carregar
+        surface = pygame.image.load(os.path.join(root, name)).convert_alpha()
+        data = pygame.image.tobytes(surface, pixel_format)
+        width, height = surface.get_size()
+        if data in seen:
+            images[name] = [seen[data], width, height]
+            continue
+        padding = -offset % ALIGNMENT
+        if padding:
+            chunks.append(b"\0" * padding)
+            offset += padding
+        seen[data] = offset
+        images[name] = [offset, width, height]
+        chunks.append(data)
+        offset += len(data)
+
+    header = {"version": 1, "format": pixel_format, "images": images}
+    header_bytes = json.dumps(header, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    # Os dados começam alinhados também
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGNMENT)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for chunk in chunks:
+            f.write(chunk)
+    return header
+
+
+def read_header(mapped):
+    """Lê o cabeçalho de um pacote já mapeado. Devolve (cabeçalho, início dos dados)."""
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError("Arquivo não é um pacote de imagens (assinatura inválida).")
+    start = len(MAGIC) + 4
+    (header_size,) = struct.unpack_from("<I", mapped, len(MAGIC))
+    header = json.loads(bytes(mapped[start:start + header_size]))
+    return header, start + header_size
+
+
+def register_pack(path=PACK_FILE):
+    """
+    Mapeia o pacote e registra cada imagem no cache de imagens do PGZero
+    (com e sem a extensão .png). Devolve quantas imagens foram registradas;
+    0 se o pacote não existir.
+    """
+    from pgzero import loaders
+
+    if not os.path.isfile(path):
+        return 0
+    with open(path, "rb") as f:
+        # ACCESS_COPY: as páginas são privadas; escrever numa superfície não altera o arquivo
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header, data_start = read_header(mapped)
+    pixel_format = header["format"]
+    # Se a tela usa outro formato, a superfície é convertida (ainda sem decodificar PNG)
+    convert = pygame.display.get_surface() is not None and pixel_format != _display_format()
+
+    view = memoryview(mapped)
+    cache = loaders.images.cache
+    for name, (offset, width, height) in header["images"].items():
+        start = data_start + offset
+        surface = pygame.image.frombuffer(view[start:start + width * height * 4], (width, height), pixel_format)
+        if convert:
+            surface = surface.convert_alpha()
+        cache[(name, (), ())] = surface
+        base, ext = os.path.splitext(name)
+        if ext.lower() == ".png":
+            cache[(base, (), ())] = surface
+    _mapped.append(mapped)
+    return len(header["images"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Empacota as imagens do jogo num único arquivo de pixels prontos.")
+    parser.add_argument("--root", default=IMAGES_DIR, help="Pasta de imagens (padrão: images/ do jogo).")
+    parser.add_argument("--output", default=PACK_FILE, help="Arquivo de saída (padrão: images.pack).")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    # Uma tela é necessária para saber o formato de pixels que convert_alpha() usa
+    pygame.display.set_mode((1, 1))
+    header = build(args.root, args.output)
+    size = os.path.getsize(args.output)
+    print(f"{len(header['images'])} imagens ({header['format']}) em {args.output}: {size / 2 ** 20:.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/python
+"""
+Atlas de texturas das peças e das lutas
+
+As animações são centenas de PNGs pequenos (images/<kind>/<kind>_<dir>/ e
+images/fights/<luta>/). Carregar cada um abre um arquivo, decodifica um PNG
+e cria uma superfície. Este módulo junta os frames de cada peça e de cada
+luta em poucas folhas (atlas) e grava um índice com o retângulo de cada frame.
+
+Passo de build (rodar de novo sempre que os sprites mudarem):
+
+    python atlas.py
+
+No jogo, register_atlases() carrega as folhas e coloca cada frame, como uma
+subsurface da folha, no cache de imagens do PGZero com o mesmo nome que o
+Actor usa ("pawn/pawn_down/00_pawn_down.png"). Sem atlas (ou para imagens
+que não estão nele) o PGZero continua lendo os arquivos soltos.
+
+O início do jogo carrega só as folhas das peças (PIECE_KINDS); a folha de
+cada luta é carregada na primeira luta daquele tipo (ver fight_manager.py).
+"""
+import argparse
+import json
+import os
+
+import pygame
+
+from asset_index import IMAGES_DIR
+
+# Pasta (dentro de images/) com as folhas e o índice
+ATLAS_FOLDER = "atlases"
+ATLAS_INDEX = "atlases.json"
+# Tamanho máximo de uma folha; frames que não couberem vão para a próxima
+MAX_SHEET_SIZE = 2048
+# Espaço entre frames, para que a filtragem de uma escala não misture vizinhos
+PADDING = 1
+# Pastas que não entram no atlas
+SKIP_FOLDERS = {"not_used_yet", ATLAS_FOLDER}
+# Grupos: um atlas por tipo de peça e um por luta
+PIECE_KINDS = ("pawn", "rook", "queen", "knight", "bishop")
+FIGHTS_FOLDER = "fights"
+
+
+def collect_groups(root=IMAGES_DIR):
+    """
+    Lista os grupos de frames: {nome do grupo: [nome da imagem, ...]}.
+    O nome da imagem é o caminho relativo a images/, como o Actor usa.
+    """
+    groups = {}
+
+    def walk(folder):
+        names = []
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, folder)):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_FOLDERS)
+            relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            names.extend(f"{relative}/{f}" for f in sorted(filenames) if f.lower().endswith(".png"))
+        return names
+
+    for kind in PIECE_KINDS:
+        if os.path.isdir(os.path.join(root, kind)):
+            groups[kind] = walk(kind)
+    fights = os.path.join(root, FIGHTS_FOLDER)
+    if os.path.isdir(fights):
+        for fight in sorted(os.listdir(fights)):
+            if os.path.isdir(os.path.join(fights, fight)) and fight not in SKIP_FOLDERS:
+                groups[f"{FIGHTS_FOLDER}_{fight}"] = walk(f"{FIGHTS_FOLDER}/{fight}")
+    return {name: frames for name, frames in groups.items() if frames}
+
+
+def pack(sizes, max_size=MAX_SHEET_SIZE, padding=PADDING):
+    """
+    Empacotamento em prateleiras: ordena por altura e preenche linhas da
+    esquerda para a direita. 'sizes' é uma lista de (largura, altura).
+    Devolve (posições, folhas): posições[i] = (folha, x, y) e folhas é a lista
+    de (largura, altura) usada por cada folha.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    sheets = []
+    sheet = x = y = shelf = used_w = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > max_size or h > max_size:
+            raise ValueError(f"Frame de {w}x{h} não cabe numa folha de {max_size}x{max_size}")
+        if x + w > max_size:
+            # Próxima prateleira
+            x, y, shelf = 0, y + shelf + padding, 0
+        if y + h > max_size:
+            # Próxima folha
+            sheets.append((used_w, y))
+            sheet, x, y, shelf, used_w = sheet + 1, 0, 0, 0, 0
+        positions[i] = (sheet, x, y)
+        x += w + padding
+        shelf = max(shelf, h)
+        used_w = max(used_w, x - padding)
+    sheets.append((used_w, y + shelf))
+    return positions, sheets
+
+
+def build(root=IMAGES_DIR):
+    """Gera as folhas e o índice em images/atlases/. Devolve o índice."""
+    out_dir = os.path.join(root, ATLAS_FOLDER)
+    os.makedirs(out_dir, exist_ok=True)
+    index = {"version": 1, "sheets": {}}
+    for group, names in collect_groups(root).items():
+        images = [pygame.image.load(os.path.join(root, name)) for name in names]
+
+        # Frames idênticos (repetidos em várias sequências) ocupam um só lugar
+        unique, slot_of = [], {}
+        slots = []
+        for image in images:
+            key = (image.get_size(), pygame.image.tobytes(image, "RGBA"))
+            if key not in slot_of:
+                slot_of[key] = len(unique)
+                unique.append(image)
+            slots.append(slot_of[key])
+
+        positions, sheet_sizes = pack([image.get_size() for image in unique])
+        sheets = [pygame.Surface(size, pygame.SRCALPHA, 32) for size in sheet_sizes]
+        for image, (sheet, x, y) in zip(unique, positions):
+            sheets[sheet].blit(image, (x, y))
+
+        frames_by_sheet = [{} for _ in sheets]
+        for name, slot in zip(names, slots):
+            sheet, x, y = positions[slot]
+            w, h = unique[slot].get_size()
+            frames_by_sheet[sheet][name] = [x, y, w, h]
+
+        for number, (surface, frames) in enumerate(zip(sheets, frames_by_sheet)):
+            filename = f"{group}_{number}.png"
+            pygame.image.save(surface, os.path.join(out_dir, filename))
+            index["sheets"][filename] = {"group": group, "size": list(surface.get_size()), "frames": frames}
+        print(f"{group}: {len(names)} frames ({len(unique)} distintos) em {len(sheets)} folha(s)")
+
+    with open(os.path.join(out_dir, ATLAS_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    return index
+
+
+def fight_group(fight_folder):
+    """Nome do grupo do atlas de uma pasta de luta ("fights/pawn_vs_rook" -> "fights_pawn_vs_rook")."""
+    return fight_folder.replace("/", "_")
+
+
+_index_cache = {}
+
+def _load_index(root):
+    """Índice do atlas (lido uma vez por pasta); None se o atlas não foi gerado."""
+    if root not in _index_cache:
+        index_path = os.path.join(root, ATLAS_FOLDER, ATLAS_INDEX)
+        index = None
+        if os.path.isfile(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        _index_cache[root] = index
+    return _index_cache[root]
+
+
+def register_atlases(groups=None, root=IMAGES_DIR):
+    """
+    Carrega as folhas dos grupos pedidos (todas, se 'groups' for None) e
+    registra cada frame no cache de imagens do PGZero (com e sem a extensão
+    .png, os dois nomes usados pelas peças). Folhas já registradas são puladas.
+    Devolve quantos frames foram registrados; 0 se o atlas não foi gerado.
+    """
+    from pgzero import loaders
+
+    index = _load_index(root)
+    if index is None:
+        return 0
+
+    cache = loaders.images.cache
+    can_convert = pygame.display.get_surface() is not None
+    count = 0
+    for filename, sheet in index["sheets"].items():
+        if groups is not None and sheet.get("group") not in groups:
+            continue
+        frames = sheet["frames"]
+        if not frames or (next(iter(frames)), (), ()) in cache:
+            continue
+        surface = pygame.image.load(os.path.join(root, ATLAS_FOLDER, filename))
+        if can_convert:
+            surface = surface.convert_alpha()
+        for name, rect in frames.items():
+            frame = surface.subsurface(rect)
+            cache[(name, (), ())] = frame
+            base, ext = os.path.splitext(name)
+            if ext.lower() == ".png":
+                cache[(base, (), ())] = frame
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os atlas de textura das peças e das lutas.")
+    parser.add_argument("--root", default=IMAGES_DIR, help="Pasta de imagens (padrão: images/ do jogo).")
+    args = parser.parse_args()
+    index = build(args.root)
+    _index_cache.pop(args.root, None)
+    frames = sum(len(sheet["frames"]) for sheet in index["sheets"].values())
+    print(f"{frames} frames em {len(index['sheets'])} folha(s): "
+          f"{os.path.join(args.root, ATLAS_FOLDER, ATLAS_INDEX)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/python
+"""
+Benchmarks dos pontos quentes do jogo (geração, desenho e tick)
+
+Roda sem janela (ver headless.py) e grava os resultados em JSON.
+Exemplos:
+
+    python benchmarks.py --output bench_results.json
+    python benchmarks.py --compare bench_baseline.json --threshold 0.15
+    python benchmarks.py --filter draw
+
+No modo --compare, cada benchmark cuja mediana ficar mais lenta que a da
+linha de base (além da tolerância) é apontado como regressão e o programa
+termina com código 1.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from headless import init_headless
+
+
+class CountingScreen:
+    """Tela falsa: só conta os blits, sem desenhar nada."""
+    def __init__(self):
+        self.blits = 0
+
+    def blit(self, image, pos):
+        self.blits += 1
+
+
+def measure(func, repeat=5, number=1, setup=None):
+    """
+    Executa func() 'number' vezes em cada uma das 'repeat' rodadas e devolve
+    os tempos por chamada (segundos). 'setup', se houver, roda antes de cada
+    rodada e fica fora da medição.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+# Cada benchmark é um gerador de pares (nome, medir); medir() só roda se o
+# nome passar pelo --filter e devolve (tempos, dados extras).
+
+def bench_build_halls():
+    from map_manager import MapManager
+
+    for rows, cols in ((2, 2), (4, 4), (8, 8)):
+        yield f"map.build_halls[{rows}x{cols}]", lambda: (measure(
+            lambda: MapManager(grid_rows=rows, grid_cols=cols).build_halls(), repeat=5
+        ), {})
+
+
+def bench_generate_rooms():
+    from map_manager import MapManager
+
+    for size in (100, 500):
+        yield f"map.generate_rooms[{size}x{size}]", lambda: (measure(
+            lambda: MapManager(grid_rows=size, grid_cols=size, seed=1).generate_rooms(), repeat=3
+        ), {})
+
+
+def _sample_hall():
+    from hall_manager import Hall
+
+    return Hall(
+        width=20, height=11, floor_type="grass", wall_type="brick",
+        doors={"up": True, "down": True, "left": True, "right": False},
+        wall_ornaments=["baum_tile"],
+    )
+
+
+def bench_hall_generate():
+    hall = _sample_hall()
+    yield "hall.generate", lambda: (measure(hall.generate, repeat=5, number=20), {})
+    yield "hall._generate_wall_ornaments", lambda: (measure(
+        hall._generate_wall_ornaments, repeat=5, number=20, setup=lambda: setattr(hall, "ornaments", [])
+    ), {})
+
+
+def bench_hall_draw():
+    hall = _sample_hall()
+    hall.generate()
+    screen = CountingScreen()
+
+    def cold():
+        return measure(lambda: hall.draw(screen), repeat=5, setup=hall.invalidate_background), {}
+
+    def cached():
+        hall.draw(screen)
+        screen.blits = 0
+        timings = measure(lambda: hall.draw(screen), repeat=5, number=200)
+        return timings, {"blits_per_draw": screen.blits / (5 * 200)}
+
+    yield "hall.draw[cold]", cold
+    yield "hall.draw[cached]", cached
+
+
+def bench_sprite_loading():
+    from pgzero import loaders
+    from chess_pieces import load_piece_sprites, load_idle_sprites
+
+    def cold_cache():
+        load_piece_sprites.cache_clear()
+        load_idle_sprites.cache_clear()
+        loaders.images.cache.clear()
+
+    for kind in ("pawn", "rook", "knight", "bishop", "queen"):
+        def load(kind=kind):
+            for frames in load_piece_sprites(kind).values():
+                for frame in frames:
+                    loaders.images.load(frame)
+        yield f"sprites.load[{kind}]", lambda load=load: (measure(load, repeat=5, setup=cold_cache), {})
+
+
+def bench_atlas_loading():
+    from pgzero import loaders
+    from atlas import register_atlases, PIECE_KINDS
+
+    def run():
+        timings = measure(lambda: register_atlases(PIECE_KINDS), repeat=5, setup=loaders.images.cache.clear)
+        loaders.images.cache.clear()
+        return timings, {"frames": register_atlases(PIECE_KINDS)}
+
+    # Só mede se o atlas tiver sido gerado (python atlas.py)
+    loaders.images.cache.clear()
+    if register_atlases(PIECE_KINDS):
+        yield "sprites.register_atlases[pieces]", run
+
+
+def bench_world_tick():
+    from chess_pieces import PieceAndante
+    from patrol_batch import numpy_available
+    from world import World, Controls
+
+    def run(extra, batch):
+        random.seed(1234)
+        world = World(seed=1234, batch_patrols=batch)
+        for i in range(extra):
+            direction = "left" if i % 2 else "down"
+            world.add_piece(PieceAndante(64 + (i * 37) % 1100, 64 + (i * 53) % 560, "queen", direction))
+        controls = Controls(left=True)
+        return measure(lambda: world.tick(controls), repeat=5, number=100), {}
+
+    for extra in (0, 50, 200):
+        yield f"world.tick[{extra + 10} pieces]", lambda extra=extra: run(extra, False)
+        if numpy_available():
+            yield f"world.tick[{extra + 10} pieces, batch]", lambda extra=extra: run(extra, True)
+
+
+def bench_pack_loading():
+    from pgzero import loaders
+    from asset_pack import register_pack
+
+    # Só mede se o pacote tiver sido gerado (python asset_pack.py)
+    loaders.images.cache.clear()
+    images = register_pack()
+    if images:
+        yield "sprites.register_pack", lambda: (measure(
+            register_pack, repeat=5, setup=loaders.images.cache.clear
+        ), {"images": images})
+
+
+def bench_pathfinding():
+    from map_manager import MapManager
+
+    hall = MapManager(grid_rows=1, grid_cols=1, seed=1234).create_hall(0, 0)
+    navigation = hall.navigation()
+    start, goal = (96, 96), (hall.width * 64 - 96, hall.height * 64 - 96)
+
+    def cold_caches():
+        navigation._paths.clear()
+        navigation._flows.clear()
+
+    def cold(query):
+        # Cada chamada começa com os caches vazios (o custo de limpar é desprezível)
+        return measure(lambda: (cold_caches(), query()), repeat=5, number=50)
+
+    yield "path.astar[cold]", lambda: (cold(lambda: navigation.find_path(start, goal)), {})
+    yield "path.astar[cached]", lambda: (measure(lambda: navigation.find_path(start, goal), repeat=5, number=1000), {})
+    yield "path.flow_field[cold]", lambda: (cold(lambda: navigation.flow_field(goal)), {})
+    yield "path.flow_field[cached]", lambda: (measure(lambda: navigation.flow_field(goal), repeat=5, number=1000), {})
+
+
+def bench_room_graph():
+    from map_manager import MapManager
+    from room_graph import RoomGraph
+
+    map_manager = MapManager(grid_rows=100, grid_cols=100, seed=1234)
+    graph = RoomGraph(map_manager)
+    far = (99, 99)
+
+    def cold():
+        graph.invalidate()
+        return graph.next_hop(0, 0, *far)
+
+    yield "rooms.next_hop[100x100 cold]", lambda: (measure(cold, repeat=5, number=5),
+                                                   {"distance": graph.distance(0, 0, *far)})
+    yield "rooms.next_hop[100x100 cached]", lambda: (measure(lambda: graph.next_hop(0, 0, *far),
+                                                             repeat=5, number=1000), {})
+
+
+def bench_chess_moves():
+    from chess_moves import Board
+    from world import World, Controls
+
+    random.seed(1234)
+    world = World(grid_rows=4, grid_cols=4, seed=1234)
+    for _ in range(600):
+        world.tick(Controls(right=True))
+    room = world.current_room
+    pieces = [piece for piece in world.pieces if piece.active]
+
+    def all_attackers():
+        # O que um tick pediria: o tabuleiro da sala e "quem ataca" cada peça dela
+        board = Board.from_hall(room, enemies=pieces, friends=world.active_pieces)
+        for piece in pieces:
+            board.attackers(piece)
+        for piece in world.active_pieces:
+            board.attackers(piece)
+
+    yield "chess.attackers[room]", lambda: (measure(all_attackers, repeat=5, number=200),
+                                            {"pieces": len(pieces) + len(world.active_pieces)})
+
+
+def bench_tactics():
+    from chess_moves import move_tables
+    from tactics import TacticalSearch, Position
+
+    tables = move_tables(20, 11)
+    walls = 0
+    for x in range(tables.width):
+        walls |= 1 << x | 1 << ((tables.height - 1) * tables.width + x)
+    for y in range(tables.height):
+        walls |= 1 << (y * tables.width) | 1 << (y * tables.width + tables.width - 1)
+    square = lambda x, y: y * tables.width + x
+    position = Position(tables, walls,
+                        room=[(square(3, 3), "rook"), (square(10, 8), "pawn"), (square(6, 6), "knight")],
+                        hero=[(square(3, 7), "queen"), (square(12, 5), "knight"), (square(14, 5), "pawn")])
+    search = TacticalSearch(tables)
+
+    def run(budget):
+        timings = measure(lambda: search.choose(position, square(3, 3), budget=budget), repeat=5, number=5)
+        return timings, {"depth": search.depth, "nodes": search.nodes}
+
+    for budget in (0.004, 0.016):
+        yield f"tactics.choose[{budget * 1000:g}ms]", lambda budget=budget: run(budget)
+
+
+def bench_ai_jobs():
+    from ai_jobs import AIJobs
+    from chess_pieces import ThinkingPiece
+    from world import World, NO_INPUT
+
+    def run(jobs, ticks=240):
+        # Sala com 36 ThinkingPiece, no ritmo do jogo (60 ticks/s): mede o _think na thread principal
+        world = World(grid_rows=4, grid_cols=4, seed=1234, tactical=True, ai_jobs=jobs)
+        rng = random.Random(1234)
+        for _ in range(36):
+            world.add_piece(ThinkingPiece(rng.randrange(128, world.width - 128), rng.randrange(128, world.height - 128),
+                                          rng.choice(("pawn", "rook", "queen", "knight")), rng=world.rng))
+        think = world._think
+        timings = []
+
+        def timed():
+            start = time.perf_counter()
+            think()
+            timings.append(time.perf_counter() - start)
+
+        world._think = timed
+        for _ in range(ticks):
+            start = time.perf_counter()
+            world.tick(NO_INPUT)
+            time.sleep(max(0.0, 1 / 60 - (time.perf_counter() - start)))
+        if jobs is not None:
+            jobs.close()
+        ordered = sorted(timings)
+        extra = {"p99": ordered[int(len(ordered) * 0.99)], "max": ordered[-1]}
+        if jobs is not None:
+            extra.update(completed=jobs.completed, expired=jobs.expired)
+        return timings, extra
+
+    yield "ai.think[sync]", lambda: run(None)
+    yield "ai.think[thread]", lambda: run(AIJobs(1, "thread"))
+    yield "ai.think[process]", lambda: run(AIJobs(2, "process"))
+
+
+def bench_savegame():
+    import os
+    import tempfile
+    from savegame import take_snapshot, encode, save_world
+    from world import World, Controls
+
+    def run(rows, cols):
+        random.seed(1234)
+        world = World(grid_rows=rows, grid_cols=cols, seed=1234)
+        for _ in range(600):
+            world.tick(Controls(right=True))
+        path = os.path.join(tempfile.mkdtemp(), "savegame.dat")
+        timings = measure(lambda: save_world(world, path), repeat=5, number=20)
+        snapshot = measure(lambda: take_snapshot(world), repeat=5, number=20)
+        return timings, {"bytes": len(encode(take_snapshot(world))), "snapshot_median": statistics.median(snapshot)}
+
+    for rows, cols in ((4, 4), (100, 100)):
+        yield f"savegame.save[{rows}x{cols}]", lambda rows=rows, cols=cols: run(rows, cols)
+
+
+def bench_text_draw():
+    from pgzero import ptext
+    from text_cache import TextCache
+
+    text = "Ativo: pawn - TAB muda para outro - ESC para voltar"
+    screen = CountingScreen()
+
+    def uncached():
+        # O que o screen.draw.text fazia a cada quadro (com o cache do próprio ptext)
+        screen.blit(ptext.getsurf(text, fontsize=30, color="yellow"), (0, 0))
+
+    def run_cached():
+        cache = TextCache()
+        return measure(lambda: cache.draw(screen, text, fontsize=30, color="yellow", center=(400, 50)),
+                       repeat=5, number=1000), {"renders": cache.renders}
+
+    yield "text.draw[ptext]", lambda: (measure(uncached, repeat=5, number=1000), {})
+    yield "text.draw[cached]", run_cached
+
+
+BENCHMARKS = (
+    bench_build_halls,
+    bench_generate_rooms,
+    bench_hall_generate,
+    bench_hall_draw,
+    bench_sprite_loading,
+    bench_atlas_loading,
+    bench_pack_loading,
+    bench_world_tick,
+    bench_pathfinding,
+    bench_room_graph,
+    bench_chess_moves,
+    bench_tactics,
+    bench_ai_jobs,
+    bench_savegame,
+    bench_text_draw,
+)
+
+
+def run_benchmarks(name_filter=""):
+    results = {}
+    for bench in BENCHMARKS:
+        for name, run in bench():
+            if name_filter and name_filter not in name:
+                continue
+            timings, extra = run()
+            results[name] = {
+                "median": statistics.median(timings),
+                "min": min(timings),
+                "runs": len(timings),
+                **extra,
+            }
+            print(f"{name:40s} mediana {results[name]['median'] * 1e3:10.4f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Lista (nome, atual, base) dos benchmarks mais lentos que a base além da tolerância."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["median"] > base["median"] * (1 + threshold):
+            regressions.append((name, result["median"], base["median"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de geração, desenho e tick do jogo.")
+    parser.add_argument("--output", default="bench_results.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON de uma execução anterior para comparação.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Tolerância relativa antes de apontar regressão (padrão: 0.10 = 10%%).")
+    parser.add_argument("--filter", default="", help="Roda só os benchmarks cujo nome contém este texto.")
+    args = parser.parse_args()
+
+    init_headless()
+    results = run_benchmarks(args.filter)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, current, base in regressions:
+            print(f"REGRESSÃO {name}: {current * 1e3:.4f} ms (base {base * 1e3:.4f} ms, "
+                  f"+{(current / base - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print("Nenhuma regressão em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
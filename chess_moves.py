@@ -0,0 +1,214 @@
+"""
+Lances das peças de xadrez em bitboards
+
+Uma sala de 20x11 tiles cabe num único int do Python como um tabuleiro de
+220 bits: o tile (tx, ty) é o bit ty * largura + tx. Conjuntos de tiles
+(muros, peças de um tipo, casas atacadas) viram um int, e "quais destes
+tiles estão atacados" é um '&'.
+
+As tabelas de cada tamanho de tabuleiro (MoveTables) são calculadas uma vez:
+  - saltos do cavalo e casas vizinhas (diagonais e ortogonais) de cada tile;
+  - raios nas 8 direções a partir de cada tile, até a borda.
+Nas peças que deslizam (torre, bispo, dama) o raio é cortado no primeiro
+bloqueio (muro ou peça): o bloqueio mais perto é o bit mais baixo do raio
+nas direções em que o índice cresce, e o mais alto nas outras. Muros
+bloqueiam e nunca são atacados; peças bloqueiam e são atacadas (captura).
+
+As peças do jogo não têm cor nem frente, então o peão ataca as 4 diagonais
+vizinhas e anda um tile nas 4 direções ortogonais.
+
+Os ataques de cada tipo são simétricos (se A ataca B, uma peça do mesmo
+tipo em B atacaria A), então "quem ataca este tile" é calculado a partir do
+próprio tile: um conjunto de ataques por tipo, cruzado com as peças daquele
+tipo (Board.attackers).
+"""
+from pathfinding import TILE
+
+KINDS = ("pawn", "rook", "knight", "bishop", "queen")
+ORTHOGONAL = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAGONAL = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+KNIGHT_JUMPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+# Tabelas já calculadas, por (largura, altura)
+_tables = {}
+
+
+def iter_bits(mask):
+    """Índices dos bits ligados de 'mask', do mais baixo ao mais alto."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class MoveTables:
+    """Saltos e raios pré-calculados de um tabuleiro largura x altura"""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.knight = [self._jumps(square, KNIGHT_JUMPS) for square in range(self.size)]
+        self.diagonal_steps = [self._jumps(square, DIAGONAL) for square in range(self.size)]
+        self.orthogonal_steps = [self._jumps(square, ORTHOGONAL) for square in range(self.size)]
+        # (raios de cada tile, o índice cresce nesta direção?) para cada direção
+        self.orthogonal_rays = [(self._rays(d), self._ascending(d)) for d in ORTHOGONAL]
+        self.diagonal_rays = [(self._rays(d), self._ascending(d)) for d in DIAGONAL]
+
+    def _jumps(self, square, offsets):
+        y, x = divmod(square, self.width)
+        mask = 0
+        for dx, dy in offsets:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                mask |= 1 << (ny * self.width + nx)
+        return mask
+
+    def _rays(self, direction):
+        dx, dy = direction
+        rays = []
+        for square in range(self.size):
+            y, x = divmod(square, self.width)
+            mask = 0
+            x, y = x + dx, y + dy
+            while 0 <= x < self.width and 0 <= y < self.height:
+                mask |= 1 << (y * self.width + x)
+                x, y = x + dx, y + dy
+            rays.append(mask)
+        return rays
+
+    @staticmethod
+    def _ascending(direction):
+        dx, dy = direction
+        return dy > 0 or (dy == 0 and dx > 0)
+
+    def square(self, x, y):
+        """Tile (índice do bit) que contém o ponto (x, y) em pixels; None fora do tabuleiro."""
+        tx, ty = int(x // TILE), int(y // TILE)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return ty * self.width + tx
+        return None
+
+    def center(self, square):
+        """Centro, em pixels, do tile 'square'."""
+        ty, tx = divmod(square, self.width)
+        return (tx * TILE + TILE // 2, ty * TILE + TILE // 2)
+
+    def slide(self, square, rays, occupied):
+        """Casas alcançadas a partir de 'square' ao longo dos raios, até o primeiro bloqueio (incluído)."""
+        attacks = 0
+        for table, ascending in rays:
+            ray = table[square]
+            blockers = ray & occupied
+            if blockers:
+                first = (blockers & -blockers).bit_length() - 1 if ascending else blockers.bit_length() - 1
+                ray ^= table[first]     # Tira o que está além do bloqueio
+            attacks |= ray
+        return attacks
+
+    def attacks(self, kind, square, occupied, walls=0):
+        """
+        Casas que uma peça 'kind' em 'square' ataca. 'occupied' são os
+        bloqueios (muros e peças); os muros ('walls') nunca são atacados.
+        """
+        if kind == "knight":
+            attacks = self.knight[square]
+        elif kind == "pawn":
+            attacks = self.diagonal_steps[square]
+        elif kind == "rook":
+            attacks = self.slide(square, self.orthogonal_rays, occupied)
+        elif kind == "bishop":
+            attacks = self.slide(square, self.diagonal_rays, occupied)
+        elif kind == "queen":
+            attacks = (self.slide(square, self.orthogonal_rays, occupied)
+                       | self.slide(square, self.diagonal_rays, occupied))
+        else:
+            return 0
+        return attacks & ~walls
+
+    def reach(self, kind, square, occupied):
+        """Casas livres para onde uma peça 'kind' em 'square' pode ir (o peão anda na ortogonal)."""
+        if kind == "pawn":
+            return self.orthogonal_steps[square] & ~occupied
+        return self.attacks(kind, square, occupied) & ~occupied
+
+
+def move_tables(width, height):
+    """MoveTables do tabuleiro largura x altura (calculadas na primeira vez)."""
+    tables = _tables.get((width, height))
+    if tables is None:
+        tables = _tables[(width, height)] = MoveTables(width, height)
+    return tables
+
+
+class Board:
+    """
+    Posição das peças de uma sala num instante. 'enemies' são as peças da
+    sala; 'friends', as do jogador. Cada peça ocupa o tile do centro do sprite.
+    """
+    def __init__(self, tables, walls, enemies=(), friends=()):
+        self.tables = tables
+        self.walls = walls
+        self.by_kind = dict.fromkeys(KINDS, 0)  # Tiles ocupados pelas peças da sala, por tipo
+        self.friends = 0                        # Tiles ocupados pelas peças do jogador
+        self.pieces_at = {}                     # tile -> peças da sala naquele tile
+        square_of = tables.square
+        by_kind, pieces_at = self.by_kind, self.pieces_at
+        for piece in enemies:
+            square = square_of(*piece.actor.pos)
+            if square is None or piece.kind not in by_kind:
+                continue
+            by_kind[piece.kind] |= 1 << square
+            pieces_at.setdefault(square, []).append(piece)
+        for piece in friends:
+            square = square_of(*piece.actor.pos)
+            if square is not None:
+                self.friends |= 1 << square
+        self.enemies = 0
+        for mask in by_kind.values():
+            self.enemies |= mask
+        self.occupied = walls | self.enemies | self.friends
+
+    @classmethod
+    def from_hall(cls, hall, enemies=(), friends=()):
+        navigation = hall.navigation()
+        return cls(move_tables(navigation.width, navigation.height), navigation.wall_mask(), enemies, friends)
+
+    def square(self, piece):
+        return self.tables.square(*piece.actor.pos)
+
+    def attacks(self, piece):
+        """Tiles que a peça ataca na posição atual (0 se estiver fora da sala)."""
+        square = self.square(piece)
+        if square is None:
+            return 0
+        return self.tables.attacks(piece.kind, square, self.occupied, self.walls)
+
+    def reach(self, piece):
+        """Tiles livres para onde a peça pode ir."""
+        square = self.square(piece)
+        if square is None:
+            return 0
+        return self.tables.reach(piece.kind, square, self.occupied)
+
+    def attackers_mask(self, square):
+        """Tiles das peças da sala que atacam 'square'."""
+        tables, occupied, walls = self.tables, self.occupied, self.walls
+        found = 0
+        for kind, mask in self.by_kind.items():
+            if mask:
+                found |= mask & tables.attacks(kind, square, occupied, walls)
+        return found
+
+    def attackers(self, piece):
+        """Peças da sala que atacam o tile da peça dada."""
+        square = self.square(piece)
+        if square is None:
+            return []
+        tables, occupied, walls, pieces_at = self.tables, self.occupied, self.walls, self.pieces_at
+        found = []
+        for kind, mask in self.by_kind.items():
+            if not mask:
+                continue
+            for bit in iter_bits(mask & tables.attacks(kind, square, occupied, walls)):
+                found.extend(enemy for enemy in pieces_at[bit] if enemy.kind == kind and enemy is not piece)
+        return found
@@ -1,50 +1,94 @@
 """Implementa peças de xadrez que se movimentam"""
+import math
 import random
 from pgzero.actor import Actor
 from pgzero.keyboard import keyboard
 from game_entities import Player
 import config
 
-import os
+from functools import lru_cache
+from types import MappingProxyType
+from asset_index import get_index
+from animation import Timeline, TIME_EPSILON
+
+DIRECTIONS = ("down", "left", "right", "up")
+
+# Limites (em pixels) do vai e vem em cada eixo das peças que patrulham; dentro de uma
+# sala o World troca pelos limites dos muros dela (ver pathfinding.NavGrid.patrol_limits).
+# Só leitura: é compartilhado por todas as peças até a troca
+DEFAULT_PATROL_LIMITS = MappingProxyType({"horizontal": (0, 800), "vertical": (0, 600)})
+
+# Os tempos de animação vieram de contadores de frames pensados para 60 frames
+# por segundo; agora são medidos em segundos, então a velocidade do jogo não
+# depende da frequência com que update() é chamada.
+FRAME_TIME = 1 / 60
+WALK_FRAME_TIME = 10 * FRAME_TIME   # troca de sprite ao andar (antes: a cada 10 frames)
+IDLE_FRAME_TIME = 20 * FRAME_TIME   # troca de sprite parado (antes: a cada 20 frames)
+TURN_FRAME_TIME = FRAME_TIME        # cada frame da rotação das ThinkingPiece
+TURN_TIMER_RATE = 6.0               # quanto o turn_timer desce por segundo (antes: 0.1 por frame)
 
 def load_direction_sprites(kind, direction):
     """
     Procura uma subpasta em 'images/<kind>' cujo nome contenha o 'direction'
-    (ex.: "left", "right", "up" ou "down") e carrega todos os arquivos .png
+    (ex.: "left", "right", "up" ou "down") e retorna todos os arquivos .png
     dessa pasta, ordenados alfabeticamente.
-    Retorna uma lista de caminhos relativos (ex.: "bishop/bishop_left/00.png").
+    Retorna uma tupla de caminhos relativos (ex.: "bishop/bishop_left/00.png").
+    A consulta é feita no índice de imagens em memória (ver asset_index.py).
     """
-    # Define o caminho base para a pasta de sprites da peça
-    base_dir = os.path.join("images", kind)
-    
-    if not os.path.exists(base_dir):
-        print(f"A pasta base {base_dir} não existe!")
-        return []
-    
-    # Lista todas as subpastas que contenham a string direction (ignorando maiúsculas/minúsculas)
-    subdirs = [
-        d for d in os.listdir(base_dir)
-        if os.path.isdir(os.path.join(base_dir, d)) and (direction.lower() in d.lower())
-    ]
-    print(subdirs)
-    
+    index = get_index()
+    if not index.has_folder(kind):
+        print(f"A pasta base images/{kind} não existe!")
+        return ()
+
+    # Subpastas que contenham a string direction (ignorando maiúsculas/minúsculas)
+    subdirs = [d for d in index.subfolders(kind) if direction.lower() in d.lower()]
     if not subdirs:
         print(f"Nenhuma subpasta encontrada para a direção '{direction}' em '{kind}'.")
-        return []
-    
+        return ()
+
     # Escolhe a primeira subpasta encontrada (ou pode ser feita uma seleção mais sofisticada)
     chosen_subdir = subdirs[0]
-    sprites_folder = os.path.join(base_dir, chosen_subdir)
-    print(sprites_folder)
-    
-    # Lista todos os arquivos .png em sprites_folder e ordena-os alfabeticamente
-    files = sorted([f for f in os.listdir(sprites_folder) if f.lower().endswith(".png")])
-    print(files)
-    
-    # Monta os caminhos relativos (por exemplo, "bishop/bishop_left/00.png")
-    sprite_paths = [os.path.join(kind, chosen_subdir, f) for f in files]
-    print(sprite_paths)
-    return sprite_paths
+    return tuple(f"{kind}/{chosen_subdir}/{f}" for f in index.files(f"{kind}/{chosen_subdir}"))
+
+
+@lru_cache(maxsize=None)
+def load_piece_sprites(kind):
+    """
+    Tabela de sprites por direção, compartilhada por todas as peças do mesmo 'kind'.
+    É somente leitura: nenhuma peça deve alterá-la.
+    """
+    sprites = {}
+    for d in DIRECTIONS:
+        sprites[d] = load_direction_sprites(kind, d)
+        if not sprites[d]:
+            print(f"Atenção: Nenhum sprite encontrado para a direção '{d}' de '{kind}'.")
+    return MappingProxyType(sprites)
+
+
+@lru_cache(maxsize=None)
+def load_idle_sprites(kind):
+    """Sequência idle (os 2 últimos frames de cada direção), compartilhada por 'kind'."""
+    sprites = load_piece_sprites(kind)
+    return MappingProxyType({d: sprites[d][-2:] for d in DIRECTIONS})
+
+
+def fold_patrol(coord, forward, low, high, distance):
+    """
+    Posição e sentido de uma peça que patrulha entre 'low' e 'high' depois de
+    andar 'distance' pixels, calculados de uma vez (o vai e vem "desdobrado"
+    é uma reta de período 2 * (high - low)). Usado para atualizar salas que
+    ficaram sem ser simuladas.
+    """
+    span = high - low
+    if span <= 0:
+        return coord, forward
+    coord = min(max(coord, low), high)
+    period = 2 * span
+    unfolded = coord - low if forward else period - (coord - low)
+    unfolded = (unfolded + distance) % period
+    if unfolded <= span:
+        return low + unfolded, True
+    return low + period - unfolded, False
 
 
 class Piece(Player):
@@ -54,187 +98,268 @@ class Piece(Player):
         self.y = y
         self.kind = kind
         self.current_direction = initial_direction
-        self.current_frame = 0
         self.moving = False
         self.active = True
 
-        # 'kind' determina a pasta em images e usamos a função auxiliar para cada direção.
-        self.sprites = {}
-        for d in ["down", "left", "right", "up"]:
-            self.sprites[d] = load_direction_sprites(kind, d)
-            if not self.sprites[d]:
-                print(f"Atenção: Nenhum sprite encontrado para a direção '{d}' de '{kind}'.")
-        
+        # 'kind' determina a pasta em images; a tabela de frames é a mesma para todas as peças do tipo.
+        self.sprites = load_piece_sprites(kind)
+
         # Define o sprite inicial; caso não haja sprites para a direção inicial, define como uma string vazia.
         initial_sprite = self.sprites[initial_direction][0] if self.sprites.get(initial_direction) else ""
         self.actor = Actor(initial_sprite, center=(x, y))
 
-        self.actor = Actor(self.sprites[initial_direction][0], center=(x, y))
-
         # Configura uma sequência idle mais dinâmica – use os 2 últimos frames (por exemplo)
-        self.idle_sprites = {
-            d: self.sprites[d][-2:] for d in ["down", "left", "right", "up"]
-        }
-        # Contador e índice para a animação ociosa
-        self.idle_counter = 0
-        self.idle_frame_index = 0
-
-    def draw(self):
+        self.idle_sprites = load_idle_sprites(kind)
+        # Sequência de imagens em exibição; quem troca o actor.image é o AnimationClock (animation.py)
+        self.timeline = Timeline((initial_sprite,), WALK_FRAME_TIME, shown=initial_sprite)
+        # Posição no tick anterior, usada para interpolar o desenho entre dois ticks
+        self.prev_pos = None
+
+    def draw(self, alpha=1.0, offset=(0, 0)):
         """
         Desenha a peça no tabuleiro.
             
         Deve ser chamada em draw() do main.py
         Na prática é chamada constantemente para redesenhar a peça
 
+        'alpha' (0 a 1) indica quanto do tick atual já passou: a peça é desenhada
+        entre a posição do tick anterior (prev_pos) e a atual.
+        'offset' desloca o desenho (ex.: a sala deslizando durante a transição).
         """
-        if self.active:
+        if not self.active:
+            return
+        interpolate = alpha < 1.0 and self.prev_pos is not None
+        if not interpolate and offset == (0, 0):
             self.actor.draw()
+            return
+        actor = self.actor
+        current = actor.pos
+        x, y = current
+        if interpolate:
+            px, py = self.prev_pos
+            x, y = px + (x - px) * alpha, py + (y - py) * alpha
+        actor.pos = (x + offset[0], y + offset[1])
+        actor.draw()
+        actor.pos = current
+
+    def update_position(self, speed, dt=FRAME_TIME):
+        """
+        Método base, implementado pelas subclasses.
+        'speed' é a distância (em pixels) a percorrer neste tick; 'dt' é a duração do tick.
+        """
+        pass
 
-    def update_position(self, speed):
-        """Método base, implementado pelas subclasses."""
+    def catch_up(self, elapsed, speed):
+        """
+        Atualização grosseira de uma sala que ficou 'elapsed' segundos sem ser
+        simulada ('speed' em pixels por segundo). A peça base só fica parada.
+        """
         pass
 
+    def footprint(self):
+        """
+        Área da peça no chão (x, y, largura, altura): a metade de baixo do sprite,
+        um pouco mais estreita. É o que conta para esbarrar em outras peças;
+        o resto do sprite é "altura" e pode se sobrepor sem contato.
+        """
+        actor = self.actor
+        width = actor.width * 0.6
+        height = actor.height * 0.4
+        return (actor.x - width / 2, actor.bottom - height, width, height)
 
-    def animate_sprite(self):
-        """Anima o sprite da peça durante o movimento."""
-        if not hasattr(self, "animation_counter"):
-            self.animation_counter = 0  # Inicializa contador de frames
 
-        self.animation_counter += 1
-        if self.animation_counter % 10 == 0:  # Altere '5' para ajustar a velocidade
-            if self.moving:  # Verifica se está se movendo
-                self.current_frame = (
-                    self.current_frame + 1
-                ) % len(self.sprites[self.current_direction])  # Loop nos frames
-                self.actor.image = self.sprites[self.current_direction][self.current_frame]
+    def animate_sprite(self, dt=FRAME_TIME):
+        """
+        Anima o sprite da peça durante o movimento: toca a caminhada da direção
+        atual (Altere WALK_FRAME_TIME para ajustar a velocidade). Parada, a peça
+        fica no frame em que estava.
+        """
+        if self.moving:  # Verifica se está se movendo
+            self.timeline.play(self.sprites[self.current_direction], WALK_FRAME_TIME)
+        else:
+            self.timeline.stop()
 
-    def update_idle(self):
+    def update_idle(self, dt=FRAME_TIME):
         """
         Atualiza o sprite para o estado ocioso com animação dinâmica.
         Aqui, o idle alterna entre os sprites definidos em self.idle_sprites.
         Pode simular respiração, piscar ou outro efeito sutil.
         """
-        # Incrementa o contador de frames para animação idle
-        self.idle_counter += 1
-        # Por exemplo, a cada 20 frames o idle troca de sprite
-        if self.idle_counter % 20 == 0:
-            self.idle_frame_index = (self.idle_frame_index + 1) % len(self.idle_sprites[self.current_direction])
-        # Atualiza a imagem para o frame idle corrente
-        self.actor.image = self.idle_sprites[self.current_direction][self.idle_frame_index]     
+        # Por exemplo, a cada IDLE_FRAME_TIME segundos o idle troca de sprite
+        self.timeline.play(self.idle_sprites[self.current_direction], IDLE_FRAME_TIME)
 
 # As demais classes herdam de Piece e podem ou usar update_idle conforme necessário:
 class StaticPiece(Piece):
     """Peça que não se mexe quando está parada"""
-    def update_position(self, speed):
+    def update_position(self, speed, dt=FRAME_TIME):
         """Peça parada, usa apenas o update_idle para animação ociosa dinâmica."""
         self.moving = False
-        self.update_idle()
+        self.update_idle(dt)
 
 class ThinkingPiece(Piece):
     """
     Essa peça, quando parada, fica fazendo movimentos
     Pode piscar, mecher a cabeça (uma peça com TDAH)
+
+    No modo tático ela também pensa: o World escolhe um lance de xadrez para
+    ela (ver tactics.py) e ela anda até o tile de destino (move_to).
     """
-    def __init__(self, x, y, kind, initial_direction="down"):
+    def __init__(self, x, y, kind, initial_direction="down", rng=None):
+        """'rng': gerador usado para sortear o sentido da rotação (padrão: o módulo random)."""
         super().__init__(x, y, kind, initial_direction)
+        self.rng = rng if rng is not None else random
         self.turning = False
-        self.turn_frame = 0
         self.turn_timer = 3.0
         self.idle_turn = "forward"  # Padrão: "forward" ou "backward"
-        self.current_turn_frames = []
+        self.current_turn_frames = ()
         self.next_idle = None
+        self.goal = None    # Centro (pixels) do tile do lance em andamento
 
         folder = kind
-        self.forward_seq = [
+        self.forward_seq = tuple(
             f"{folder}/{folder}_turn/{i:02d}_{folder}_turn" for i in range(3)
-        ]
-        self.backward_seq = [
+        )
+        self.backward_seq = tuple(
             f"{folder}/{folder}_turn/{i:02d}_{folder}_turn" for i in range(4, 6)
-        ]
+        )
 
     def update_turn(self):
-        """Atualiza a animação de rotação."""
-        if self.turning:
-            self.turn_frame += 1
-            if self.turn_frame < len(self.current_turn_frames):
-                self.actor.image = self.current_turn_frames[self.turn_frame]
-            else:
-                self.turning = False
-                self.turn_timer = 3.0
-                self.idle_turn = self.next_idle
-                if self.idle_turn == "forward":
-                    self.actor.image = self.forward_seq[-1]
-                else:
-                    self.actor.image = self.backward_seq[-1]
+        """
+        Conclui a rotação quando a sequência terminar. Os frames são trocados
+        pelo AnimationClock, então uma peça fora da vista só termina de girar
+        quando voltar a ser vista.
+        """
+        if self.turning and self.timeline.finished:
+            self.turning = False
+            self.turn_timer = 3.0
+            self.idle_turn = self.next_idle
+            self.show_idle_turn()
+
+    def show_idle_turn(self):
+        """Fica no último frame da rotação em que está (de frente ou de costas)."""
+        if self.idle_turn == "forward":
+            self.timeline.play(self.forward_seq[-1:], TURN_FRAME_TIME, restart=True)
+        else:
+            self.timeline.play(self.backward_seq[-1:], TURN_FRAME_TIME, restart=True)
 
     def automatic_turn(self):
         """Realiza a rotação automaticamente quando inativa."""
         if not self.moving and not self.turning:
             self.turning = True
-            self.turn_frame = 0
             if self.idle_turn == "forward":
                 self.current_turn_frames = (
-                    self.backward_seq[:] if random.choice([True, False]) else list(reversed(self.backward_seq))
+                    self.backward_seq if self.rng.choice([True, False]) else self.backward_seq[::-1]
                 )
                 self.next_idle = "backward"
             else:
                 self.current_turn_frames = (
-                    self.forward_seq[:] if random.choice([True, False]) else list(reversed(self.forward_seq))
+                    self.forward_seq if self.rng.choice([True, False]) else self.forward_seq[::-1]
                 )
                 self.next_idle = "forward"
-            self.actor.image = self.current_turn_frames[0]
+            self.timeline.play(self.current_turn_frames, TURN_FRAME_TIME, loop=False, restart=True)
 
-    def check_turn_timer(self):
+    def check_turn_timer(self, dt=FRAME_TIME):
         """Reduz o tempo e dispara rotação automática."""
         if not self.moving and not self.turning:
-            self.turn_timer -= 0.1
-            if self.turn_timer <= 0:
+            self.turn_timer -= TURN_TIMER_RATE * dt
+            if self.turn_timer <= TIME_EPSILON:
                 self.automatic_turn()
 
-    def update_position(self, speed):
-        """Não atualiza posição, apenas anima rotação."""
-        self.check_turn_timer()
-        self.update_turn()
+    def catch_up(self, elapsed, speed):
+        """Pula o tempo parado: a rotação em andamento termina e o timer segue de onde estaria."""
+        if self.turning:
+            self.turning = False
+            self.idle_turn = self.next_idle
+        self.turn_timer = 3.0 - (TURN_TIMER_RATE * elapsed) % 3.0
+
+    def move_to(self, goal):
+        """Começa um lance: anda em linha reta até 'goal' (centro do tile de destino)."""
+        self.goal = goal
+        if self.turning:
+            self.turning = False
+            self.idle_turn = self.next_idle
+
+    def finish_move(self):
+        """Conclui o lance em andamento de uma vez (ex.: a sala vai adormecer)."""
+        if self.goal is not None:
+            self.actor.pos = self.goal
+            self.stop_move()
+
+    def stop_move(self):
+        """Chegou ao destino: a caminhada para e a peça volta à pose parada."""
+        self.goal = None
+        self.moving = False
+        self.show_idle_turn()
+
+    def update_position(self, speed, dt=FRAME_TIME):
+        """Anda até o destino do lance, se houver; senão não sai do lugar e só anima a rotação."""
+        if self.goal is None:
+            self.check_turn_timer(dt)
+            self.update_turn()
+            return
+        actor = self.actor
+        dx, dy = self.goal[0] - actor.x, self.goal[1] - actor.y
+        distance = math.hypot(dx, dy)
+        if distance <= speed:
+            actor.pos = self.goal
+            self.stop_move()
+            return
+        actor.x += dx / distance * speed
+        actor.y += dy / distance * speed
+        if abs(dx) >= abs(dy):
+            self.current_direction = "right" if dx > 0 else "left"
+        else:
+            self.current_direction = "down" if dy > 0 else "up"
+        self.moving = True
 
-    def animate_sprite(self):
+    def animate_sprite(self, dt=FRAME_TIME):
         """Animate the walk if moving and not turning."""
         if self.moving and not self.turning:
-            self.current_frame = (
-                self.current_frame + 1
-            ) % len(self.sprites[self.current_direction])
-            self.actor.image = self.sprites[self.current_direction][
-                self.current_frame
-            ]
+            self.timeline.play(self.sprites[self.current_direction], WALK_FRAME_TIME)
 
 class MovingPiece(Piece):
+    patrol_limits = DEFAULT_PATROL_LIMITS
+
     def __init__(self, x, y, kind, initial_direction="down"):
         super().__init__(x, y, kind, initial_direction)
         self.direction = "horizontal"  # Pode ser "horizontal" ou "vertical"
         self.moving_forward = True
 
-    def update_position(self, speed):
+    def catch_up(self, elapsed, speed):
+        """Avança o vai e vem de uma vez pela distância percorrida em 'elapsed' segundos."""
+        axis = "x" if self.direction == "horizontal" else "y"
+        low, high = self.patrol_limits[self.direction]
+        coord, self.moving_forward = fold_patrol(
+            getattr(self.actor, axis), self.moving_forward, low, high, speed * elapsed
+        )
+        setattr(self.actor, axis, coord)
+
+    def update_position(self, speed, dt=FRAME_TIME):
         """Atualiza a posição com movimento simples."""
+        low, high = self.patrol_limits[self.direction]
         if self.direction == "horizontal":
             if self.moving_forward:
                 self.actor.x += speed
-                if self.actor.x > 800:  # Limite da tela (ajustar conforme necessário)
+                if self.actor.x > high:  # Limite da tela (ajustar conforme necessário)
                     self.moving_forward = False
             else:
                 self.actor.x -= speed
-                if self.actor.x < 0:
+                if self.actor.x < low:
                     self.moving_forward = True
         elif self.direction == "vertical":
             if self.moving_forward:
                 self.actor.y += speed
-                if self.actor.y > 600:
+                if self.actor.y > high:
                     self.moving_forward = False
             else:
                 self.actor.y -= speed
-                if self.actor.y < 0:
+                if self.actor.y < low:
                     self.moving_forward = True
 
 class PieceAndante(Piece):
     """Peça que anda de um lado para outro, ou de cima pra baixo"""
+    patrol_limits = DEFAULT_PATROL_LIMITS
+
     def __init__(self, x, y, kind, initial_direction="left"):
         super().__init__(x, y, kind, initial_direction)
         if initial_direction in ("left", "right"):
@@ -243,62 +368,120 @@ class PieceAndante(Piece):
             self.direction = "vertical"
         self.moving_forward = True
 
-    def update_position(self, speed):
+    def catch_up(self, elapsed, speed):
+        """Avança o vai e vem de uma vez e vira o sprite para o sentido final."""
+        MovingPiece.catch_up(self, elapsed, speed)
+        if self.direction == "horizontal":
+            self.current_direction = "right" if self.moving_forward else "left"
+        else:
+            self.current_direction = "down" if self.moving_forward else "up"
+
+    def update_position(self, speed, dt=FRAME_TIME):
         """Atualiza a posição da peça."""
         self.moving = True  # Indica que está em movimento
+        low, high = self.patrol_limits[self.direction]
         if self.direction == "horizontal":
             if self.moving_forward:
                 self.actor.x += speed
                 self.current_direction = "right"   # Atualiza para 'right' se movendo para a direita
-                if self.actor.x > 800:  # Limite à direita
+                if self.actor.x > high:  # Limite à direita
                     self.moving_forward = False
             else:
                 self.actor.x -= speed
                 self.current_direction = "left"    # Atualiza para 'left' se movendo para a esquerda
-                if self.actor.x < 0:  # Limite à esquerda
+                if self.actor.x < low:  # Limite à esquerda
                     self.moving_forward = True
         elif self.direction == "vertical":
             if self.moving_forward:
                 self.actor.y += speed
                 self.current_direction = "down"   # Atualiza para 'down' se movendo para baixo
-                if self.actor.y > 600:  # Limite inferior
+                if self.actor.y > high:  # Limite inferior
                     self.moving_forward = False
             else:
                 self.actor.y -= speed
                 self.current_direction = "up"     # Atualiza para 'up' se movendo para cima
-                if self.actor.y < 0:  # Limite superior
+                if self.actor.y < low:  # Limite superior
                     self.moving_forward = True
 
         if self.moving:
-            self.animate_sprite()
+            self.animate_sprite(dt)
+
+class ChasingPiece(Piece):
+    """
+    Peça que persegue um alvo pela sala, contornando os muros.
+    O caminho vem de um campo de fluxo da sala (pathfinding.FlowField), o mesmo
+    para todas as peças que perseguem o mesmo alvo; o World escolhe o alvo e
+    entrega o campo a cada tick (chase).
+    """
+    def __init__(self, x, y, kind, initial_direction="down"):
+        super().__init__(x, y, kind, initial_direction)
+        self.flow = None    # Campo de fluxo até o alvo
+        self.goal = None    # Posição do alvo (pixels)
+
+    def chase(self, flow, goal):
+        """Define o alvo; 'flow' None faz a peça parar."""
+        self.flow = flow
+        self.goal = goal
+
+    def update_position(self, speed, dt=FRAME_TIME):
+        """Anda 'speed' pixels em direção ao centro do próximo tile do caminho (ou ao alvo, no tile dele)."""
+        self.moving = False
+        actor = self.actor
+        flow = self.flow
+        waypoint = None
+        if flow is not None and self.goal is not None:
+            waypoint = flow.next_waypoint(actor.x, actor.y)
+            if waypoint is None and flow.reachable(actor.x, actor.y):
+                # Já no tile do alvo: vai direto até ele
+                waypoint = self.goal
+        if waypoint is not None:
+            dx, dy = waypoint[0] - actor.x, waypoint[1] - actor.y
+            # Um eixo por vez (o de maior distância): a peça anda pelos corredores de tiles
+            if dx and abs(dx) >= abs(dy):
+                actor.x += max(-speed, min(speed, dx))
+                self.current_direction = "right" if dx > 0 else "left"
+                self.moving = True
+            elif dy:
+                actor.y += max(-speed, min(speed, dy))
+                self.current_direction = "down" if dy > 0 else "up"
+                self.moving = True
+
+        if self.moving:
+            self.animate_sprite(dt)
+        else:
+            self.update_idle(dt)
 
 class ActivePiece(Piece):
     """
     Peças/personagens ativos, isto é, que são movimentados pelo teclado
     """
-    def update_position(self, speed):
-        """Controla a posição com base nas teclas pressionadas."""
+    def update_position(self, speed, controls=keyboard, dt=FRAME_TIME):
+        """
+        Controla a posição com base nas teclas pressionadas.
+        'controls' é o teclado do PGZero ou qualquer objeto com os atributos
+        left/right/up/down (ex.: world.Controls, usado no modo headless).
+        """
         self.moving = False
-        if keyboard.left:
+        if controls.left:
             self.current_direction = "left"
             self.actor.x = max(64, self.actor.x - speed)
             self.moving = True
-        elif keyboard.right:
+        elif controls.right:
             self.current_direction = "right"
             self.actor.x += speed
             self.moving = True
-        elif keyboard.up:
+        elif controls.up:
             self.current_direction = "up"
             self.actor.y -= speed
             self.moving = True
-        elif keyboard.down:
+        elif controls.down:
             self.current_direction = "down"
             self.actor.y += speed
             self.moving = True
 
         if self.moving:
-            self.animate_sprite()
+            self.animate_sprite(dt)
         else:
-            self.update_idle()
+            self.update_idle(dt)
 
 # Outras classes, como ThinkingPiece, MovingPiece e PieceAndante, podem manter ou sobrescrever se necessário.            
\ No newline at end of file
@@ -1,34 +1,35 @@
-import os
+from functools import lru_cache
 from pgzero.actor import Actor
 from pgzero.clock import schedule_interval, unschedule
+from asset_index import get_index
+from atlas import register_atlases, fight_group
+from chess_pieces import FRAME_TIME, TIME_EPSILON
+
+# Tempo de cada frame da animação da luta (antes: a cada 5 frames do jogo)
+FIGHT_FRAME_TIME = 5 * FRAME_TIME
 
 # Pasta padrão se não existir a pasta dos lutadores desejada
 DEFAULT_FIGHT_FOLDER = "fights/pawn_vs_rook"
 
+@lru_cache(maxsize=None)
 def load_fight_frames(fight_folder):
     """
-    Carrega os sprites da luta a partir da pasta de sprites.
+    Carrega os sprites da luta a partir do índice de imagens (ver asset_index.py).
     Se a pasta informada não existir, usa a pasta DEFAULT_FIGHT_FOLDER.
+    O resultado é uma tupla compartilhada por todas as lutas da mesma pasta.
     """
-    # Define o caminho base para a pasta "images"
-    base_images_path = os.path.join("images")
-    # Constrói o caminho completo para a pasta de lutas
-    full_path = os.path.join(base_images_path, fight_folder)
-    
-    if not os.path.exists(full_path):
+    index = get_index()
+    if not index.has_folder(fight_folder):
         print(f"Pasta '{fight_folder}' não encontrada. Usando '{DEFAULT_FIGHT_FOLDER}' como padrão.")
         fight_folder = DEFAULT_FIGHT_FOLDER
-        full_path = os.path.join(base_images_path, fight_folder)
-    
-    # Lista e filtra os arquivos (assumindo extensão .png)
-    all_files = os.listdir(full_path)
-    fight_frames = sorted(
-        [f"{fight_folder}/{file}" for file in all_files if file.endswith(".png")]
-    )
-    
+
+    fight_frames = tuple(f"{fight_folder}/{file}" for file in index.files(fight_folder))
+    # Se houver atlas, os frames desta luta vêm da folha dela (carregada só agora)
+    register_atlases([fight_group(fight_folder)])
+
     if not fight_frames:
-        print("Nenhum sprite encontrado na pasta! Verifique os arquivos na pasta:", full_path)
-    
+        print("Nenhum sprite encontrado na pasta! Verifique os arquivos na pasta:", f"images/{fight_folder}")
+
     return fight_frames
 
 class Fight:
@@ -41,7 +42,7 @@ class Fight:
         self.loser = loser
         self.active = True
         self.current_frame = 0
-        self.animation_counter = 0
+        self.animation_timer = 0.0
 
         # Define o nome da pasta com base nos atributos dos lutadores.
         folder = f"fights/{winner.kind}_vs_{loser.kind}"
@@ -61,15 +62,16 @@ class Fight:
         y = (self.winner.actor.y + self.loser.actor.y) // 2
         return (x, y)
 
-    def animate_sprite(self):
+    def animate_sprite(self, dt=FRAME_TIME):
         """
         Atualiza os sprites da luta.
-        O método percorre os frames da animação, controlado por um contador.
+        O método percorre os frames da animação, controlado pelo tempo acumulado.
         No final de cada ciclo, há espaço para aplicar efeitos (como dano gradual).
         """
-        self.animation_counter += 1
-        # Ajuste a velocidade da animação modificando o valor '5'
-        if self.animation_counter % 5 == 0:
+        self.animation_timer += dt
+        # Ajuste a velocidade da animação modificando FIGHT_FRAME_TIME
+        if self.animation_timer >= FIGHT_FRAME_TIME - TIME_EPSILON:
+            self.animation_timer -= FIGHT_FRAME_TIME
             self.current_frame = (self.current_frame + 1) % len(self.frames)
             self.actor.image = self.frames[self.current_frame]
             
@@ -102,17 +104,14 @@ class Fight:
         Define o término da luta.
         Futuramente pode incluir remoção da peça, transição de estados, etc.
         """
-        # Exemplo: removendo a peça perdedora de uma lista global 'pieces'
-        try:
-            pieces.remove(self.loser)
-        except NameError:
-            print("A variável global 'pieces' não está definida.")
+        # A peça perdedora fica inativa; o World a retira das suas listas
+        self.loser.active = False
         print(f"A luta terminou. {self.loser.kind} foi derrotado!")
 
-    def update(self):
+    def update(self, dt=FRAME_TIME):
         """Atualiza a animação da luta se ela estiver ativa."""
         if self.active:
-            self.animate_sprite()
+            self.animate_sprite(dt)
 
     def draw(self):
         """Desenha a animação da luta na tela."""
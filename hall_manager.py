@@ -1,8 +1,12 @@
 import random
+import pygame
+from pgzero import loaders
 from pgzero.actor import Actor
+from pathfinding import NavGrid
+from spatial_hash import SpatialHash
 
 class Hall:
-    def __init__(self, width, height, floor_type, wall_type, doors, wall_ornaments, hall_type="room"):
+    def __init__(self, width, height, floor_type, wall_type, doors, wall_ornaments, hall_type="room", rng=None):
         """
         Parâmetros:
           width, height: dimensões da sala (em número de tiles). Todas as salas terão o mesmo tamanho, ou seja, o tamanho da tela.
@@ -11,6 +15,8 @@ class Hall:
           doors: dicionário com as direções em que há porta (ex.: {"up": True, "down": False, ...}).
           wall_ornaments: lista com nomes de ornamentos (ex.: ["baum_tile"]).
           hall_type: para este projeto, sempre "room".
+          rng: gerador aleatório (random.Random) usado na geração; com a mesma semente a sala sai igual.
+               Se omitido, usa o módulo random.
         """
         self.width = width
         self.height = height
@@ -19,13 +25,27 @@ class Hall:
         self.doors = doors
         self.wall_ornaments = wall_ornaments
         self.hall_type = hall_type
+        self.rng = rng if rng is not None else random
 
         self.tiles = []         # Lista dos tiles do piso
         self.walls = []         # Lista dos tiles dos muros
         self.door_actors = []   # Objetos Actor para as portas
         self.ornaments = []     # Lista dos ornamentos
+        self._background = None # Superfície com piso, muros, ornamentos e portas já desenhados
+        self.spatial = SpatialHash()  # Muros, portas e peças da sala, para detectar colisões
+        self._navigation = None # Grade de tiles para caminhos e patrulhas (ver navigation)
+
+        # Peças que moram nesta sala (as do jogador acompanham o herói e ficam no World)
+        self.entities = []
+        self.populated = False        # Se as peças da sala já foram criadas (na primeira visita)
+        self.last_simulated = 0.0     # Tempo do mundo em que a sala foi simulada pela última vez
 
     def generate(self):
+        # Recomeça do zero para que gerar de novo não duplique os tiles
+        self.tiles = []
+        self.walls = []
+        self.door_actors = []
+        self.ornaments = []
         # Gera os tiles do piso (cada tile tem 64x64 pixels)
         for y in range(self.height):
             for x in range(self.width):
@@ -38,6 +58,10 @@ class Hall:
         self._generate_walls()
         # Adiciona ornamentos nas paredes onde não há porta
         self._generate_wall_ornaments()
+        # Piso, portas ou muros mudaram: o fundo em cache e a grade de navegação precisam ser refeitos
+        self.invalidate_background()
+        self._navigation = None
+        self._index_static_bodies()
 
     def _generate_walls(self):
         """
@@ -106,7 +130,7 @@ class Hall:
             return
 
         for wall in self.walls:
-            if random.choice([True, False]):
+            if self.rng.choice([True, False]):
                 x, y = wall["position"]
                 # Confirma se não há porta nessa posição
                 door_exists = any(
@@ -114,30 +138,61 @@ class Hall:
                     for door in self.door_actors
                 )
                 if not door_exists:
-                    ornament = random.choice(self.wall_ornaments)
+                    ornament = self.rng.choice(self.wall_ornaments)
                     self.ornaments.append({
                         "image": f"map/wall_ornaments/{ornament}.png",
                         "position": (x, y)
                     })
 
+    def _index_static_bodies(self):
+        """Registra muros e portas no hash espacial da sala (camadas "wall" e "door")."""
+        self.spatial = SpatialHash()
+        for wall in self.walls:
+            x, y = wall["position"]
+            self.spatial.insert((x, y), (x, y, 64, 64), "wall")
+        for door in self.door_actors:
+            self.spatial.insert(door, (door.left, door.top, door.width, door.height), "door")
+
+    def navigation(self):
+        """
+        Grade de navegação da sala (muros, piso e portas), com A*, campos de
+        fluxo e faixas de patrulha em cache (ver pathfinding.py). Criada no primeiro uso.
+        """
+        if self._navigation is None:
+            self._navigation = NavGrid.from_hall(self)
+        return self._navigation
+
+    def invalidate_background(self):
+        """
+        Descarta o fundo em cache. Deve ser chamada sempre que os tiles, muros,
+        ornamentos ou portas forem alterados; o próximo draw() redesenha o fundo.
+        """
+        self._background = None
+
+    def _render_background(self):
+        """
+        Desenha uma única vez todas as camadas estáticas da sala (piso, muros,
+        ornamentos e portas) numa superfície fora da tela.
+        """
+        background = pygame.Surface((self.width * 64, self.height * 64))
+        if pygame.display.get_surface() is not None:
+            # Mesmo formato de pixel da tela: o blit por frame fica bem mais barato
+            background = background.convert()
+
+        for layer in (self.tiles, self.walls, self.ornaments):
+            for item in layer:
+                background.blit(loaders.images.load(item["image"]), item["position"])
+        for door in self.door_actors:
+            background.blit(loaders.images.load(door.image), (door.x - door.width / 2, door.y - door.height / 2))
+        return background
+
     def draw(self, screen, offset=(0,0)):
         """
         Desenha a sala inteira com um deslocamento (offset).  
         O offset é usado no efeito de transição para posicionar a sala em uma posição deslocada.
+        As camadas estáticas são desenhadas uma vez só (ver _render_background);
+        a cada frame basta um único blit do fundo em cache.
         """
-        # Desenha o piso
-        for tile in self.tiles:
-            pos = (tile["position"][0] + offset[0], tile["position"][1] + offset[1])
-            screen.blit(tile["image"], pos)
-        # Desenha os muros
-        for wall in self.walls:
-            pos = (wall["position"][0] + offset[0], wall["position"][1] + offset[1])
-            screen.blit(wall["image"], pos)
-        # Desenha os ornamentos
-        for orn in self.ornaments:
-            pos = (orn["position"][0] + offset[0], orn["position"][1] + offset[1])
-            screen.blit(orn["image"], pos)
-        # Desenha as portas
-        for door in self.door_actors:
-            door_pos = (door.x + offset[0] - door.width/2, door.y + offset[1] - door.height/2)
-            screen.blit(door.image, door_pos)
+        if self._background is None:
+            self._background = self._render_background()
+        screen.blit(self._background, offset)
@@ -0,0 +1,172 @@
+#!/usr/bin/python
+"""
+Modo headless: roda o World sem janela, com entrada roteirizada
+
+Serve para testes de carga e de longa duração em máquinas sem monitor (CI).
+Exemplos:
+
+    python headless.py --ticks 10000 --script "right:120,up+tab:1,down:90"
+    python headless.py --ticks 100000 --random --seed 42
+    python headless.py --ticks 10000 --random --profile profile.json
+    python headless.py --ticks 10000 --random --hz 30
+    python headless.py --ticks 10000 --random --save savegame.dat
+    python headless.py --ticks 10000 --random --load savegame.dat
+    python headless.py --ticks 10000 --random --record partida.rec
+    python headless.py --ticks 10000 --random --tactical
+
+O roteiro é uma lista de trechos "teclas:ticks" separados por vírgula; as
+teclas de um trecho são unidas por '+' e "idle" significa nenhuma tecla.
+Ao chegar ao fim, o roteiro recomeça do início.
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+KEY_NAMES = ("left", "right", "up", "down", "tab")
+
+
+def init_headless():
+    """
+    Prepara o pygame/PGZero para rodar sem janela.
+    Deve ser chamada antes de criar o World (os Actors precisam de um display
+    para converter as imagens).
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from pgzero import loaders
+
+    from asset_pack import register_pack
+    from atlas import register_atlases, PIECE_KINDS
+
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    loaders.set_root(GAME_DIR)
+    # Mesmas imagens do jogo: pacote e atlas, se tiverem sido gerados
+    register_pack()
+    register_atlases(PIECE_KINDS)
+
+
+def parse_script(text):
+    """
+    Converte "right:120,up+tab:1,idle:30" em [(Controls, ticks), ...].
+    """
+    from world import Controls
+
+    segments = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        keys_text, _, ticks_text = part.partition(":")
+        pressed = {}
+        for name in keys_text.split("+"):
+            name = name.strip().lower()
+            if name == "idle":
+                continue
+            if name not in KEY_NAMES:
+                raise ValueError(f"Tecla desconhecida no roteiro: '{name}'")
+            pressed[name] = True
+        segments.append((Controls(**pressed), int(ticks_text or 1)))
+    return segments
+
+
+def scripted_input(segments):
+    """Gera um Controls por tick, repetindo o roteiro indefinidamente."""
+    if not segments:
+        from world import NO_INPUT
+        return itertools.repeat(NO_INPUT)
+    return itertools.chain.from_iterable(
+        itertools.repeat(controls, ticks) for controls, ticks in itertools.cycle(segments)
+    )
+
+
+def random_input(rng, min_ticks=10, max_ticks=120):
+    """Entrada aleatória (um "jogador bêbado") para testes de longa duração."""
+    from world import Controls
+
+    while True:
+        name = rng.choice(("left", "right", "up", "down", "idle", "tab"))
+        controls = Controls() if name == "idle" else Controls(**{name: True})
+        ticks = 1 if name == "tab" else rng.randint(min_ticks, max_ticks)
+        for _ in range(ticks):
+            yield controls
+
+
+def run(world, inputs, ticks, dt=None):
+    """
+    Executa 'ticks' ticks do mundo (ou de qualquer objeto com o tick() do
+    World, como o replay.Recorder), de 'dt' segundos cada (padrão: world.TICK),
+    e devolve o tempo gasto (segundos).
+    """
+    from world import TICK
+
+    tick = world.tick
+    dt = TICK if dt is None else dt
+    start = time.perf_counter()
+    for controls in itertools.islice(inputs, ticks):
+        tick(controls, dt)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roda o jogo sem janela, com entrada roteirizada.")
+    parser.add_argument("--ticks", type=int, default=10000, help="Quantidade de ticks (padrão: 10000).")
+    parser.add_argument("--rows", type=int, default=4, help="Linhas de salas do mapa (padrão: 4).")
+    parser.add_argument("--cols", type=int, default=4, help="Colunas de salas do mapa (padrão: 4).")
+    parser.add_argument("--seed", type=int, default=None, help="Semente do gerador aleatório.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--script", default="", help="Roteiro de teclas, ex.: \"right:120,up+tab:1\".")
+    group.add_argument("--random", action="store_true", help="Usa entrada aleatória em vez de um roteiro.")
+    parser.add_argument("--hz", type=int, default=None, help="Ticks de lógica por segundo de jogo (padrão: 60).")
+    parser.add_argument("--profile", metavar="ARQUIVO", help="Mede as fases do tick e grava os percentis neste JSON.")
+    parser.add_argument("--load", metavar="ARQUIVO", help="Começa de um jogo salvo (ignora --rows/--cols).")
+    parser.add_argument("--save", metavar="ARQUIVO", help="Salva o mundo neste arquivo ao terminar.")
+    parser.add_argument("--record", metavar="ARQUIVO", help="Grava a partida para o replay.py.")
+    parser.add_argument("--tactical", action="store_true", help="Liga o modo tático (ver tactics.py).")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    init_headless()
+    from world import World, LOGIC_HZ
+    from profiler import FrameProfiler, NULL_PROFILER
+    from savegame import load_world, save_world
+    from replay import Recorder
+
+    profiler = FrameProfiler(window=args.ticks) if args.profile else NULL_PROFILER
+    if args.load:
+        world = load_world(args.load, profiler=profiler, tactical=args.tactical)
+    else:
+        world = World(grid_rows=args.rows, grid_cols=args.cols, profiler=profiler, seed=args.seed,
+                      tactical=args.tactical)
+    if args.random:
+        inputs = random_input(random.Random(args.seed))
+    else:
+        inputs = scripted_input(parse_script(args.script))
+
+    recorder = Recorder(world, hz=args.hz or LOGIC_HZ) if args.record else None
+    # O Recorder tem o mesmo tick() do World: grava a entrada e repassa
+    elapsed = run(recorder or world, inputs, args.ticks, dt=1 / args.hz if args.hz else None)
+    rate = args.ticks / elapsed if elapsed else float("inf")
+    print(f"{args.ticks} ticks em {elapsed:.3f}s ({rate:.0f} ticks/s). "
+          f"Sala final: room_{world.current_r}_{world.current_c}")
+    if args.profile:
+        profiler.dump(args.profile)
+    if recorder is not None:
+        recorder.save(args.record)
+        print(f"Partida gravada em {args.record} ({len(recorder.checkpoints)} pontos de conferência)")
+    if args.save:
+        start = time.perf_counter()
+        size = save_world(world, args.save)
+        print(f"Mundo salvo em {args.save}: {size} bytes em {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
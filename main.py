@@ -5,263 +5,193 @@
     Aqui as funções update() e draw() são executadas constantemente
     Cerca de 60x por segundo
 
-"""
-import random
-import pgzrun
-
-from pgzero.keyboard import keys, keyboard
-
-from game_entities import ActiveHero
-from chess_pieces import Piece, ActivePiece, ThinkingPiece, MovingPiece, PieceAndante
-from fight_manager import Fight
-from menu import Menu
-import config
-from hall_manager import Hall
-from map_manager import MapManager
-
-# Inicializa o menu
-menu = Menu(music)
+    Toda a lógica do jogo fica em world.World; este módulo só lê o teclado,
+    repassa para o mundo e desenha o resultado na tela.
+
+    Com ROGUELIKE_PROFILE=1 o tempo de cada fase do frame é medido
+    (ver profiler.py): F3 mostra/esconde os percentis na tela e F4 grava
+    o resumo em ROGUELIKE_PROFILE_FILE (padrão: profile.json).
+
+    A lógica roda em ticks fixos de ROGUELIKE_LOGIC_HZ por segundo (padrão: 60),
+    qualquer que seja a taxa de quadros; em máquinas fracas, ROGUELIKE_LOGIC_HZ=30
+    economiza processamento sem deixar o jogo mais lento.
+
+    Se o pacote de imagens foi gerado (python asset_pack.py), todas as imagens
+    vêm dele, mapeado na memória; senão, se os atlas de textura foram gerados
+    (python atlas.py), os frames das peças e das lutas vêm deles. O que não
+    estiver em nenhum dos dois é lido dos PNGs soltos.
+
+    O menu é montado numa superfície própria e só é redesenhado quando muda
+    (ver menu.py); parado no menu, o jogo quase não gasta processamento.
+
+    O menu aparece já no primeiro quadro: as imagens, o mapa e as peças são
+    montados numa thread em segundo plano e a música só começa depois que o
+    menu está na tela. Com ROGUELIKE_STARTUP_TRACE=1 o tempo de cada passo da
+    inicialização é exibido quando o primeiro quadro aparece (ver startup.py).
+
+    O jogo é salvo em ROGUELIKE_SAVE_FILE (padrão: savegame.dat) a cada
+    ROGUELIKE_AUTOSAVE segundos (padrão: 30; 0 desliga) e ao voltar para o
+    menu, sempre em segundo plano (ao fechar, o jogo espera o salvamento
+    terminar); se o arquivo existir, o jogo continua dele (ver savegame.py).
+
+    Com ROGUELIKE_RECORD=partida.rec a entrada de cada tick é gravada (no
+    arquivo, ao fechar o jogo) e pode ser reproduzida com 'python replay.py'.
+
+    Com ROGUELIKE_TACTICAL=1 o jogo fica no modo tático (padrão: desligado,
+    as ThinkingPiece só giram paradas): elas escolhem lances com uma busca de
+    até ROGUELIKE_THINK_MS milissegundos por lance (padrão: 4; ver tactics.py);
+    numa máquina mais rápida a busca vai mais fundo, sem atrasar o quadro. Com
+    ROGUELIKE_AI_WORKERS=N a busca sai do tick e roda em N threads ou, com
+    ROGUELIKE_AI_POOL=process, em N processos (padrão: 0, dentro do tick;
+    ver ai_jobs.py). O pool só é criado quando o mundo fica pronto, e os
+    processos dele executam este arquivo de novo (como __mp_main__) sem abrir
+    a janela nem montar o jogo.
 
-game_active = False  # Variável para indicar que o jogo está ativo
-
-# Configurações do jogo
-WIDTH, HEIGHT = 1280, 704
+"""
+from startup import trace_from_env, BackgroundLoader
+
+# Cronômetro da inicialização (desligado por padrão)
+trace = trace_from_env()
+
+# Os processos do pool de decisões (ROGUELIKE_AI_POOL=process) executam este arquivo
+# de novo antes de rodar as buscas: neles não há janela, menu nem carga do mundo
+AI_WORKER = __name__ == "__mp_main__"
+
+with trace.step("import pgzrun (janela)"):
+    import atexit
+    import os
+    if not AI_WORKER:
+        import pgzrun
+
+    from pgzero.keyboard import keys, keyboard
+
+# Um passo por módulo do jogo. O world vem primeiro: ele traz as peças, as salas e o
+# pathfinding, que os seguintes (savegame, replay) também importam
+with trace.step("import world"):
+    from world import World, FixedStepLoop, WIDTH, HEIGHT, LOGIC_HZ, THINK_BUDGET as DEFAULT_THINK_BUDGET
+with trace.step("import savegame"):
+    from savegame import Autosaver, SaveError, load_world, DEFAULT_SAVE_FILE, DEFAULT_AUTOSAVE_INTERVAL
+with trace.step("import replay"):
+    from replay import Recorder
+with trace.step("import ai_jobs"):
+    from ai_jobs import ai_jobs_from_env
+with trace.step("import asset_pack"):
+    from asset_pack import register_pack
+with trace.step("import atlas"):
+    from atlas import register_atlases, PIECE_KINDS
+with trace.step("import menu"):
+    from menu import Menu
+with trace.step("import profiler"):
+    from profiler import profiler_from_env
+
+# Inicializa o menu (a música começa depois do primeiro quadro)
+with trace.step("menu"):
+    menu = None if AI_WORKER else Menu(music)
 
 TITLE = "Correr ou Lutar"
 
-# Definindo as dimensões da tela com base no tamanho das salas (16 tiles de 64 pixels = 1024, 12 tiles de 64 pixels = 768)
-#WIDTH = 16 * 64   # 1024 pixels
-#HEIGHT = 11 * 64  # 704 pixels
-
-# Instancia o MapManager e gera o dicionário de halls (salas)
-map_manager = MapManager(grid_rows=4, grid_cols=4)
-halls = map_manager.build_halls()
-
-# Seleciona uma sala inicial aleatória
-initial_key = random.choice(list(halls.keys()))
-parts = initial_key.split("_")  # Exemplo: "room_1_2"
-current_r, current_c = int(parts[1]), int(parts[2])
-current_room = halls[initial_key]
-print("Sala inicial escolhida:", initial_key)
-
-# --------------------------------
-# Cria personagens/peças de xadrez
-# --------------------------------
-active_pieces = [
-    ActivePiece(WIDTH // 2, HEIGHT // 2 + 170, 'pawn'),
-    ActivePiece(WIDTH // 2 + 270, HEIGHT // 2, 'rook'),
-    ActivePiece(WIDTH // 2 - 30, HEIGHT // 2, 'queen'),
-    ActivePiece(WIDTH // 2, HEIGHT // 2 - 30, 'knight'),
-    ActivePiece(WIDTH // 2, HEIGHT // 2 - 70, 'bishop'),
-]
-
-pieces = [
-    ThinkingPiece(WIDTH // 2 - 30, HEIGHT // 2 - 170, 'pawn'),
-    ThinkingPiece(WIDTH // 2 - 270, HEIGHT // 2, 'rook'),
-    PieceAndante(WIDTH // 2 - 90, HEIGHT // 2, 'queen'),
-    PieceAndante(WIDTH // 2, HEIGHT // 2 - 60, 'knight', 'down'),
-    Piece(WIDTH // 2, HEIGHT // 2 + 40, 'bishop'),
-]
-
-active_piece_index = 0
-active_piece = active_pieces[active_piece_index]
-switch_delay = 0
-
-peao = active_pieces[0]
-torre = pieces[1]
-bispo1 = active_pieces[4]
-bispo2 = pieces[4]
-current_fight = Fight(peao,torre)
-
-# --- Variáveis de transição ---
-transition_active = False      # Flag indicando se uma transição está em andamento
-transition_direction = None    # "up", "down", "left" ou "right"
-transition_progress = 0        # Acumulador de pixels deslocados na animação
-transition_speed = 20          # Velocidade de transição (pixels por update)
-target_room = None
-target_r = None
-target_c = None
-
-
-
-def initiate_transition(direction):
-    """
-    Configura os parâmetros iniciais para iniciar a transição entre salas.
-    """
-    global transition_active, transition_direction, transition_progress
-    global target_room, current_r, current_c, target_r, target_c
-
-    transition_active = True
-    transition_direction = direction
-    transition_progress = 0
-
-    # Calcula as coordenadas da sala destino com base na direção
-    target_r, target_c = current_r, current_c
-    if direction == "up":
-        target_r -= 1
-    elif direction == "down":
-        target_r += 1
-    elif direction == "left":
-        target_c -= 1
-    elif direction == "right":
-        target_c += 1
-
-    new_key = f"room_{target_r}_{target_c}"
-    if new_key in halls:
-        target_room = halls[new_key]
-    else:
-        # Se não existir sala na direção desejada, cancela a transição
-        transition_active = False
-
-def finish_transition():
-    """
-    Conclui a transição, definindo a nova sala atual e reposicionando o jogador.
-    """
-    global transition_active, current_room, current_r, current_c, active_piece, transition_progress
-    global target_room, target_r, target_c, transition_direction
-
-    transition_active = False
-    transition_progress = 0
-    current_room = target_room
-    current_r, current_c = target_r, target_c
-
-    # Posiciona o active_piece na nova sala – um pouco distante da porta oposta àquela que foi usada
-    if transition_direction == "up":
-        new_pos = (WIDTH // 2, HEIGHT - 60)
-    elif transition_direction == "down":
-        new_pos = (WIDTH // 2, 60)
-    elif transition_direction == "left":
-        new_pos = (WIDTH - 60, HEIGHT // 2)
-    elif transition_direction == "right":
-        new_pos = (60, HEIGHT // 2)
-
-    active_piece.pos = new_pos
-    print(f"Transição concluída. Nova sala: room_{current_r}_{current_c}. Nova posição do active_piece: {active_piece.pos}")
-
-    # Recria o Actor para garantir que não haja estado residual
-    #active_piece.pos = new_pos
-    #print(f"Transição concluída. Nova sala: room_{current_r}_{current_c}. Nova posição do active_piece: {active_piece.pos}")
-
-    #active_piece = ActivePiece(new_pos[0], new_pos[1],"pawn")
-
-    print(f"(Force) Transição concluída. Nova sala: room_{current_r}_{current_c}. Nova posição do active_piece: {active_piece.pos}")
-
-
-# -----------------------------
-# Atualiza o estado global no update()
-# -----------------------------
-
-# Definindo um threshold (valor em pixels) que determina a "zona de ativação" da porta:
-DOOR_THRESHOLD = 50  # ajustável conforme sua preferência
-
-def update():
+# Instrumentação opcional dos tempos de cada fase
+profiler = profiler_from_env()
+PROFILE_FILE = os.environ.get("ROGUELIKE_PROFILE_FILE", "profile.json")
+
+# Jogo salvo e salvamento automático
+SAVE_FILE = os.environ.get("ROGUELIKE_SAVE_FILE", DEFAULT_SAVE_FILE)
+AUTOSAVE_INTERVAL = float(os.environ.get("ROGUELIKE_AUTOSAVE", DEFAULT_AUTOSAVE_INTERVAL))
+# Gravação da partida para o replay.py (desligada por padrão)
+RECORD_FILE = os.environ.get("ROGUELIKE_RECORD")
+# Modo tático (desligado por padrão) e o orçamento de cada lance (segundos)
+TACTICAL = os.environ.get("ROGUELIKE_TACTICAL", "") not in ("", "0")
+THINK_BUDGET = float(os.environ.get("ROGUELIKE_THINK_MS", DEFAULT_THINK_BUDGET * 1000)) / 1000
+
+
+def build_world():
+    """Executado em segundo plano enquanto o menu já aparece na tela."""
+    # Imagens do pacote (se existir) e frames das peças a partir dos atlas (se existirem;
+    # os das lutas vêm na primeira luta). O que já veio do pacote não é carregado de novo.
+    with trace.step("imagens (pacote e atlas)"):
+        register_pack()
+        register_atlases(PIECE_KINDS)
+
+    # Mapa, salas e peças (do jogo salvo, se houver)
+    with trace.step("mundo"):
+        built = None
+        if os.path.isfile(SAVE_FILE):
+            try:
+                built = load_world(SAVE_FILE, width=WIDTH, height=HEIGHT, profiler=profiler,
+                                   tactical=TACTICAL, think_budget=THINK_BUDGET)
+                print(f"Jogo carregado de {SAVE_FILE}")
+            except (OSError, SaveError) as error:
+                print(f"Não foi possível carregar {SAVE_FILE} ({error}); começando um jogo novo.")
+        if built is None:
+            built = World(grid_rows=4, grid_cols=4, width=WIDTH, height=HEIGHT, profiler=profiler,
+                          tactical=TACTICAL, think_budget=THINK_BUDGET)
+    trace.mark("world_ready")
+    return built
+
+
+world_loader = None if AI_WORKER else BackgroundLoader(build_world, name="mundo").start()
+# O mundo, o laço de passo fixo, o pool de decisões e o salvamento automático existem
+# quando a carga termina (ver world_ready)
+world = None
+loop = None
+ai_jobs = None
+autosaver = None
+
+
+def world_ready():
+    """Indica se o mundo já foi montado; na primeira vez cria o laço de passo fixo."""
+    global world, loop, ai_jobs, autosaver
+    if world is None:
+        world = world_loader.result()
+        if world is None:
+            return False
+        # Pool onde as buscas do modo tático rodam, fora do tick (None = dentro do tick)
+        ai_jobs = ai_jobs_from_env() if TACTICAL else None
+        if ai_jobs is not None:
+            world.ai_jobs = ai_jobs
+            # A janela do PGZero não avisa antes de fechar: o pool é encerrado quando o
+            # processo terminar
+            atexit.register(ai_jobs.close)
+        # Laço de passo fixo: transforma o tempo real de cada quadro em ticks da lógica
+        hz = int(os.environ.get("ROGUELIKE_LOGIC_HZ", LOGIC_HZ))
+        ticker = world
+        if RECORD_FILE:
+            # O Recorder fica no lugar do World no laço: grava a entrada e repassa o tick
+            ticker = Recorder(world, hz=hz)
+            ticker.save_at_exit(RECORD_FILE)
+        loop = FixedStepLoop(ticker, hz=hz)
+        if AUTOSAVE_INTERVAL > 0:
+            autosaver = Autosaver(world, SAVE_FILE, AUTOSAVE_INTERVAL)
+            # A thread do salvamento não segura o processo: ao fechar a janela, o
+            # salvamento em andamento (e o da fila) termina antes de o jogo sair
+            atexit.register(autosaver.wait)
+    return True
+
+
+def in_transition():
+    return world is not None and world.transition_active
+
+
+def update(dt):
     """
     Função parte do PGZero que é executada constantemente
+    'dt' é o tempo real (em segundos) desde o último quadro.
     """
-    global current_room, current_r, current_c, active_piece, transition_active, transition_progress
-    global active_piece, active_piece_index, switch_delay
-
-    # Debug: imprimir posição do herói e o flag de transição
-    print(f"Posição do herói: ({active_piece.x}, {active_piece.y}). transition_active: {transition_active}")
-
-
-
-    # Se não estamos em transição, faz a verificação da posição do herói
-    if not transition_active:
-        # Verifica se há porta habilitada e se o herói está próximo dela
-        # Porta superior
-        if current_room.doors.get("up") and active_piece.y < DOOR_THRESHOLD:
-            initiate_transition("up")
-        # Porta inferior
-        elif current_room.doors.get("down") and active_piece.y > HEIGHT - DOOR_THRESHOLD:
-            initiate_transition("down")
-        # Porta esquerda
-        elif current_room.doors.get("left") and active_piece.x < DOOR_THRESHOLD:
-            initiate_transition("left")
-        # Porta direita
-        elif current_room.doors.get("right") and active_piece.x > WIDTH - DOOR_THRESHOLD:
-            initiate_transition("right")
-            
-    else:
-        # Atualiza o slide de transição conforme já implementado
-        transition_progress += transition_speed
-        total_distance = HEIGHT if transition_direction in ("up", "down") else WIDTH
-        if transition_progress >= total_distance:
-            finish_transition()
-
-
-
-    # Se não estamos em transição, permitimos movimentação e verificamos colisões com portas
-    if not transition_active:
-
-        #
-        # (Aqui você provavelmente já tem sua lógica de movimentação do active_piece via setas.)
-        #
-
-        screen.clear()
-
-        dt = 1/60
-
-        # Enquanto o menu estiver ativo, ele controla as atualizações
-        if menu.active:
-            menu.update()
-        else:
-            # Aqui você pode chamar as atualizações do jogo principal, por exemplo:
-            if keyboard.tab and switch_delay <= 0:
-                active_piece_index = (active_piece_index + 1) % len(active_pieces)
-                active_piece = active_pieces[active_piece_index]
-                switch_delay = 0.3
-
-            if switch_delay > 0:
-                switch_delay -= dt
-
-            #if keyboard.b:
-            #    bispo1 = active_pieces[4]
-            #    bispo2 = pieces[4]
-            #    current_fight = Fight(bispo1, bispo2)
-
-            #if current_fight.active:
-            #    current_fight.update()
-
-            active_piece.update_position(speed=3)
+    # Enquanto o menu estiver ativo (e não houver transição em andamento), ele controla as atualizações
+    if menu.active and not in_transition():
+        menu.update()
+        # O tempo passado no menu não conta para o jogo
+        if world_ready():
+            loop.reset()
+            if autosaver is not None:
+                autosaver.poll()    # O salvamento pedido pelo ESC pode estar na fila
+    elif world_ready():
+        with profiler.phase("tick"):
+            loop.advance(dt, keyboard)
+        if autosaver is not None:
+            autosaver.update(dt)
 
-            #active_piece.active = True
 
-            # Atualizações das peças ccurrent_fight = Fight(peao,torre)ontroladas
-            for piece in active_pieces:
-                if piece != active_piece:
-                    piece.update_idle()
-
-            # Atualizações automáticas para as peças não controladas
-            for piece in pieces:
-                piece.update_position(speed=2)
-                piece.animate_sprite()
-
-
-
-        #
-        #
-        # Verifica a colisão do active_piece com as portas da sala atual
-        for door in current_room.door_actors:
-            if active_piece.actor.colliderect(door):
-                # A direção já está armazenada em door.direction
-                initiate_transition(door.direction)
-                break
-        #
-        #
-        #
-
-
-    else:
-        #
-        # Atualiza a animação de transição
-        #
-        transition_progress += transition_speed
-        total_distance = HEIGHT if transition_direction in ("up", "down") else WIDTH
-        if transition_progress >= total_distance:
-            finish_transition()
-   
-    
 # -----------------------------
 # GLOBAL FUNCTION: draw()
 # Draws all objects on the screen.
@@ -270,61 +200,37 @@ def draw():
     """
     Desenha e constantemente atualiza tudo na tela
     """
-    screen.clear()
-
-    if transition_active:
-        # Calcula os deslocamentos para o efeito de slide
-        if transition_direction == "up":
-            current_offset = (0, transition_progress)
-            target_offset = (0, transition_progress - HEIGHT)
-        elif transition_direction == "down":
-            current_offset = (0, -transition_progress)
-            target_offset = (0, HEIGHT - transition_progress)
-        elif transition_direction == "left":
-            current_offset = (transition_progress, 0)
-            target_offset = (transition_progress - WIDTH, 0)
-        elif transition_direction == "right":
-            current_offset = (-transition_progress, 0)
-            target_offset = (WIDTH - transition_progress, 0)
-        else:
-            current_offset = (0, 0)
-            target_offset = (0, 0)
-
-        # Desenha as duas salas com seus respectivos offsets
-        current_room.draw(screen, offset=current_offset)
-        target_room.draw(screen, offset=target_offset)
+    if menu.active and not in_transition():
+        # Desenha o menu (ele cobre a tela toda; se nada mudou a tela já mostra este quadro)
+        menu.draw(screen)
     else:
-
-        #
-        # transição terminou, desenha a tela normal (mito)
-        #
-
-        if menu.active:
-            # Desenha o menu
-            menu.draw(screen)
-        else:
+        screen.clear()
+        if world_ready():
             # Desenha o jogo principal
-            current_room.draw(screen)
-            
-            # Informações na tela
-            screen.draw.text(f"Ativo: {active_piece.kind} - TAB muda para outro - ESC para voltar", center=(400, 50), fontsize=30, color="yellow")
-
-            # Desenha as peças ativas
-            for piece in active_pieces:
-                piece.draw()
-
-            # Desenha as peças não controladas
-            for piece in pieces:
-                piece.draw()
-
-            # Desenha a luta, se houver
-            #if current_fight.active:
-            #    current_fight.draw()
-            #if config.transition_finishing:
-            #    active_piece.pos = config.new_pos
-            #    config.transition_finishing=False
-            #    print('active_piece.pos=', active_piece.pos)
-            #    active_piece.draw()
+            with profiler.phase("draw"):
+                world.draw(screen, alpha=loop.alpha)
+        else:
+            # Começou o jogo antes de o mundo ficar pronto
+            screen.draw.text("Carregando...", center=(WIDTH // 2, HEIGHT // 2), fontsize=50, color="yellow")
+        # A tela deixou de mostrar o menu
+        menu.invalidate()
+
+    if profiler.enabled and profiler.show_overlay:
+        profiler.draw_overlay(screen)
+        # O overlay muda a cada quadro: o menu é copiado de novo por baixo dele
+        menu.invalidate()
+
+    trace.mark("first_frame")
+    if trace.enabled and not trace.reported and world_loader.ready:
+        # Relatório quando o primeiro quadro já apareceu e o mundo já foi montado
+        trace.report()
+
+def on_mouse_move(pos):
+    """
+    Passa o movimento do mouse para o menu (destaque do botão sob o mouse)
+    """
+    if menu.active:
+        menu.on_mouse_move(pos)
 
 def on_mouse_down(pos):
     """
@@ -338,28 +244,26 @@ def on_key_down(key):
     Pressionar ESC retorna ao menu
     """
 
+    # Teclas do profiler (só quando ROGUELIKE_PROFILE está ligado)
+    if profiler.enabled:
+        if key == keys.F3:
+            profiler.show_overlay = not profiler.show_overlay
+            return
+        if key == keys.F4:
+            profiler.dump(PROFILE_FILE)
+            return
+
     # Se houver transição ativa, ignoramos novos comandos de movimentação
-    if transition_active:
+    if in_transition():
         return
 
     # Tecla ESC - vai pro menu
     if not menu.active and key == keys.ESCAPE:
         menu.active = True  # Retorna ao menu
+        if autosaver is not None:
+            autosaver.save(queue=True)
     elif menu.active and key == keys.ESCAPE:
         menu.active = False  # Sai do menu para o jogo principal
 
-    """
-    # Lógica simples para movimentar o active_piece
-    move_speed = 10
-    if key == keys.UP:
-        active_piece.y -= move_speed
-    elif key == keys.DOWN:
-        active_piece.y += move_speed
-    elif key == keys.LEFT:
-        active_piece.x -= move_speed
-    elif key == keys.RIGHT:
-        active_piece.x += move_speed    
-
-    """
-
-pgzrun.go()
+if __name__ == "__main__":
+    pgzrun.go()
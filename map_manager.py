@@ -1,94 +1,252 @@
 import random
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
 from hall_manager import Hall
 
+FLOOR_TYPES = ["chess", "clay", "grass", "marble", "musg"]
+WALL_TYPES = ["brick", "rock"]
+
+# Quantidade padrão de salas mantidas em memória. Cada sala já desenhada guarda
+# um fundo de 1280x704 pixels (cerca de 3,6 MB): 9 salas são uns 32 MB. Cabem a
+# sala atual, as 4 vizinhas pré-carregadas e algumas das visitadas por último.
+DEFAULT_MAX_RESIDENT_HALLS = 9
+
+# Chance de abrir uma porta extra (criando um ciclo) além da árvore que liga todas as salas
+DEFAULT_LOOP_CHANCE = 0.1
+
+# Um bit por direção; cada sala ocupa um byte da grade de portas
+DOOR_UP, DOOR_DOWN, DOOR_LEFT, DOOR_RIGHT = 1, 2, 4, 8
+DOOR_BITS = {"up": DOOR_UP, "down": DOOR_DOWN, "left": DOOR_LEFT, "right": DOOR_RIGHT}
+OPPOSITE_BIT = {DOOR_UP: DOOR_DOWN, DOOR_DOWN: DOOR_UP, DOOR_LEFT: DOOR_RIGHT, DOOR_RIGHT: DOOR_LEFT}
+# Deslocamento (linha, coluna) de cada direção
+DIRECTION_OFFSETS = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+
+class DoorView(Mapping):
+    """
+    Visão {"up": bool, "down": bool, "left": bool, "right": bool} de uma sala,
+    lida direto do byte correspondente na grade de portas (não copia nada).
+    """
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __getitem__(self, direction):
+        return bool(self.grid[self.index] & DOOR_BITS[direction])
+
+    def __iter__(self):
+        return iter(DOOR_BITS)
+
+    def __len__(self):
+        return len(DOOR_BITS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class MapManager:
-    def __init__(self, grid_rows=4, grid_cols=4):
+    def __init__(self, grid_rows=4, grid_cols=4, seed=None, max_resident_halls=DEFAULT_MAX_RESIDENT_HALLS,
+                 loop_chance=DEFAULT_LOOP_CHANCE):
         """
         Parâmetros:
           grid_rows, grid_cols: quantidade de salas na vertical e horizontal (a grade completa do labirinto).
-          
+          seed: semente do mapa. A grade de portas e cada sala são geradas a partir dela,
+                então o mesmo seed produz sempre o mesmo labirinto. Se omitida, é sorteada.
+          max_resident_halls: quantas salas (instâncias de Hall) podem ficar em memória ao mesmo
+                tempo; as menos usadas recentemente são descartadas e recriadas quando necessário.
+          loop_chance: probabilidade, por sala, de abrir uma porta extra que cria um caminho alternativo.
+
         Todas as salas terão as mesmas dimensões (tamanho da tela do jogo) e as portas estarão centralizadas.
         """
         self.grid_rows = grid_rows
         self.grid_cols = grid_cols
-        # Inicializa uma grade com configuração padrão para as portas.
-        self.door_grid = [
-            [{"up": False, "down": False, "left": False, "right": False} for _ in range(grid_cols)]
-            for _ in range(grid_rows)
-        ]
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.max_resident_halls = max_resident_halls
+        self.loop_chance = loop_chance
+        # Grade de portas compactada: um byte por sala (índice r * grid_cols + c), com os bits DOOR_*
+        self.door_grid = bytearray(grid_rows * grid_cols)
+        self.rooms_generated = False
+
+        # Salas em memória, da menos para a mais usada recentemente: (r, c) -> Hall
+        self.resident = OrderedDict()
+        # Salas que não podem ser descartadas (ex.: a sala atual e a de destino da transição)
+        self.pinned = set()
+        # Peças das salas descartadas: (r, c) -> (entities, last_simulated). O piso e os muros
+        # são recriados pela semente, mas as peças mudam durante o jogo e precisam ser guardadas.
+        # Não tem limite: cresce com o número de salas visitadas (só as peças, sem o fundo)
+        # e vai inteiro para o jogo salvo
+        self.stashed = {}
+        # Jogo salvo carregado (savegame.SaveFile): as peças de cada sala salva só viram
+        # objetos quando a sala é criada (ver create_hall)
+        self.saved = None
 
     def generate_rooms(self):
         """
         Gera a configuração de portas para cada sala na grade.
-        - As portas 'up' e 'left' são herdadas dos vizinhos.
-        - As portas 'right' e 'down' são decididas aleatoriamente (desde que exista sala adjacente).
-        - Garante que toda sala possua pelo menos uma porta, forçando uma escolha se necessário.
+        - Primeiro cava uma árvore geradora (busca em profundidade aleatória): toda sala
+          fica alcançável a partir de qualquer outra.
+        - Depois abre portas extras com probabilidade loop_chance, criando ciclos.
+        Usa só a grade de bytes e uma pilha de inteiros, então aguenta milhões de salas.
         """
-        for r in range(self.grid_rows):
-            for c in range(self.grid_cols):
-                # Herda a porta "up", se houver sala acima.
-                if r > 0:
-                    self.door_grid[r][c]["up"] = self.door_grid[r - 1][c]["down"]
-                # Herda a porta "left", se houver sala à esquerda.
-                if c > 0:
-                    self.door_grid[r][c]["left"] = self.door_grid[r][c - 1]["right"]
-
-                # Define porta "right" aleatoriamente se houver sala à direita.
-                if c < self.grid_cols - 1:
-                    self.door_grid[r][c]["right"] = random.choice([True, False])
-                else:
-                    self.door_grid[r][c]["right"] = False
-
-                # Define porta "down" aleatoriamente se houver sala abaixo.
-                if r < self.grid_rows - 1:
-                    self.door_grid[r][c]["down"] = random.choice([True, False])
-                else:
-                    self.door_grid[r][c]["down"] = False
-
-                # Garante que a sala tenha pelo menos uma porta.
-                if not any(self.door_grid[r][c].values()):
-                    possible = []
-                    if r > 0:
-                        possible.append("up")
-                    if r < self.grid_rows - 1:
-                        possible.append("down")
-                    if c > 0:
-                        possible.append("left")
-                    if c < self.grid_cols - 1:
-                        possible.append("right")
-                    if possible:
-                        forced = random.choice(possible)
-                        self.door_grid[r][c][forced] = True
-                        # Atualiza o vizinho se a porta for herdada.
-                        if forced == "up" and r > 0:
-                            self.door_grid[r - 1][c]["down"] = True
-                        if forced == "left" and c > 0:
-                            self.door_grid[r][c - 1]["right"] = True
+        rows, cols = self.grid_rows, self.grid_cols
+        total = rows * cols
+        grid = self.door_grid = bytearray(total)
+        if total == 0:
+            self.rooms_generated = True
+            return
+        rng = self.rng
+        randrange = rng.randrange
+
+        visited = bytearray(total)
+        start = randrange(total)
+        visited[start] = 1
+        stack = array("l", [start])
+        options = []
+        while stack:
+            cell = stack[-1]
+            c = cell % cols
+            options.clear()
+            if cell >= cols and not visited[cell - cols]:
+                options.append(DOOR_UP)
+            if cell + cols < total and not visited[cell + cols]:
+                options.append(DOOR_DOWN)
+            if c > 0 and not visited[cell - 1]:
+                options.append(DOOR_LEFT)
+            if c < cols - 1 and not visited[cell + 1]:
+                options.append(DOOR_RIGHT)
+            if not options:
+                stack.pop()
+                continue
+
+            bit = options[randrange(len(options))] if len(options) > 1 else options[0]
+            if bit == DOOR_UP:
+                neighbor = cell - cols
+            elif bit == DOOR_DOWN:
+                neighbor = cell + cols
+            elif bit == DOOR_LEFT:
+                neighbor = cell - 1
+            else:
+                neighbor = cell + 1
+            grid[cell] |= bit
+            grid[neighbor] |= OPPOSITE_BIT[bit]
+            visited[neighbor] = 1
+            stack.append(neighbor)
+
+        # Portas extras (ciclos): abre para a direita ou para baixo
+        if self.loop_chance > 0:
+            random_value = rng.random
+            chance = self.loop_chance
+            for cell in range(total):
+                if random_value() >= chance:
+                    continue
+                if random_value() < 0.5 and cell % cols < cols - 1:
+                    grid[cell] |= DOOR_RIGHT
+                    grid[cell + 1] |= DOOR_LEFT
+                elif cell + cols < total:
+                    grid[cell] |= DOOR_DOWN
+                    grid[cell + cols] |= DOOR_UP
+        self.rooms_generated = True
+
+    def doors(self, r, c):
+        """Portas da sala (r, c) como uma visão de dicionário (ver DoorView)."""
+        return DoorView(self.door_grid, r * self.grid_cols + c)
+
+    def open_neighbors(self, r, c):
+        """Salas vizinhas de (r, c) ligadas por porta: lista de (direção, r, c)."""
+        bits = self.door_grid[r * self.grid_cols + c]
+        return [
+            (direction, r + dr, c + dc)
+            for direction, (dr, dc) in DIRECTION_OFFSETS.items()
+            if bits & DOOR_BITS[direction]
+        ]
+
+    def has_room(self, r, c):
+        """Indica se (r, c) está dentro da grade do labirinto."""
+        return 0 <= r < self.grid_rows and 0 <= c < self.grid_cols
+
+    def room_seed(self, r, c):
+        """Semente da sala (r, c), derivada da semente do mapa."""
+        return f"{self.seed}:{r}:{c}"
+
+    def create_hall(self, r, c):
+        """
+        Cria e gera a sala (r, c). Como tudo vem da semente da sala, recriar uma
+        sala descartada produz exatamente o mesmo piso, muro e ornamentos.
+        """
+        if not self.rooms_generated:
+            self.generate_rooms()
+        rng = random.Random(self.room_seed(r, c))
+        hall = Hall(
+            width=20,    # 20 tiles horizontais
+            height=11,   # 11 tiles verticais
+            floor_type=rng.choice(FLOOR_TYPES),
+            wall_type=rng.choice(WALL_TYPES),
+            doors=self.doors(r, c),
+            wall_ornaments=["baum_tile"],
+            hall_type="room",
+            rng=rng
+        )
+        hall.generate()
+        stashed = self.stashed.pop((r, c), None)
+        if stashed is None and self.saved is not None:
+            stashed = self.saved.load_room(r, c)
+        if stashed is not None:
+            hall.entities, hall.last_simulated = stashed
+            hall.populated = True
+        return hall
+
+    def get_hall(self, r, c):
+        """
+        Devolve a sala (r, c), criando-a na primeira visita. Salas pouco usadas são
+        descartadas quando o limite max_resident_halls é ultrapassado.
+        """
+        key = (r, c)
+        hall = self.resident.get(key)
+        if hall is not None:
+            self.resident.move_to_end(key)
+            return hall
+        hall = self.resident[key] = self.create_hall(r, c)
+        self._evict()
+        return hall
+
+    def prefetch(self, r, c):
+        """Cria antecipadamente as salas vizinhas de (r, c) ligadas por porta."""
+        if not self.rooms_generated:
+            self.generate_rooms()
+        for _, nr, nc in self.open_neighbors(r, c):
+            if (nr, nc) not in self.resident:
+                self.resident[(nr, nc)] = self.create_hall(nr, nc)
+        self._evict()
+
+    def _evict(self):
+        """Descarta as salas menos usadas (que não estejam fixadas) até respeitar o limite."""
+        if self.max_resident_halls is None:
+            return
+        excess = len(self.resident) - self.max_resident_halls
+        if excess <= 0:
+            return
+        for key in list(self.resident):
+            if excess <= 0:
+                break
+            if key not in self.pinned:
+                hall = self.resident.pop(key)
+                if hall.populated:
+                    self.stashed[key] = (hall.entities, hall.last_simulated)
+                excess -= 1
 
     def build_halls(self):
         """
         Gera e retorna um dicionário de salas (instâncias de Hall) com chave "room_r_c" para cada sala.
-        Cada sala é construída com os parâmetros fixos (dimensões, configurações de portas, piso, muro e ornamentos).
+        Cria todas as salas de uma vez: serve para mapas pequenos; em mapas grandes use get_hall().
         """
         self.generate_rooms()
         halls = {}
-        floor_types = ["chess", "clay", "grass", "marble", "musg"]
-        wall_types = ["brick", "rock"]
-
         for r in range(self.grid_rows):
             for c in range(self.grid_cols):
-                doors = self.door_grid[r][c]
-                hall = Hall(
-                    width=20,    # 16 tiles horizontais
-                    height=11,   # 12 tiles verticais
-                    floor_type=random.choice(floor_types),
-                    wall_type=random.choice(wall_types),
-                    doors=doors,
-                    wall_ornaments=["baum_tile"],
-                    hall_type="room"
-                )
-                hall.generate()
-                key = f"room_{r}_{c}"
-                halls[key] = hall
+                halls[f"room_{r}_{c}"] = self.create_hall(r, c)
 
         return halls
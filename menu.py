@@ -1,6 +1,17 @@
-"""Menu Principal"""
+"""
+Menu Principal
+
+O menu é desenhado uma vez numa superfície própria e só é remontado quando
+algo muda (texto de um botão, botão sob o mouse, tamanho da tela). A cada
+quadro Menu.draw só copia essa superfície para a tela, e só se a tela não
+estiver já mostrando exatamente esse quadro; o valor devolvido diz se o
+quadro mudou.
+"""
+import pygame
 from pygame import Rect
 
+from text_cache import text_cache
+
 class Button:
     """Botões do Menu"""
     def __init__(self, x, y, width, height, text, callback):
@@ -10,19 +21,15 @@ class Button:
         self.height = height
         self.text = text
         self.callback = callback
+        self.hovered = False
 
-    def draw(self, screen):
-        """Desenha os botões"""
+    def draw(self, surface):
+        """Desenha o botão na superfície do menu"""
         rect = Rect((self.x, self.y), (self.width, self.height))
-        # O 'screen' será chamado diretamente dentro do método draw()
-        screen.draw.filled_rect(rect, "darkblue")
-        screen.draw.rect(rect, "white")
-        screen.draw.text(
-            self.text,
-            center=rect.center,
-            fontsize=24,
-            color="white"
-        )
+        pygame.draw.rect(surface, pygame.Color("mediumblue" if self.hovered else "darkblue"), rect)
+        pygame.draw.rect(surface, pygame.Color("white"), rect, 1)
+        # Texto renderizado uma vez só (muda apenas no botão da música)
+        text_cache.draw(surface, self.text, fontsize=24, color="white", center=rect.center)
 
     def is_hovered(self, pos):
         x, y = pos
@@ -36,9 +43,21 @@ class Menu:
         self.buttons = []
         self.initialize_buttons()
         self.music = music
+        # A música só começa depois que o menu aparece na tela (ver update)
+        self.music_started = False
+        self.drawn = False
+        # Superfície com o menu pronto; 'dirty' pede para remontá-la e
+        # 'presented' indica que a tela já mostra a superfície atual
+        self.surface = None
+        self.dirty = True
+        self.presented = False
 
-        # Toca a música de fundo em loop
+    def start_music(self):
+        """Toca a música de fundo em loop (pausada se o jogador já a desligou)."""
+        self.music_started = True
         self.music.play('background.wav')  # 'background.ogg' deve estar na pasta 'music/'
+        if not self.music_on:
+            self.music.pause()
 
     def initialize_buttons(self):
         button_width = 300
@@ -56,17 +75,47 @@ class Menu:
 
         self.buttons = [start_button, music_button, exit_button]
 
+    def invalidate(self):
+        """A tela foi usada por outra coisa (o jogo, o profiler): o menu precisa ser copiado de novo."""
+        self.presented = False
+
+    def compose(self, size):
+        """Monta o menu inteiro na superfície guardada."""
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+        self.surface.fill((0, 0, 0))
+        text_cache.draw(self.surface, "Menu Principal", fontsize=50, color="yellow", center=(400, 100))
+        for btn in self.buttons:
+            btn.draw(self.surface)
+        self.dirty = False
+        self.presented = False
+
     def draw(self, screen):
         """Função chamada no draw do main.py do PGZero
-            é chamada, portanto, constantemente (60x por segundo)"""
-        # 'screen' é utilizado dentro desta função, que será chamada no loop principal
-        screen.clear()
-        screen.draw.text("Menu Principal", center=(400, 100), fontsize=50, color="yellow")
-        for btn in self.buttons:
-            btn.draw(screen)
+            é chamada, portanto, constantemente (60x por segundo).
+            Devolve True se o quadro mudou; False se a tela já mostrava este menu."""
+        size = screen.surface.get_size()
+        if self.dirty or self.surface is None or self.surface.get_size() != size:
+            self.compose(size)
+        self.drawn = True
+        if self.presented:
+            return False
+        screen.blit(self.surface, (0, 0))
+        self.presented = True
+        return True
 
     def update(self):
-        pass
+        # Carregar e tocar a música atrasaria o primeiro quadro: só depois dele
+        if self.drawn and not self.music_started:
+            self.start_music()
+
+    def on_mouse_move(self, pos):
+        """Remonta o menu só quando o mouse entra ou sai de um botão."""
+        for btn in self.buttons:
+            hovered = btn.is_hovered(pos)
+            if hovered != btn.hovered:
+                btn.hovered = hovered
+                self.dirty = True
 
     def on_mouse_down(self, pos):
         for btn in self.buttons:
@@ -80,11 +129,14 @@ class Menu:
         """Liga e desliga a música"""
         self.music_on = not self.music_on
         if self.music_on:
-            self.music.unpause()
+            if self.music_started:
+                self.music.unpause()
             self.buttons[1].text = "Música e sons: ligados"
         else:
-            self.music.pause()
+            if self.music_started:
+                self.music.pause()
             self.buttons[1].text = "Música e sons: desligados"
+        self.dirty = True
 
     def exit_game(self):
         """Para a música ao sair do jogo"""
@@ -0,0 +1,249 @@
+"""
+Grade de navegação de cada sala: A*, campos de fluxo e faixas de patrulha
+
+Cada Hall tem uma NavGrid (Hall.navigation()), feita dos muros e portas da
+sala: uma célula por tile de 64x64, marcada como muro, piso ou porta.
+
+Consultas, todas em pixels (centro do Actor):
+  - find_path(início, destino): caminho de tiles por A* (4 vizinhos);
+  - flow_field(destino): para cada tile, qual o próximo tile em direção ao
+    destino (uma busca em largura a partir do destino). Várias peças que
+    perseguem o mesmo alvo usam o mesmo campo, em vez de cada uma buscar
+    seu caminho;
+  - patrol_limits(x, y): até onde uma peça que patrulha pode ir em cada eixo
+    sem entrar num muro ou numa porta.
+
+Caminhos e campos ficam em cache (LRU) por sala e por tile de destino. Se a
+grade mudar (set_cell), os caches são descartados.
+"""
+import heapq
+from array import array
+from collections import OrderedDict
+
+TILE = 64
+# Conteúdo de cada célula da grade
+WALL, FLOOR, DOOR = 0, 1, 2
+# Quantos caminhos e campos de fluxo cada sala guarda
+MAX_CACHED_PATHS = 256
+MAX_CACHED_FLOWS = 16
+
+
+class FlowField:
+    """Próximo tile em direção ao destino, para cada tile da sala"""
+    __slots__ = ("grid", "target", "distance", "next_cell")
+
+    def __init__(self, grid, target, distance, next_cell):
+        self.grid = grid
+        self.target = target            # Índice do tile de destino
+        self.distance = distance        # Passos até o destino (-1 = inalcançável)
+        self.next_cell = next_cell      # Índice do próximo tile (-1 = destino ou inalcançável)
+
+    def next_waypoint(self, x, y):
+        """
+        Centro (em pixels) do próximo tile a partir da posição (x, y); None se
+        a posição já está no tile de destino ou não há caminho até ele.
+        """
+        cell = self.grid.cell_at(x, y)
+        if cell is None:
+            return None
+        step = self.next_cell[cell]
+        if step < 0:
+            return None
+        return self.grid.center(step)
+
+    def reachable(self, x, y):
+        cell = self.grid.cell_at(x, y)
+        return cell is not None and self.distance[cell] >= 0
+
+
+class NavGrid:
+    """Grade de tiles de uma sala com as consultas de caminho em cache"""
+    def __init__(self, width, height, cells):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(cells)
+        self.version = 0
+        self._paths = OrderedDict()     # (início, destino) -> tupla de índices
+        self._flows = OrderedDict()     # destino -> FlowField
+        self._wall_mask = None
+
+    @classmethod
+    def from_hall(cls, hall):
+        """Grade de uma sala: muros e portas vêm das listas do Hall, o resto é piso."""
+        cells = bytearray([FLOOR]) * (hall.width * hall.height)
+        for wall in hall.walls:
+            x, y = wall["position"]
+            cells[(y // TILE) * hall.width + x // TILE] = WALL
+        for door in hall.door_actors:
+            cells[int(door.y // TILE) * hall.width + int(door.x // TILE)] = DOOR
+        return cls(hall.width, hall.height, cells)
+
+    # -----------------------------
+    # Tiles e pixels
+    # -----------------------------
+    def cell_at(self, x, y):
+        """Índice do tile que contém o ponto (x, y); None fora da sala."""
+        tx, ty = int(x // TILE), int(y // TILE)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return ty * self.width + tx
+        return None
+
+    def center(self, cell):
+        """Centro, em pixels, do tile 'cell'."""
+        ty, tx = divmod(cell, self.width)
+        return (tx * TILE + TILE // 2, ty * TILE + TILE // 2)
+
+    def walkable(self, cell):
+        return cell is not None and self.cells[cell] != WALL
+
+    def neighbors(self, cell):
+        """Tiles vizinhos (4 direções) que não são muro."""
+        width, cells = self.width, self.cells
+        tx = cell % width
+        if cell >= width and cells[cell - width] != WALL:
+            yield cell - width
+        if cell + width < len(cells) and cells[cell + width] != WALL:
+            yield cell + width
+        if tx > 0 and cells[cell - 1] != WALL:
+            yield cell - 1
+        if tx < width - 1 and cells[cell + 1] != WALL:
+            yield cell + 1
+
+    def wall_mask(self):
+        """Muros como bitboard: bit 'índice do tile' ligado em cada muro (ver chess_moves.py)."""
+        if self._wall_mask is None:
+            mask = 0
+            for cell, value in enumerate(self.cells):
+                if value == WALL:
+                    mask |= 1 << cell
+            self._wall_mask = mask
+        return self._wall_mask
+
+    def set_cell(self, tx, ty, value):
+        """Muda um tile (ex.: uma porta que fecha) e descarta os caminhos e campos em cache."""
+        self.cells[ty * self.width + tx] = value
+        self.version += 1
+        self._wall_mask = None
+        self._paths.clear()
+        self._flows.clear()
+
+    # -----------------------------
+    # Consultas
+    # -----------------------------
+    def find_path(self, start, goal):
+        """
+        Caminho (lista de centros de tiles, em pixels) de 'start' até 'goal',
+        sem o tile de partida; [] se já estiver no destino, None se não houver caminho.
+        """
+        start_cell, goal_cell = self.cell_at(*start), self.cell_at(*goal)
+        if not self.walkable(start_cell) or not self.walkable(goal_cell):
+            return None
+        key = (start_cell, goal_cell)
+        cells = self._paths.get(key)
+        if cells is None:
+            if key in self._paths:
+                return None     # Já se sabe que não há caminho
+            cells = self._astar(start_cell, goal_cell)
+            self._paths[key] = cells
+            if len(self._paths) > MAX_CACHED_PATHS:
+                self._paths.popitem(last=False)
+            if cells is None:
+                return None
+        else:
+            self._paths.move_to_end(key)
+        return [self.center(cell) for cell in cells]
+
+    def _astar(self, start, goal):
+        width = self.width
+        gx, gy = goal % width, goal // width
+        came_from = {start: None}
+        cost = {start: 0}
+        frontier = [(0, start)]
+        while frontier:
+            _, cell = heapq.heappop(frontier)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = came_from[cell]
+                return tuple(reversed(path))
+            new_cost = cost[cell] + 1
+            for neighbor in self.neighbors(cell):
+                if new_cost < cost.get(neighbor, new_cost + 1):
+                    cost[neighbor] = new_cost
+                    came_from[neighbor] = cell
+                    # Heurística: distância de Manhattan até o destino
+                    estimate = new_cost + abs(neighbor % width - gx) + abs(neighbor // width - gy)
+                    heapq.heappush(frontier, (estimate, neighbor))
+        return None
+
+    def flow_field(self, target):
+        """Campo de fluxo até o tile que contém 'target' (em pixels); None se for muro ou fora da sala."""
+        goal = self.cell_at(*target)
+        if not self.walkable(goal):
+            return None
+        flow = self._flows.get(goal)
+        if flow is not None:
+            self._flows.move_to_end(goal)
+            return flow
+        flow = self._flows[goal] = self._build_flow(goal)
+        if len(self._flows) > MAX_CACHED_FLOWS:
+            self._flows.popitem(last=False)
+        return flow
+
+    def _build_flow(self, goal):
+        """Busca em largura a partir do destino; cada tile aponta para o vizinho mais perto dele."""
+        total = len(self.cells)
+        distance = array("i", [-1]) * total
+        next_cell = array("i", [-1]) * total
+        distance[goal] = 0
+        queue = [goal]
+        for cell in queue:     # A lista cresce durante o laço: é a fila da busca em largura
+            step = distance[cell] + 1
+            for neighbor in self.neighbors(cell):
+                if distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    next_cell[neighbor] = cell
+                    queue.append(neighbor)
+        return FlowField(self, goal, distance, next_cell)
+
+    def patrol_limits(self, x, y):
+        """
+        Limites do vai e vem a partir de (x, y): {"horizontal": (x mín., x máx.),
+        "vertical": (y mín., y máx.)}, dos centros dos tiles de piso mais
+        distantes em linha reta (muros e portas interrompem a faixa).
+        """
+        cell = self.cell_at(x, y)
+        if cell is None or self.cells[cell] != FLOOR:
+            cell = self._nearest_floor(x, y)
+            if cell is None:
+                return {"horizontal": (x, x), "vertical": (y, y)}
+        width, cells = self.width, self.cells
+        ty, tx = divmod(cell, width)
+        left = right = tx
+        while left > 0 and cells[ty * width + left - 1] == FLOOR:
+            left -= 1
+        while right < width - 1 and cells[ty * width + right + 1] == FLOOR:
+            right += 1
+        top = bottom = ty
+        while top > 0 and cells[(top - 1) * width + tx] == FLOOR:
+            top -= 1
+        while bottom < self.height - 1 and cells[(bottom + 1) * width + tx] == FLOOR:
+            bottom += 1
+        half = TILE // 2
+        return {
+            "horizontal": (left * TILE + half, right * TILE + half),
+            "vertical": (top * TILE + half, bottom * TILE + half),
+        }
+
+    def _nearest_floor(self, x, y):
+        """Tile de piso mais perto de (x, y) (para peças que estão fora do piso)."""
+        best, best_distance = None, None
+        for cell, value in enumerate(self.cells):
+            if value != FLOOR:
+                continue
+            cx, cy = self.center(cell)
+            d = (cx - x) ** 2 + (cy - y) ** 2
+            if best_distance is None or d < best_distance:
+                best, best_distance = cell, d
+        return best
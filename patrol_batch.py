@@ -0,0 +1,144 @@
+"""
+Atualização em lote das peças que patrulham (PieceAndante e MovingPiece)
+
+Em vez de cada peça rodar o próprio update_position, o PatrolBatch guarda
+posição, eixo, sentido, velocidade e limites de todas elas em arrays do
+NumPy e avança todas de uma vez com operações vetorizadas. O lote só tem as
+peças da sala atual (o World tira as de uma sala quando ela adormece), e o
+sync copia o estado de todas para os Actors a cada tick: as colisões e os
+contatos usam a posição do Actor. remove devolve o estado à peça.
+
+O NumPy é opcional: sem ele, numpy_available() devolve False e o World
+continua atualizando cada peça individualmente.
+"""
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy: o World usa o caminho peça a peça
+    np = None
+
+from chess_pieces import MovingPiece, PieceAndante, FRAME_TIME
+
+# Tipos de peça que o lote sabe atualizar
+PATROL_TYPES = (MovingPiece, PieceAndante)
+
+AXIS = {"horizontal": 0, "vertical": 1}
+# Direção do sprite para (eixo, indo para frente?)
+FACING = {(0, True): "right", (0, False): "left", (1, True): "down", (1, False): "up"}
+
+
+def numpy_available():
+    return np is not None
+
+
+class PatrolBatch:
+    """Estado das peças que patrulham, em arrays (uma posição por peça)"""
+    def __init__(self, capacity=64):
+        if np is None:
+            raise RuntimeError("PatrolBatch precisa do NumPy (pip install numpy).")
+        self.count = 0
+        self.pieces = []    # peça na posição i dos arrays
+        self.index = {}     # peça -> i
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Cria (ou aumenta) os arrays mantendo as peças já registradas."""
+        old = self.count
+        arrays = {
+            "pos": np.zeros((capacity, 2), dtype=np.float64),
+            "axis": np.zeros(capacity, dtype=np.intp),
+            "forward": np.zeros(capacity, dtype=bool),
+            "speed": np.zeros(capacity, dtype=np.float64),
+            "low": np.zeros(capacity, dtype=np.float64),
+            "high": np.zeros(capacity, dtype=np.float64),
+            "faces": np.zeros(capacity, dtype=bool),
+        }
+        for name, array in arrays.items():
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+
+    def __contains__(self, piece):
+        return piece in self.index
+
+    def __len__(self):
+        return self.count
+
+    def add(self, piece, speed):
+        """
+        Registra a peça, copiando para os arrays o estado atual dela.
+        'speed' é a velocidade da patrulha em pixels por segundo.
+        """
+        if piece in self.index:
+            return
+        if self.count == len(self.speed):
+            self._allocate(len(self.speed) * 2)
+        i = self.count
+        self.count += 1
+        self.pieces.append(piece)
+        self.index[piece] = i
+
+        self.pos[i] = (piece.actor.x, piece.actor.y)
+        self.axis[i] = AXIS[piece.direction]
+        self.forward[i] = piece.moving_forward
+        self.speed[i] = speed
+        self.low[i], self.high[i] = piece.patrol_limits[piece.direction]
+        # PieceAndante vira o sprite para onde anda e anima ao andar; MovingPiece não
+        self.faces[i] = isinstance(piece, PieceAndante)
+
+    def remove(self, piece):
+        """Tira a peça do lote, devolvendo a ela a posição e o sentido atuais."""
+        i = self.index.pop(piece, None)
+        if i is None:
+            return
+        self._write_back(i)
+        last = self.count - 1
+        if i != last:
+            # Move a última peça para o buraco deixado
+            moved = self.pieces[last]
+            self.pieces[i] = moved
+            self.index[moved] = i
+            for name in ("pos", "axis", "forward", "speed", "low", "high", "faces"):
+                array = getattr(self, name)
+                array[i] = array[last]
+        self.pieces.pop()
+        self.count = last
+
+    def _write_back(self, i):
+        piece = self.pieces[i]
+        piece.actor.pos = (float(self.pos[i, 0]), float(self.pos[i, 1]))
+        piece.moving_forward = bool(self.forward[i])
+        if self.faces[i]:
+            piece.current_direction = FACING[(int(self.axis[i]), piece.moving_forward)]
+
+    def step(self, dt=FRAME_TIME):
+        """
+        Avança todas as peças de uma vez: anda 'speed * dt' pixels no eixo
+        da patrulha e inverte o sentido de quem passou do limite (mesma regra
+        do update_position de cada peça).
+        """
+        n = self.count
+        if not n:
+            return
+        rows = np.arange(n)
+        axis = self.axis[:n]
+        forward = self.forward[:n]
+        coord = self.pos[rows, axis] + np.where(forward, self.speed[:n], -self.speed[:n]) * dt
+        self.pos[rows, axis] = coord
+        self.forward[:n] = np.where(forward, coord <= self.high[:n], coord < self.low[:n])
+
+    def sync(self, dt=FRAME_TIME):
+        """Copia o estado dos arrays para os Actors e anima as peças que viram o sprite ao andar."""
+        n = self.count
+        if not n:
+            return
+        positions = self.pos[:n].tolist()
+        axes = self.axis[:n].tolist()
+        forwards = self.forward[:n].tolist()
+        faces = self.faces[:n].tolist()
+        for i, piece in enumerate(self.pieces):
+            piece.actor.pos = positions[i]
+            piece.moving_forward = forwards[i]
+            if faces[i]:
+                piece.moving = True
+                piece.current_direction = FACING[(axes[i], forwards[i])]
+                piece.animate_sprite(dt)
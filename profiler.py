@@ -0,0 +1,140 @@
+"""
+Medição do tempo gasto em cada fase do frame
+
+O World (e o main.py) envolvem cada fase com 'profiler.phase("nome")'.
+Por padrão usa-se o NULL_PROFILER, que não mede nada; o FrameProfiler só é
+criado quando o jogo roda com a variável de ambiente ROGUELIKE_PROFILE=1
+(ou headless.py --profile). Ele guarda os últimos N tempos de cada fase e
+calcula percentis, que podem ser mostrados na tela (draw_overlay) ou
+gravados em JSON (dump).
+"""
+import json
+import os
+import time
+from collections import deque
+
+# Fases na ordem em que acontecem no frame (outras são aceitas e vão para o fim)
+PHASES = (
+    "input",
+    "active_piece",
+    "idle",
+    "npcs",
+    "fights",
+    "contacts",
+    "doors",
+    "animation",
+    "tick",
+    "room_draw",
+    "hud",
+    "pieces_draw",
+    "draw",
+)
+
+
+class _PhaseTimer:
+    """Context manager reutilizável que mede uma fase"""
+    __slots__ = ("samples", "start")
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+
+class _NoTimer:
+    """Context manager que não faz nada (profiler desligado)"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler:
+    """Profiler desligado: custo praticamente zero"""
+    enabled = False
+    _timer = _NoTimer()
+
+    def phase(self, name):
+        return self._timer
+
+    def draw_overlay(self, screen):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """Tempos das fases do frame, numa janela dos últimos 'window' frames"""
+    enabled = True
+
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {}
+        self._timers = {}
+        self.show_overlay = True
+
+    def phase(self, name):
+        timer = self._timers.get(name)
+        if timer is None:
+            self.samples[name] = deque(maxlen=self.window)
+            timer = self._timers[name] = _PhaseTimer(self.samples[name])
+        return timer
+
+    @staticmethod
+    def _percentile(ordered, q):
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """Dicionário fase -> {p50, p95, p99, max, mean} em milissegundos."""
+        order = {name: i for i, name in enumerate(PHASES)}
+        result = {}
+        for name in sorted(self.samples, key=lambda n: order.get(n, len(order))):
+            values = self.samples[name]
+            if not values:
+                continue
+            ordered = sorted(values)
+            result[name] = {
+                "p50": self._percentile(ordered, 50) * 1e3,
+                "p95": self._percentile(ordered, 95) * 1e3,
+                "p99": self._percentile(ordered, 99) * 1e3,
+                "max": ordered[-1] * 1e3,
+                "mean": sum(ordered) / len(ordered) * 1e3,
+                "samples": len(ordered),
+            }
+        return result
+
+    def dump(self, path):
+        """Grava o resumo atual em JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Perfil gravado em {path}")
+
+    def draw_overlay(self, screen, topleft=(10, 80)):
+        """Mostra os percentis de cada fase no canto da tela."""
+        if not self.show_overlay:
+            return
+        x, y = topleft
+        screen.draw.text("fase          p50    p95    p99 (ms)", topleft=(x, y), fontsize=20, color="white")
+        for name, stats in self.summary().items():
+            y += 18
+            line = f"{name:12s} {stats['p50']:6.2f} {stats['p95']:6.2f} {stats['p99']:6.2f}"
+            screen.draw.text(line, topleft=(x, y), fontsize=20, color="white")
+
+
+def profiler_from_env():
+    """FrameProfiler se ROGUELIKE_PROFILE estiver ligado, senão o NULL_PROFILER."""
+    if os.environ.get("ROGUELIKE_PROFILE", "") not in ("", "0"):
+        return FrameProfiler()
+    return NULL_PROFILER
@@ -0,0 +1,269 @@
+#!/usr/bin/python
+"""
+Gravação e reprodução determinística de partidas
+
+Uma partida é definida pelo estado inicial e pela entrada de cada tick: a
+semente do mapa (ou, se o jogo começou de um jogo salvo, o próprio arquivo
+salvo), o tamanho do mapa e da tela, se o modo tático estava ligado, a
+frequência da lógica e um byte por tick com as teclas pressionadas. Todos
+os sorteios da simulação vêm de geradores derivados da semente (World.rng
+e as sementes das salas), então a mesma gravação produz sempre a mesma
+partida.
+
+A cada CHECKPOINT_TICKS ticks o gravador guarda um hash do estado do mundo
+(state_hash). A reprodução roda sem janela e sem limite de velocidade e
+confere os hashes: a primeira divergência mostra em que trecho a simulação
+deixou de ser igual (uma mudança de comportamento, ou um sorteio fora dos
+geradores do mundo). Assim uma partida real vira carga de teste de
+desempenho e de regressão.
+
+Gravar:
+    ROGUELIKE_RECORD=partida.rec python main.py
+    python headless.py --ticks 10000 --random --record partida.rec
+Reproduzir:
+    python replay.py partida.rec
+    python replay.py partida.rec --profile profile.json
+
+Formato (little-endian):
+    MAGIC | versão (uint16) | HEADER | semente | jogo salvo (tamanho + bytes,
+    vazio se a partida começou do zero) | entrada (tamanho + zlib, um byte
+    por tick) | pontos de conferência (quantidade + CHECKPOINT cada)
+"""
+import argparse
+import atexit
+import hashlib
+import struct
+import time
+import zlib
+
+from world import Controls, LOGIC_HZ, THINK_NODES
+
+MAGIC = b"RGLREC1\0"
+# A 2 passou a conferir também a Timeline de cada peça (os pontos da 1 não batem mais);
+# a 3 guarda no HEADER se o modo tático estava ligado
+VERSION = 3
+# Ticks entre dois pontos de conferência (10 s a 60 Hz)
+CHECKPOINT_TICKS = 600
+
+# Linhas, colunas, largura, altura, patrulhas em lote (0/1), modo tático (0/1) e ticks por segundo
+HEADER = struct.Struct("<IIIIBBd")
+# Tick e hash do estado naquele tick
+CHECKPOINT = struct.Struct("<Q8s")
+COUNT = struct.Struct("<I")
+
+# Um bit por tecla no byte de entrada de cada tick
+INPUT_BITS = (("left", 1), ("right", 2), ("up", 4), ("down", 8), ("tab", 16))
+# Controls de cada byte possível (a reprodução não cria objetos por tick)
+CONTROLS_BY_MASK = tuple(
+    Controls(**{name: bool(mask & bit) for name, bit in INPUT_BITS}) for mask in range(32)
+)
+
+
+class ReplayMismatch(Exception):
+    """A reprodução chegou a um estado diferente do gravado."""
+
+
+def input_mask(controls):
+    """Byte com as teclas pressionadas (Controls ou o 'keyboard' do PGZero)."""
+    mask = 0
+    for name, bit in INPUT_BITS:
+        if getattr(controls, name):
+            mask |= bit
+    return mask
+
+
+def goal_state(piece):
+    """Destino do lance em andamento como floats (do arquivo ele volta como float)."""
+    goal = getattr(piece, "goal", None)
+    return None if goal is None else (float(goal[0]), float(goal[1]))
+
+
+def state_hash(world):
+    """
+    Hash (8 bytes) do estado que a simulação usa: tempo, sala, transição,
+    peças do jogador e da sala atual (e os lances do modo tático em andamento),
+    lutas e perseguidores entre salas. Floats entram com todos os bits.
+    """
+    from savegame import piece_state
+
+    state = (
+        world.ticks, world.time, world.current_r, world.current_c, world.active_piece_index,
+        float(world.switch_delay), world.transition_active, float(world.transition_progress),
+        [piece_state(piece) for piece in world.active_pieces],
+        [piece_state(piece) for piece in world.pieces],
+        [(fight.winner.kind, fight.loser.kind, fight.current_frame, fight.animation_timer) for fight in world.fights],
+        [(pursuer.piece.kind, pursuer.r, pursuer.c, pursuer.side, pursuer.next_move) for pursuer in world.pursuers],
+        [goal_state(piece) for piece in world.pieces],
+    )
+    return hashlib.blake2b(repr(state).encode("utf-8"), digest_size=8).digest()
+
+
+class Recorder:
+    """
+    Grava a entrada de cada tick de um World. Tem o mesmo tick() do World,
+    então entra no lugar dele no FixedStepLoop ou no headless.run.
+    Pode ser criado a qualquer momento: se o mundo já rodou (ou veio de um
+    jogo salvo), a gravação leva junto o estado completo dele (ver savegame)
+    e a reprodução começa desse ponto.
+    """
+    def __init__(self, world, hz=LOGIC_HZ, checkpoint_ticks=CHECKPOINT_TICKS):
+        from savegame import encode, take_snapshot
+
+        self.world = world
+        self.hz = hz
+        self.checkpoint_ticks = checkpoint_ticks
+        self.inputs = bytearray()
+        self.checkpoints = []
+        # O modo tático passa a ter orçamento em nós: com orçamento em tempo, o lance
+        # escolhido dependeria da velocidade da máquina e a reprodução divergiria
+        world.think_nodes = THINK_NODES
+        if world.ai_jobs is not None:
+            # Respostas pedidas antes da gravação não são aplicadas (e a reprodução não as teria)
+            world.ai_jobs.cancel_all()
+        # Mundo que já rodou ou veio de um jogo salvo: a gravação leva junto o jogo salvo
+        # do instante atual (gerador aleatório, Timelines, lutas, contatos...), que a
+        # reprodução carrega antes do primeiro tick gravado
+        fresh = world.ticks == 0 and world.map_manager.saved is None
+        self.initial_save = b"" if fresh else encode(take_snapshot(world))
+
+    def tick(self, controls, dt):
+        self.inputs.append(input_mask(controls))
+        self.world.tick(controls, dt)
+        if len(self.inputs) % self.checkpoint_ticks == 0:
+            self.checkpoints.append((len(self.inputs), state_hash(self.world)))
+
+    def encode(self):
+        from savegame import pack_seed
+
+        world = self.world
+        header = HEADER.pack(
+            world.map_manager.grid_rows, world.map_manager.grid_cols, world.width, world.height,
+            world.patrols is not None, world.tactical, self.hz,
+        )
+        inputs = zlib.compress(bytes(self.inputs))
+        return b"".join([
+            MAGIC, struct.pack("<H", VERSION), header, pack_seed(world.map_manager.seed),
+            COUNT.pack(len(self.initial_save)), self.initial_save,
+            COUNT.pack(len(inputs)), inputs,
+            COUNT.pack(len(self.checkpoints)),
+            *(CHECKPOINT.pack(tick, digest) for tick, digest in self.checkpoints),
+        ])
+
+    def save(self, path):
+        from savegame import write_file
+
+        write_file(path, self.encode())
+        return len(self.inputs)
+
+    def save_at_exit(self, path):
+        """Grava a partida quando o processo terminar (a janela do PGZero não avisa antes de fechar)."""
+        atexit.register(lambda: print(f"Partida gravada em {path}: {self.save(path)} ticks"))
+
+
+class Recording:
+    """Partida gravada, lida do disco"""
+    def __init__(self, data):
+        from savegame import unpack_seed
+
+        view = memoryview(data)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Arquivo não é uma partida gravada (assinatura inválida).")
+        offset = len(MAGIC)
+        (version,) = struct.unpack_from("<H", view, offset)
+        if version != VERSION:
+            raise ValueError(f"Versão {version} da gravação não é suportada (esperada: {VERSION}).")
+        offset += 2
+        self.rows, self.cols, self.width, self.height, batch, tactical, self.hz = HEADER.unpack_from(view, offset)
+        self.batch_patrols = bool(batch)
+        self.tactical = bool(tactical)
+        offset += HEADER.size
+        self.seed, offset = unpack_seed(view, offset)
+        (size,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        self.initial_save = bytes(view[offset:offset + size])
+        offset += size
+        (size,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        self.inputs = zlib.decompress(view[offset:offset + size])
+        offset += size
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        self.checkpoints = list(CHECKPOINT.iter_unpack(view[offset:offset + count * CHECKPOINT.size]))
+
+    @classmethod
+    def read(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def build_world(self, profiler=None):
+        """O mundo no estado em que a gravação começou."""
+        from profiler import NULL_PROFILER
+        from savegame import SaveFile
+        from world import World
+
+        options = dict(width=self.width, height=self.height, profiler=profiler or NULL_PROFILER,
+                       batch_patrols=self.batch_patrols, tactical=self.tactical, think_nodes=THINK_NODES)
+        if not self.initial_save:
+            return World(grid_rows=self.rows, grid_cols=self.cols, seed=self.seed, **options)
+        saved = SaveFile(self.initial_save)
+        world = World(grid_rows=saved.rows, grid_cols=saved.cols, seed=saved.seed, **options)
+        saved.restore(world)
+        return world
+
+
+def replay(recording, world=None, check=True):
+    """
+    Reproduz a gravação o mais rápido possível. Com 'check', confere cada
+    ponto de conferência e lança ReplayMismatch na primeira divergência.
+    Devolve (world, tempo gasto em segundos).
+    """
+    if world is None:
+        world = recording.build_world()
+    checkpoints = dict(recording.checkpoints) if check else {}
+    tick = world.tick
+    dt = 1 / recording.hz
+    controls_by_mask = CONTROLS_BY_MASK
+    last_match = 0
+    start = time.perf_counter()
+    for number, mask in enumerate(recording.inputs, 1):
+        tick(controls_by_mask[mask], dt)
+        expected = checkpoints.get(number)
+        if expected is not None:
+            if state_hash(world) != expected:
+                raise ReplayMismatch(f"Estado diferente do gravado no tick {number} "
+                                     f"(último ponto igual: tick {last_match}).")
+            last_match = number
+    return world, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz uma partida gravada, sem janela e na velocidade máxima.")
+    parser.add_argument("path", help="Arquivo da partida (ver ROGUELIKE_RECORD e headless.py --record).")
+    parser.add_argument("--no-check", action="store_true", help="Não confere os hashes de estado.")
+    parser.add_argument("--profile", metavar="ARQUIVO", help="Mede as fases do tick e grava os percentis neste JSON.")
+    args = parser.parse_args()
+
+    from headless import init_headless
+    from profiler import FrameProfiler
+
+    init_headless()
+    recording = Recording.read(args.path)
+    profiler = FrameProfiler(window=len(recording.inputs)) if args.profile else None
+    world = recording.build_world(profiler)
+    try:
+        world, elapsed = replay(recording, world, check=not args.no_check)
+    except ReplayMismatch as error:
+        print(f"Divergência: {error}")
+        return 1
+    ticks = len(recording.inputs)
+    rate = ticks / elapsed if elapsed else float("inf")
+    checked = "sem conferência" if args.no_check else f"{len(recording.checkpoints)} pontos de conferência iguais"
+    print(f"{ticks} ticks em {elapsed:.3f}s ({rate:.0f} ticks/s, {ticks / recording.hz / elapsed:.0f}x o tempo real); "
+          f"{checked}. Sala final: room_{world.current_r}_{world.current_c}")
+    if args.profile:
+        profiler.dump(args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""
+Índice de distâncias do grafo de salas
+
+As salas são nós e as portas (bits da MapManager.door_grid) são arestas. Para
+perseguir o herói pelo labirinto, uma peça só precisa saber, na sala em que
+está, por qual porta sair: RoomGraph.next_hop responde isso com uma leitura
+num array.
+
+Para cada sala de destino é feita uma única busca em largura a partir dela,
+que grava a distância de todas as salas até o destino e a porta que cada
+uma usa para se aproximar. O resultado fica em cache (LRU, por destino) e é
+compartilhado por todas as peças que vão para a mesma sala; como todas
+perseguem o herói, há no máximo uma busca por troca de sala do herói, e
+nenhuma por peça ou por tick.
+"""
+from array import array
+from collections import OrderedDict
+
+from map_manager import DOOR_UP, DOOR_DOWN, DOOR_LEFT, DOOR_RIGHT
+
+# Quantas salas de destino ficam em cache
+MAX_CACHED_TARGETS = 16
+BIT_DIRECTIONS = {DOOR_UP: "up", DOOR_DOWN: "down", DOOR_LEFT: "left", DOOR_RIGHT: "right"}
+# Quem sai de uma sala por uma porta entra na vizinha pela parede oposta
+OPPOSITE_SIDE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+
+class DistanceMap:
+    """Resultado da busca a partir de uma sala de destino"""
+    __slots__ = ("target", "distance", "hop")
+
+    def __init__(self, target, distance, hop):
+        self.target = target        # Índice da sala de destino (r * colunas + c)
+        self.distance = distance    # Portas até o destino (-1 = inalcançável)
+        self.hop = hop              # Bit DOOR_* da porta a usar em cada sala (0 = destino/inalcançável)
+
+
+class RoomGraph:
+    """Próxima porta e distância entre salas, com uma busca em cache por sala de destino"""
+    def __init__(self, map_manager, max_targets=MAX_CACHED_TARGETS):
+        self.map_manager = map_manager
+        self.max_targets = max_targets
+        self._maps = OrderedDict()  # índice da sala de destino -> DistanceMap
+        self.searches = 0           # Quantas buscas foram feitas (as demais vieram do cache)
+
+    def invalidate(self):
+        """A grade de portas mudou (ex.: jogo carregado): as buscas antigas não valem mais."""
+        self._maps.clear()
+
+    def distances_to(self, r, c):
+        """DistanceMap até a sala (r, c) (do cache, ou uma busca em largura)."""
+        target = r * self.map_manager.grid_cols + c
+        found = self._maps.get(target)
+        if found is not None:
+            self._maps.move_to_end(target)
+            return found
+        found = self._maps[target] = self._search(target)
+        if len(self._maps) > self.max_targets:
+            self._maps.popitem(last=False)
+        return found
+
+    def _search(self, target):
+        """Busca em largura a partir do destino, direto nos bits da grade de portas."""
+        self.searches += 1
+        if not self.map_manager.rooms_generated:
+            self.map_manager.generate_rooms()
+        grid = self.map_manager.door_grid
+        cols = self.map_manager.grid_cols
+        total = len(grid)
+        distance = array("i", [-1]) * total
+        hop = bytearray(total)
+        distance[target] = 0
+        queue = array("l", [target])
+        head = 0
+        while head < len(queue):
+            cell = queue[head]
+            head += 1
+            bits = grid[cell]
+            step = distance[cell] + 1
+            # Para cada porta de 'cell', o vizinho do outro lado chega a 'cell' pela porta oposta
+            if bits & DOOR_UP:
+                neighbor = cell - cols
+                if distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    hop[neighbor] = DOOR_DOWN
+                    queue.append(neighbor)
+            if bits & DOOR_DOWN:
+                neighbor = cell + cols
+                if distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    hop[neighbor] = DOOR_UP
+                    queue.append(neighbor)
+            if bits & DOOR_LEFT:
+                neighbor = cell - 1
+                if distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    hop[neighbor] = DOOR_RIGHT
+                    queue.append(neighbor)
+            if bits & DOOR_RIGHT:
+                neighbor = cell + 1
+                if distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    hop[neighbor] = DOOR_LEFT
+                    queue.append(neighbor)
+        return DistanceMap(target, distance, hop)
+
+    def next_hop(self, r, c, target_r, target_c):
+        """
+        Porta ("up", "down", "left" ou "right") que leva da sala (r, c) um passo
+        mais perto de (target_r, target_c); None se já estiver lá ou não houver caminho.
+        """
+        bit = self.distances_to(target_r, target_c).hop[r * self.map_manager.grid_cols + c]
+        return BIT_DIRECTIONS.get(bit)
+
+    def distance(self, r, c, target_r, target_c):
+        """Quantas portas separam as duas salas (-1 se não houver caminho)."""
+        return self.distances_to(target_r, target_c).distance[r * self.map_manager.grid_cols + c]
+
@@ -0,0 +1,720 @@
+#!/usr/bin/python
+"""
+Jogo salvo: estado completo do mundo num arquivo binário compacto
+
+O que é gravado:
+  - a semente e o tamanho do mapa, a grade de portas (um byte por sala),
+    a sala inicial e a atual, o tempo do mundo;
+  - as peças controladas pelo jogador;
+  - as peças de cada sala já visitada (o piso, os muros e os ornamentos não:
+    são recriados pela semente da sala, ver MapManager.create_hall);
+  - as lutas em andamento;
+  - os lances do modo tático em andamento (destino de cada ThinkingPiece);
+  - os pares de peças que já estavam se encostando, os perseguidores entre
+    salas, o estado do gerador aleatório do mundo e a transição entre salas
+    em andamento.
+
+Ao carregar, só o cabeçalho, a grade e a sala atual são decodificados. As
+peças das outras salas ficam como bytes e viram objetos apenas quando a sala
+é criada de novo (MapManager.saved); se o jogo for salvo antes disso, esses
+bytes são copiados direto para o novo arquivo.
+
+Salvamento automático (Autosaver): na thread principal só é tirada uma cópia
+do estado em tuplas de números e textos (snapshot); montar os bytes e gravar
+o arquivo acontece numa thread em segundo plano, enquanto o jogo segue. O
+arquivo é gravado num temporário e trocado de uma vez (os.replace), então
+uma queda no meio do salvamento não estraga o jogo salvo anterior.
+
+A Timeline de cada peça (sequência, frame exibido e tempo decorrido) também
+é gravada: uma rotação ou um passo no meio continua de onde parou, e o jogo
+carregado segue exatamente como seguiria o jogo salvo (o replay.py depende
+disso para gravar partidas que já começaram).
+
+Formato (little-endian):
+    MAGIC | versão (uint16) | HEADER | semente | nomes | grade de portas |
+    peças do jogador | índice das salas | lutas | lances | contatos |
+    perseguidores | gerador aleatório | transição | peças das salas
+Ver HEADER, PIECE e os demais struct abaixo.
+
+Uso:
+    python savegame.py info savegame.dat
+"""
+import argparse
+import math
+import os
+import struct
+import threading
+import time
+from itertools import chain
+
+from chess_pieces import (Piece, StaticPiece, ThinkingPiece, MovingPiece, PieceAndante, ActivePiece, ChasingPiece,
+                          DIRECTIONS, TURN_FRAME_TIME)
+
+MAGIC = b"RGLSAVE\0"
+VERSION = 3
+# Versões que ainda são lidas (a 1 não tinha os lances do modo tático; a 2 não tinha
+# as Timelines, os contatos, os perseguidores nem o gerador aleatório)
+READABLE_VERSIONS = (1, 2, 3)
+DEFAULT_SAVE_FILE = "savegame.dat"
+# Intervalo padrão do salvamento automático (segundos de jogo real)
+DEFAULT_AUTOSAVE_INTERVAL = 30.0
+
+# Linhas, colunas, sala inicial, sala atual, índice da peça ativa, tempo, ticks,
+# relógio das animações e atraso da tecla TAB
+HEADER = struct.Struct("<IIIIIIHdQdd")
+# Classe, nome (índice na tabela de nomes), direção, flags, x, y, energia e turn_timer (versões 1 e 2)
+PIECE_V2 = struct.Struct("<BHBBdddd")
+# O mesmo e a Timeline: frames (índice do nome, com os frames unidos por FRAME_SEPARATOR),
+# quantidade de frames, frame exibido (índice), flags, frame_time, tempo decorrido e
+# última sincronização (NaN = nunca)
+PIECE = struct.Struct(PIECE_V2.format + "HBHBddd")
+# Sala (r, c), quantidade de peças, última simulação e deslocamento nos dados das salas
+ROOM = struct.Struct("<IIIdQ")
+# Referência a uma peça: 0 = do jogador (índice), 1 = de uma sala (r, c, índice),
+# 2 = perseguidor entre salas (índice)
+PIECE_REF = struct.Struct("<BIII")
+# Vencedor, perdedor, frame atual e tempo acumulado da animação
+FIGHT = struct.Struct("<" + PIECE_REF.format[1:] * 2 + "Id")
+# Peça e destino (x, y) do lance em andamento
+GOAL = struct.Struct("<" + PIECE_REF.format[1:] + "dd")
+# Peça (PIECE), sala (r, c), parede de chegada (código de direção) e próxima troca de sala
+PURSUER = struct.Struct(PIECE.format + "IIBd")
+# Versão, os 624 números do Mersenne Twister mais a posição, e o gauss_next (NaN = nenhum)
+RNG = struct.Struct("<B625Id")
+# Direção da transição em andamento (NO_TRANSITION = nenhuma), progresso e progresso no tick anterior
+TRANSITION = struct.Struct("<Bdd")
+NO_TRANSITION = 0xFF
+COUNT = struct.Struct("<I")
+# Tamanho de cada nome da tabela de nomes
+NAME_SIZE = struct.Struct("<H")
+NAME_SIZE_V2 = struct.Struct("<B")
+
+FRAME_SEPARATOR = "|"
+# Índice de nome que não aponta para nada (peça de um arquivo sem Timeline, frame não exibido)
+NO_NAME = 0xFFFF
+# Campos da Timeline dos registros que vieram das versões 1 e 2
+NO_TIMELINE = (NO_NAME, 0, NO_NAME, 0, 0.0, 0.0, math.nan)
+
+# Código de cada classe de peça no arquivo (não reordenar: mudaria o formato)
+PIECE_CLASSES = (Piece, StaticPiece, ThinkingPiece, MovingPiece, PieceAndante, ActivePiece, ChasingPiece)
+CLASS_CODES = {cls: code for code, cls in enumerate(PIECE_CLASSES)}
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# Bits do campo flags de PIECE
+MOVING, ACTIVE, HAS_HEALTH, FORWARD, VERTICAL, TURNING, IDLE_BACKWARD, NEXT_BACKWARD = (1 << i for i in range(8))
+# Bits das flags da Timeline
+LOOP, PLAYING = 1, 2
+
+
+class SaveError(Exception):
+    """Arquivo que não é um jogo salvo (ou de uma versão que este código não lê)."""
+
+
+# -----------------------------
+# Snapshot (thread principal)
+# -----------------------------
+class Snapshot:
+    """
+    Cópia do estado do mundo feita só de números, textos e bytes: pode ser
+    codificada em outra thread enquanto o jogo continua mudando as peças.
+    """
+    __slots__ = ("seed", "rows", "cols", "door_grid", "header", "active", "rooms", "fights", "goals",
+                 "contacts", "pursuers", "rng", "transition")
+
+
+def timeline_state(timeline):
+    """Timeline como tupla: (frames, frame exibido, frame_time, decorrido, sincronização, loop, tocando)."""
+    return (tuple(timeline.frames), timeline.shown, timeline.frame_time, timeline.elapsed, timeline.synced,
+            timeline.loop, timeline.playing)
+
+
+def piece_state(piece):
+    """
+    Estado de uma peça como tupla: (classe, nome, direção, flags, x, y, energia,
+    turn_timer, Timeline). Os números entram como float, como voltam do arquivo.
+    """
+    flags = 0
+    if piece.moving:
+        flags |= MOVING
+    if piece.active:
+        flags |= ACTIVE
+    health = getattr(piece, "health", None)
+    if health is not None:
+        flags |= HAS_HEALTH
+    if getattr(piece, "moving_forward", False):
+        flags |= FORWARD
+    if getattr(piece, "direction", None) == "vertical":
+        flags |= VERTICAL
+    turn_timer = 0.0
+    if isinstance(piece, ThinkingPiece):
+        turn_timer = piece.turn_timer
+        if piece.turning:
+            flags |= TURNING
+        if piece.idle_turn == "backward":
+            flags |= IDLE_BACKWARD
+        if piece.next_idle == "backward":
+            flags |= NEXT_BACKWARD
+    x, y = piece.actor.pos
+    return (CLASS_CODES[type(piece)], piece.kind, DIRECTION_CODES[piece.current_direction], flags,
+            float(x), float(y), float(health or 0.0), float(turn_timer), timeline_state(piece.timeline))
+
+
+def take_snapshot(world):
+    """
+    Copia o estado do mundo (rápido: só percorre as peças das salas em memória).
+    As salas ainda não decodificadas de um jogo carregado entram como bytes.
+    """
+    map_manager = world.map_manager
+    snapshot = Snapshot()
+    snapshot.seed = map_manager.seed
+    snapshot.rows, snapshot.cols = map_manager.grid_rows, map_manager.grid_cols
+    snapshot.door_grid = bytes(map_manager.door_grid)
+    snapshot.header = (
+        map_manager.grid_rows, map_manager.grid_cols, *world.start_room, world.current_r, world.current_c,
+        world.active_piece_index, world.time, world.ticks, world.animation.time, world.switch_delay,
+    )
+    snapshot.active = [piece_state(piece) for piece in world.active_pieces]
+
+    # Onde está cada peça que pode estar numa luta
+    refs = {piece: (0, 0, 0, i) for i, piece in enumerate(world.active_pieces)}
+    rooms = {}
+
+    def add_room(key, entities, last_simulated):
+        pieces = [piece for piece in entities if piece.active]
+        for i, piece in enumerate(pieces):
+            refs[piece] = (1, key[0], key[1], i)
+        rooms[key] = (last_simulated, [piece_state(piece) for piece in pieces])
+
+    current = (world.current_r, world.current_c)
+    for key, hall in map_manager.resident.items():
+        if hall.populated:
+            add_room(key, hall.entities, world.time if key == current else hall.last_simulated)
+    for key, (entities, last_simulated) in map_manager.stashed.items():
+        add_room(key, entities, last_simulated)
+    if map_manager.saved is not None:
+        for key, room in map_manager.saved.pending_rooms():
+            rooms.setdefault(key, room)
+    snapshot.rooms = rooms
+    snapshot.pursuers = []
+    for i, pursuer in enumerate(world.pursuers):
+        refs[pursuer.piece] = (2, 0, 0, i)
+        snapshot.pursuers.append(
+            (piece_state(pursuer.piece), pursuer.r, pursuer.c, DIRECTION_CODES[pursuer.side], pursuer.next_move))
+
+    snapshot.fights = [
+        (refs[fight.winner], refs[fight.loser], fight.current_frame, fight.animation_timer)
+        for fight in world.fights
+        if fight.active and fight.winner in refs and fight.loser in refs
+    ]
+    # Só as peças da sala atual têm lance em andamento (as outras salas concluem ao adormecer);
+    # os perseguidores guardam o alvo da sala de onde saíram
+    snapshot.goals = [
+        (refs[piece], *piece.goal)
+        for piece in chain(world.pieces, (pursuer.piece for pursuer in world.pursuers))
+        if getattr(piece, "goal", None) is not None and piece in refs
+    ]
+    # Pares que já se encostavam: não podem disparar on_contact de novo no próximo tick
+    snapshot.contacts = sorted(
+        tuple(sorted(refs[piece] for piece in pair))
+        for pair in world.contacts
+        if all(piece in refs for piece in pair)
+    )
+    version, internal, gauss_next = world.rng.getstate()
+    snapshot.rng = (version, *internal, math.nan if gauss_next is None else gauss_next)
+    if world.transition_active:
+        snapshot.transition = (DIRECTION_CODES[world.transition_direction], world.transition_progress,
+                               world.prev_transition_progress)
+    else:
+        snapshot.transition = (NO_TRANSITION, 0.0, 0.0)
+    return snapshot
+
+
+# -----------------------------
+# Codificação (pode rodar em segundo plano)
+# -----------------------------
+def pack_seed(seed):
+    """Semente do mapa (inteiro ou texto) como bytes: tipo, tamanho e o texto em UTF-8."""
+    kind = b"i" if isinstance(seed, int) else b"s"
+    data = str(seed).encode("utf-8")
+    return kind + COUNT.pack(len(data)) + data
+
+
+def unpack_seed(data, offset):
+    """Lê uma semente gravada por pack_seed. Devolve (semente, posição seguinte)."""
+    kind = bytes(data[offset:offset + 1])
+    (size,) = COUNT.unpack_from(data, offset + 1)
+    offset += 1 + COUNT.size
+    seed = bytes(data[offset:offset + size]).decode("utf-8")
+    return (int(seed) if kind == b"i" else seed), offset + size
+
+
+def encode(snapshot):
+    """Monta os bytes do arquivo a partir de um Snapshot."""
+    names = {}
+
+    def name_code(name):
+        return names.setdefault(name, len(names))
+
+    def piece_fields(state):
+        """Campos de PIECE a partir de um piece_state."""
+        cls, kind, direction, flags, x, y, health, turn_timer, timeline = state
+        frames, shown, frame_time, elapsed, synced, loop, playing = timeline
+        return (cls, name_code(kind), direction, flags, x, y, health, turn_timer,
+                name_code(FRAME_SEPARATOR.join(frames)), len(frames), NO_NAME if shown is None else name_code(shown),
+                (LOOP if loop else 0) | (PLAYING if playing else 0), frame_time, elapsed,
+                math.nan if synced is None else synced)
+
+    def pack_pieces(states):
+        return b"".join(PIECE.pack(*piece_fields(state)) for state in states)
+
+    active = pack_pieces(snapshot.active)
+    index = []
+    chunks = []
+    offset = 0
+    for (r, c), room in snapshot.rooms.items():
+        last_simulated, states = room
+        if isinstance(states, RawRoom):
+            # Sala que veio de outro arquivo e não foi aberta: os nomes são traduzidos
+            data = states.recode(name_code)
+            count = states.count
+        else:
+            data = pack_pieces(states)
+            count = len(states)
+        index.append(ROOM.pack(r, c, count, last_simulated, offset))
+        chunks.append(data)
+        offset += len(data)
+
+    fights = [
+        FIGHT.pack(*winner, *loser, frame, timer) for winner, loser, frame, timer in snapshot.fights
+    ]
+    goals = [GOAL.pack(*ref, x, y) for ref, x, y in snapshot.goals]
+    contacts = [PIECE_REF.pack(*a) + PIECE_REF.pack(*b) for a, b in snapshot.contacts]
+    pursuers = [
+        PURSUER.pack(*piece_fields(state), r, c, side, next_move)
+        for state, r, c, side, next_move in snapshot.pursuers
+    ]
+
+    name_table = [COUNT.pack(len(names))]
+    for name in names:
+        data = name.encode("utf-8")
+        name_table.append(NAME_SIZE.pack(len(data)) + data)
+
+    return b"".join([
+        MAGIC, struct.pack("<H", VERSION), HEADER.pack(*snapshot.header), pack_seed(snapshot.seed),
+        *name_table,
+        snapshot.door_grid,
+        COUNT.pack(len(snapshot.active)), active,
+        COUNT.pack(len(index)), *index,
+        COUNT.pack(len(fights)), *fights,
+        COUNT.pack(len(goals)), *goals,
+        COUNT.pack(len(contacts)), *contacts,
+        COUNT.pack(len(pursuers)), *pursuers,
+        RNG.pack(*snapshot.rng),
+        TRANSITION.pack(*snapshot.transition),
+        *chunks,
+    ])
+
+
+def write_file(path, data):
+    """Grava num temporário e troca de uma vez: o arquivo anterior nunca fica pela metade."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def save_world(world, path=DEFAULT_SAVE_FILE):
+    """Salva o mundo agora (na thread atual). Devolve o tamanho do arquivo em bytes."""
+    data = encode(take_snapshot(world))
+    write_file(path, data)
+    return len(data)
+
+
+# -----------------------------
+# Leitura
+# -----------------------------
+class RawRoom:
+    """
+    Peças de uma sala ainda como bytes (decodificadas só quando a sala for
+    criada). 'record' é o struct dos registros no arquivo de origem.
+    """
+    __slots__ = ("data", "count", "names", "record")
+
+    def __init__(self, data, count, names, record=PIECE):
+        self.data = data
+        self.count = count
+        self.names = names
+        self.record = record
+
+    def records(self):
+        """Os registros no formato PIECE (os das versões 1 e 2 vêm sem Timeline)."""
+        if self.record is PIECE:
+            return PIECE.iter_unpack(self.data)
+        return (record + NO_TIMELINE for record in self.record.iter_unpack(self.data))
+
+    def recode(self, name_code):
+        """Os mesmos registros, no formato PIECE, com os índices de nome de outra tabela."""
+        names = self.names
+
+        def code(index):
+            return NO_NAME if index == NO_NAME else name_code(names[index])
+
+        records = []
+        for record in self.records():
+            cls, name, direction, flags, x, y, health, turn_timer, frames, count, shown, *timeline = record
+            records.append(PIECE.pack(cls, code(name), direction, flags, x, y, health, turn_timer,
+                                      code(frames), count, code(shown), *timeline))
+        return b"".join(records)
+
+
+def restore_timeline(piece, names, frames, count, shown, flags, frame_time, elapsed, synced):
+    """Devolve à peça a Timeline gravada (e a imagem que estava no Actor)."""
+    frames = tuple(names[frames].split(FRAME_SEPARATOR)) if count else ()
+    # A Timeline compara as sequências por identidade (Timeline.play): as da peça são reaproveitadas
+    for table in (piece.sprites, piece.idle_sprites):
+        for sequence in table.values():
+            if sequence == frames:
+                frames = sequence
+                break
+    timeline = piece.timeline
+    timeline.frames = frames
+    timeline.frame_time = frame_time
+    timeline.loop = bool(flags & LOOP)
+    timeline.playing = bool(flags & PLAYING)
+    timeline.elapsed = elapsed
+    timeline.synced = None if math.isnan(synced) else synced
+    timeline.shown = None if shown == NO_NAME else names[shown]
+    if timeline.shown is not None and timeline.shown != piece.actor.image:
+        pos = piece.actor.pos
+        piece.actor.image = timeline.shown
+        piece.actor.pos = pos
+
+
+def build_piece(record, names, rng=None):
+    """
+    Recria uma peça a partir de um registro PIECE ('rng': o do World, para as
+    ThinkingPiece). Registros sem Timeline (versões 1 e 2) recomeçam a rotação
+    em andamento do início.
+    """
+    cls_code, name, direction, flags, x, y, health, turn_timer, *timeline = record
+    cls = PIECE_CLASSES[cls_code]
+    direction = DIRECTIONS[direction]
+    piece = cls(x, y, names[name], direction)
+    piece.moving = bool(flags & MOVING)
+    piece.active = bool(flags & ACTIVE)
+    if flags & HAS_HEALTH:
+        piece.health = health
+    if isinstance(piece, (MovingPiece, PieceAndante)):
+        piece.direction = "vertical" if flags & VERTICAL else "horizontal"
+        piece.moving_forward = bool(flags & FORWARD)
+    if isinstance(piece, ThinkingPiece):
+        if rng is not None:
+            piece.rng = rng
+        piece.turn_timer = turn_timer
+        piece.turning = bool(flags & TURNING)
+        piece.idle_turn = "backward" if flags & IDLE_BACKWARD else "forward"
+        piece.next_idle = "backward" if flags & NEXT_BACKWARD else "forward"
+    if timeline[0] != NO_NAME:
+        restore_timeline(piece, names, *timeline)
+        if isinstance(piece, ThinkingPiece) and piece.turning:
+            piece.current_turn_frames = piece.timeline.frames
+    elif isinstance(piece, ThinkingPiece):
+        if piece.turning:
+            # A rotação recomeça do início
+            piece.current_turn_frames = piece.backward_seq if piece.next_idle == "backward" else piece.forward_seq
+            piece.timeline.play(piece.current_turn_frames, TURN_FRAME_TIME, loop=False, restart=True)
+        elif piece.idle_turn == "backward":
+            piece.timeline.play(piece.backward_seq[-1:], TURN_FRAME_TIME, restart=True)
+    return piece
+
+
+class SaveFile:
+    """
+    Jogo salvo lido do disco. As peças das salas só são decodificadas em
+    load_room (chamada pelo MapManager ao criar a sala).
+    """
+    def __init__(self, data):
+        view = memoryview(data)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise SaveError("Arquivo não é um jogo salvo (assinatura inválida).")
+        offset = len(MAGIC)
+        (version,) = struct.unpack_from("<H", view, offset)
+        if version not in READABLE_VERSIONS:
+            raise SaveError(f"Versão {version} do jogo salvo não é suportada (esperada: {VERSION}).")
+        offset += 2
+        self.version = version
+        self.header = HEADER.unpack_from(view, offset)
+        offset += HEADER.size
+        self.rows, self.cols = self.header[:2]
+
+        self.seed, offset = unpack_seed(view, offset)
+
+        # Os nomes das versões 1 e 2 tinham até 255 bytes (as sequências de frames não cabem)
+        name_size = NAME_SIZE if version >= 3 else NAME_SIZE_V2
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        self.names = []
+        for _ in range(count):
+            (size,) = name_size.unpack_from(view, offset)
+            offset += name_size.size
+            self.names.append(bytes(view[offset:offset + size]).decode("utf-8"))
+            offset += size
+
+        total = self.rows * self.cols
+        self.door_grid = bytes(view[offset:offset + total])
+        offset += total
+
+        record = PIECE if version >= 3 else PIECE_V2
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        active = RawRoom(bytes(view[offset:offset + count * record.size]), count, self.names, record)
+        self.active = list(active.records())
+        offset += count * record.size
+
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        rooms = list(ROOM.iter_unpack(view[offset:offset + count * ROOM.size]))
+        offset += count * ROOM.size
+
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        self.fights = [FIGHT.unpack_from(view, offset + i * FIGHT.size) for i in range(count)]
+        self.rng = None
+        offset += count * FIGHT.size
+
+        self.goals = []
+        if version >= 2:
+            (count,) = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            self.goals = [GOAL.unpack_from(view, offset + i * GOAL.size) for i in range(count)]
+            offset += count * GOAL.size
+
+        self.contacts = []
+        self.pursuers = []
+        self.rng_state = None
+        self.transition = (NO_TRANSITION, 0.0, 0.0)
+        if version >= 3:
+            (count,) = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            for _ in range(count):
+                self.contacts.append((PIECE_REF.unpack_from(view, offset),
+                                      PIECE_REF.unpack_from(view, offset + PIECE_REF.size)))
+                offset += 2 * PIECE_REF.size
+            (count,) = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            self.pursuers = [PURSUER.unpack_from(view, offset + i * PURSUER.size) for i in range(count)]
+            offset += count * PURSUER.size
+            rng_version, *internal, gauss_next = RNG.unpack_from(view, offset)
+            self.rng_state = (rng_version, tuple(internal), None if math.isnan(gauss_next) else gauss_next)
+            offset += RNG.size
+            self.transition = TRANSITION.unpack_from(view, offset)
+            offset += TRANSITION.size
+
+        # (r, c) -> (última simulação, RawRoom); sai daqui quando a sala é decodificada
+        self.rooms = {}
+        for r, c, count, last_simulated, start in rooms:
+            start += offset
+            data = bytes(view[start:start + count * record.size])
+            self.rooms[(r, c)] = (last_simulated, RawRoom(data, count, self.names, record))
+
+    @classmethod
+    def read(cls, path=DEFAULT_SAVE_FILE):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def pending_rooms(self):
+        """Salas ainda não decodificadas: ((r, c), (última simulação, RawRoom))."""
+        return self.rooms.items()
+
+    def load_room(self, r, c):
+        """Peças da sala (r, c): (entities, last_simulated), ou None se ela não tinha peças salvas."""
+        room = self.rooms.pop((r, c), None)
+        if room is None:
+            return None
+        last_simulated, raw = room
+        return [build_piece(record, self.names, self.rng) for record in raw.records()], last_simulated
+
+    def restore(self, world):
+        """
+        Coloca o estado salvo num World recém-criado com a mesma semente e o
+        mesmo tamanho de mapa (ver load_world).
+        """
+        from world import Pursuer, DIRECTION_OFFSETS
+
+        map_manager = world.map_manager
+        map_manager.door_grid[:] = self.door_grid
+        map_manager.resident.clear()
+        map_manager.stashed.clear()
+        map_manager.pinned = set()
+        map_manager.saved = self
+        # As ThinkingPiece das salas decodificadas sorteiam com o gerador do mundo
+        self.rng = world.rng
+
+        (_, _, start_r, start_c, current_r, current_c, active_index,
+         world.time, world.ticks, world.animation.time, world.switch_delay) = self.header
+        world.start_room = (start_r, start_c)
+        world.active_pieces = [build_piece(record, self.names, self.rng) for record in self.active]
+        world.active_piece_index = active_index
+        world.active_piece = world.active_pieces[active_index]
+        world.fights = []
+        world.fighting = set()
+        world.pursuers = []
+        world.room_graph.invalidate()
+
+        def resolve(kind, r, c, i):
+            if kind == 0:
+                return world.active_pieces[i]
+            if kind == 2:
+                return world.pursuers[i].piece
+            # As peças de uma luta em outra sala precisam existir: a sala é decodificada agora
+            return map_manager.get_hall(r, c).entities[i]
+
+        # As lutas vêm antes da troca de sala: quem luta não entra nas patrulhas nem
+        # tem a Timeline sincronizada ao acordar a sala (como no jogo salvo)
+        for record in self.fights:
+            fight = world.start_fight(resolve(*record[0:4]), resolve(*record[4:8]))
+            fight.current_frame = record[8]
+            fight.animation_timer = record[9]
+            fight.actor.image = fight.frames[fight.current_frame % len(fight.frames)]
+        # A sala atual é decodificada já (as outras quando forem criadas)
+        world.move_to_room(current_r, current_c)
+
+        for record in self.pursuers:
+            piece = build_piece(record[:len(record) - 4], self.names, self.rng)
+            r, c, side, next_move = record[-4:]
+            world.pursuers.append(Pursuer(piece, r, c, DIRECTIONS[side], next_move))
+
+        for record in self.goals:
+            resolve(*record[0:4]).goal = record[4:6]
+
+        world.contacts = {frozenset((resolve(*a), resolve(*b))) for a, b in self.contacts}
+
+        direction, progress, previous = self.transition
+        if direction != NO_TRANSITION:
+            direction = DIRECTIONS[direction]
+            # A sala de destino foi acordada no início do slide e não anda durante ele
+            dr, dc = DIRECTION_OFFSETS[direction]
+            hall = map_manager.get_hall(world.current_r + dr, world.current_c + dc)
+            hall.last_simulated = world.time
+            # ... e as Timelines dela foram sincronizadas no relógio daquele tick, não no de agora
+            timelines = [(piece, piece.timeline.elapsed, piece.timeline.synced, piece.timeline.shown)
+                         for piece in hall.entities]
+            world.initiate_transition(direction)
+            for piece, elapsed, synced, shown in timelines:
+                piece.timeline.elapsed, piece.timeline.synced = elapsed, synced
+                if shown is not None and shown != piece.timeline.shown:
+                    pos = piece.actor.pos
+                    piece.actor.image = piece.timeline.shown = shown
+                    piece.actor.pos = pos
+            world.transition_progress = progress
+            world.prev_transition_progress = previous
+
+        # Por último: recriar as salas acima não pode consumir números do gerador
+        if self.rng_state is not None:
+            world.rng.setstate(self.rng_state)
+
+
+def load_world(path=DEFAULT_SAVE_FILE, **world_options):
+    """Cria um World a partir de um jogo salvo ('world_options' vão para o construtor)."""
+    from world import World
+
+    saved = SaveFile.read(path)
+    world = World(grid_rows=saved.rows, grid_cols=saved.cols, seed=saved.seed, **world_options)
+    saved.restore(world)
+    return world
+
+
+# -----------------------------
+# Salvamento automático
+# -----------------------------
+class Autosaver:
+    """
+    Salva o mundo a cada 'interval' segundos sem travar o jogo: o snapshot é
+    tirado na thread principal (update) e o resto roda numa thread própria.
+    Se um salvamento ainda estiver em andamento, o seguinte espera a vez.
+    """
+    def __init__(self, world, path=DEFAULT_SAVE_FILE, interval=DEFAULT_AUTOSAVE_INTERVAL):
+        self.world = world
+        self.path = path
+        self.interval = interval
+        self.elapsed = 0.0
+        self.saves = 0
+        self.last_error = None
+        self.last_snapshot_time = 0.0   # Tempo (s) gasto na thread principal no último salvamento
+        self.pending = False            # Salvamento pedido com save(queue=True) esperando a vez
+        self._thread = None
+
+    @property
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def update(self, dt):
+        """Chamada a cada quadro com o tempo real 'dt'; salva quando o intervalo passa."""
+        self.elapsed += dt
+        if self.pending:
+            self.poll()
+        elif self.elapsed >= self.interval and self.save():
+            self.elapsed = 0.0
+
+    def poll(self):
+        """Começa o salvamento que ficou na fila, se o anterior já terminou. Devolve True se começou."""
+        if self.pending and self.save():
+            self.pending = False
+            self.elapsed = 0.0
+            return True
+        return False
+
+    def save(self, queue=False):
+        """
+        Começa um salvamento em segundo plano agora. Devolve False se já houver
+        um em andamento (ou uma transição de sala); com queue=True ele fica na
+        fila e começa no próximo update()/poll() em que for possível.
+        """
+        if self.busy or self.world.transition_active:
+            if queue:
+                self.pending = True
+            return False
+        start = time.perf_counter()
+        snapshot = take_snapshot(self.world)
+        self.last_snapshot_time = time.perf_counter() - start
+        self._thread = threading.Thread(target=self._write, args=(snapshot,), name="autosave", daemon=True)
+        self._thread.start()
+        return True
+
+    def _write(self, snapshot):
+        try:
+            write_file(self.path, encode(snapshot))
+            self.saves += 1
+            self.last_error = None
+        except OSError as error:
+            self.last_error = error
+            print(f"Falha ao salvar o jogo em {self.path}: {error}")
+
+    def wait(self):
+        """
+        Espera o salvamento em andamento terminar (ex.: ao fechar o jogo); o
+        que estiver na fila é feito em seguida, também esperando por ele.
+        """
+        if self._thread is not None:
+            self._thread.join()
+        if self.poll():
+            self._thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mostra o conteúdo de um jogo salvo.")
+    parser.add_argument("command", choices=["info"], help="info: resumo do arquivo.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_SAVE_FILE, help="Arquivo do jogo salvo.")
+    args = parser.parse_args()
+
+    saved = SaveFile.read(args.path)
+    rows, cols, start_r, start_c, current_r, current_c, _, world_time, ticks, _, _ = saved.header
+    pieces = sum(raw.count for _, raw in saved.rooms.values())
+    print(f"{args.path}: {os.path.getsize(args.path)} bytes, versão {saved.version}")
+    print(f"  mapa {rows}x{cols} (semente {saved.seed}), sala inicial room_{start_r}_{start_c}, "
+          f"atual room_{current_r}_{current_c}")
+    print(f"  tempo {world_time:.1f} s ({ticks} ticks), {len(saved.active)} peças do jogador, "
+          f"{len(saved.rooms)} salas visitadas com {pieces} peças, {len(saved.fights)} lutas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Hash espacial (grade uniforme) para detectar colisões
+
+Cada sala guarda um SpatialHash com seus muros e portas; o World coloca as
+peças nele a cada tick. Um retângulo é registrado em todas as células da
+grade que ele cobre, então a pergunta "o que esta peça está tocando?" só
+olha as poucas células ao redor da peça, em vez de comparar com todos os
+objetos da sala.
+
+Os retângulos são tuplas (x, y, largura, altura) e cada objeto pertence a
+uma camada ("wall", "door", "piece"...), para que as consultas possam
+filtrar só o que interessa.
+"""
+
+
+def rects_overlap(a, b):
+    """Mesma regra do Rect.colliderect do pygame (bordas encostadas não contam)."""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class SpatialHash:
+    """Grade uniforme: célula (cx, cy) -> objetos de cada camada que a tocam"""
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        # camada -> {(cx, cy): set(objetos)}
+        self.layers = {}
+        # objeto -> (retângulo, camada, células ocupadas)
+        self.bodies = {}
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        x, y, w, h = rect
+        x0, y0 = int(x // size), int(y // size)
+        x1, y1 = int((x + max(w, 1) - 1) // size), int((y + max(h, 1) - 1) // size)
+        return tuple((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def __contains__(self, obj):
+        return obj in self.bodies
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def insert(self, obj, rect, layer):
+        """Registra 'obj' com o retângulo e a camada dados."""
+        if obj in self.bodies:
+            self.remove(obj)
+        cells = self._cells_for(rect)
+        grid = self.layers.setdefault(layer, {})
+        for cell in cells:
+            bucket = grid.get(cell)
+            if bucket is None:
+                bucket = grid[cell] = set()
+            bucket.add(obj)
+        self.bodies[obj] = (rect, layer, cells)
+
+    def move(self, obj, rect, layer="piece"):
+        """Atualiza o retângulo de 'obj' (insere se ainda não existir)."""
+        body = self.bodies.get(obj)
+        if body is None:
+            self.insert(obj, rect, layer)
+            return
+        old_rect, layer, cells = body
+        new_cells = self._cells_for(rect)
+        if new_cells != cells:
+            grid = self.layers[layer]
+            for cell in cells:
+                bucket = grid[cell]
+                bucket.discard(obj)
+                if not bucket:
+                    del grid[cell]
+            for cell in new_cells:
+                bucket = grid.get(cell)
+                if bucket is None:
+                    bucket = grid[cell] = set()
+                bucket.add(obj)
+        self.bodies[obj] = (rect, layer, new_cells)
+
+    def remove(self, obj):
+        """Retira 'obj' da grade (não faz nada se ele não estiver lá)."""
+        body = self.bodies.pop(obj, None)
+        if body is None:
+            return
+        _, layer, cells = body
+        grid = self.layers[layer]
+        for cell in cells:
+            bucket = grid[cell]
+            bucket.discard(obj)
+            if not bucket:
+                del grid[cell]
+
+    def rect_of(self, obj):
+        return self.bodies[obj][0]
+
+    def query(self, rect, layer, exclude=None):
+        """Objetos da camada 'layer' cujo retângulo se sobrepõe a 'rect'."""
+        grid = self.layers.get(layer)
+        if not grid:
+            return []
+        found = []
+        seen = set()
+        for cell in self._cells_for(rect):
+            bucket = grid.get(cell)
+            if not bucket:
+                continue
+            for obj in bucket:
+                if obj is exclude or obj in seen:
+                    continue
+                seen.add(obj)
+                if rects_overlap(rect, self.bodies[obj][0]):
+                    found.append(obj)
+        return found
+
+    def touching(self, obj, layer):
+        """Objetos da camada 'layer' que tocam o objeto 'obj' (já registrado)."""
+        return self.query(self.bodies[obj][0], layer, exclude=obj)
+
+    def contacts(self, layer):
+        """
+        Pares de objetos da camada 'layer' que se sobrepõem, como frozensets.
+        Só compara objetos que dividem alguma célula, e cada par é testado uma
+        única vez: na primeira célula (canto superior esquerdo) que os dois dividem.
+        """
+        pairs = set()
+        bodies = self.bodies
+        for cell, bucket in self.layers.get(layer, {}).items():
+            if len(bucket) < 2:
+                continue
+            items = [(obj, bodies[obj]) for obj in bucket]
+            for i, (a, (rect_a, _, cells_a)) in enumerate(items):
+                ax, ay, aw, ah = rect_a
+                first_a = cells_a[0]
+                for b, (rect_b, _, cells_b) in items[i + 1:]:
+                    first_b = cells_b[0]
+                    if (max(first_a[0], first_b[0]), max(first_a[1], first_b[1])) != cell:
+                        continue
+                    bx, by, bw, bh = rect_b
+                    if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                        pairs.add(frozenset((a, b)))
+        return pairs
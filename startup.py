@@ -0,0 +1,143 @@
+"""
+Início rápido do jogo: rastro dos tempos de inicialização e carga em segundo plano
+
+O main.py mostra o menu logo no primeiro quadro e monta o mundo (imagens,
+mapa e peças) numa thread em segundo plano; a música só começa depois que
+o primeiro quadro aparece.
+
+Com a variável de ambiente ROGUELIKE_STARTUP_TRACE=1 cada passo da
+inicialização (imports, menu, imagens, mundo) é cronometrado e, quando o
+primeiro quadro é desenhado, o relatório é exibido no terminal (e gravado
+em JSON se ROGUELIKE_STARTUP_FILE estiver definida). Os tempos contam a
+partir do início do main.py; para o detalhe de cada import use também
+'python -X importtime main.py'.
+"""
+import json
+import os
+import threading
+import time
+
+
+class _NoStep:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STEP = _NoStep()
+
+
+class _Step:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace.record(self.name, self.start, end)
+        return False
+
+
+class StartupTrace:
+    """Cronômetro dos passos da inicialização"""
+    def __init__(self, enabled=False, output=None):
+        self.enabled = enabled
+        self.output = output
+        self.origin = time.perf_counter()
+        self.steps = []             # (nome, início, duração, thread), em segundos desde a origem
+        self.events = {}            # nome -> instante (ex.: "first_frame", "world_ready")
+        self.reported = False
+        self._lock = threading.Lock()
+
+    def step(self, name):
+        """Bloco 'with' que cronometra um passo (não faz nada se o rastro estiver desligado)."""
+        if not self.enabled:
+            return _NO_STEP
+        return _Step(self, name)
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.steps.append((name, start - self.origin, end - start, threading.current_thread().name))
+
+    def mark(self, name):
+        """Registra um evento (só a primeira vez conta)."""
+        if self.enabled and name not in self.events:
+            self.events[name] = time.perf_counter() - self.origin
+
+    def summary(self):
+        return {
+            "steps": [
+                {"name": name, "start_ms": start * 1e3, "duration_ms": duration * 1e3, "thread": thread}
+                for name, start, duration, thread in sorted(self.steps, key=lambda step: step[1])
+            ],
+            "events_ms": {name: at * 1e3 for name, at in self.events.items()},
+        }
+
+    def report(self):
+        """Exibe (e grava, se configurado) o relatório; só na primeira chamada."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        summary = self.summary()
+        print("Inicialização (ms desde o início do main.py):")
+        for step in summary["steps"]:
+            where = "" if step["thread"] == "MainThread" else f"  [{step['thread']}]"
+            print(f"  {step['name']:28s} {step['start_ms']:8.1f} +{step['duration_ms']:8.1f}{where}")
+        for name, at in summary["events_ms"].items():
+            print(f"  {name:28s} {at:8.1f}")
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            print(f"Relatório de inicialização gravado em {self.output}")
+
+
+def trace_from_env():
+    """StartupTrace ligado por ROGUELIKE_STARTUP_TRACE=1 (desligado por padrão)."""
+    enabled = os.environ.get("ROGUELIKE_STARTUP_TRACE", "") not in ("", "0")
+    return StartupTrace(enabled, os.environ.get("ROGUELIKE_STARTUP_FILE"))
+
+
+class BackgroundLoader:
+    """
+    Executa 'build()' numa thread e guarda o resultado.
+    O jogo consulta 'ready' a cada quadro; 'result()' devolve o que foi
+    construído (ou relança, na thread principal, o erro da construção).
+    """
+    def __init__(self, build, name="carga"):
+        self._build = build
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._result = self._build()
+        except BaseException as error:  # Relançado na thread principal por result()
+            self._error = error
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def result(self, wait=False):
+        """O objeto construído; None se ainda não terminou (a menos que 'wait')."""
+        if wait:
+            self._done.wait()
+        if not self._done.is_set():
+            return None
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -0,0 +1,368 @@
+"""
+Modo tático: as ThinkingPiece escolhem lances de xadrez
+
+A cada turno (ver World._think) uma ThinkingPiece parada olha a sala como um
+tabuleiro (chess_moves.py): as peças da sala de um lado, as do jogador do
+outro, os muros como bloqueios. Ela escolhe o lance com uma busca alfa-beta
+(negamax) com aprofundamento iterativo: profundidade 1, depois 2, 3... até
+acabar o orçamento, e fica com o melhor lance da última profundidade
+completa. Numa máquina rápida a busca vai mais fundo no mesmo tempo; numa
+lenta, para mais cedo, mas nunca passa do orçamento.
+
+O orçamento é de tempo (segundos, conferido a cada nó: um nó custa bem
+mais que ler o relógio) ou de nós. O de nós dá sempre o mesmo lance na
+mesma posição, em qualquer máquina; é o usado nas partidas gravadas (ver
+replay.py).
+
+Para a busca render no orçamento:
+  - hash de Zobrist: cada posição tem uma chave de 64 bits, atualizada com
+    dois ou três XOR a cada lance;
+  - tabela de transposição limitada (TABLE_SIZE entradas): posições já
+    avaliadas nesta escolha não são buscadas de novo, e o melhor lance
+    achado nelas é tentado primeiro. Vitórias e derrotas entram nela
+    contadas a partir da posição, não da raiz (table_score);
+  - ordenação dos lances: o da tabela, depois as capturas (vítima mais
+    valiosa com o atacante menos valioso primeiro), depois os demais.
+
+Avaliação: material (PIECE_VALUES) e um bônus por peça adversária atacada.
+As peças não têm rei: um lado sem peças perdeu.
+
+decide() faz uma escolha a partir de uma ThinkRequest (só números e textos):
+é o que roda nas threads ou processos do ai_jobs.py.
+"""
+import random
+import threading
+import time
+
+from chess_moves import KINDS, iter_bits, move_tables
+
+ROOM, HERO = 0, 1
+PIECE_VALUES = {"pawn": 100, "knight": 300, "bishop": 320, "rook": 500, "queen": 900}
+# Bônus por peça adversária atacada (incentiva ameaçar, não só capturar)
+THREAT_BONUS = 10
+# Pontuação de quem ficou sem peças (ajustada pela distância, para vencer o quanto antes)
+WIN_SCORE = 100000
+# Profundidade máxima do aprofundamento iterativo
+MAX_DEPTH = 16
+# Pontuações a partir daqui (em módulo) são vitórias ou derrotas já encontradas
+MATE_SCORE = WIN_SCORE - MAX_DEPTH
+# Entradas da tabela de transposição
+TABLE_SIZE = 1 << 16
+# Tipo do valor guardado na tabela: exato, limite inferior (corte beta) ou superior
+EXACT, LOWER, UPPER = 0, 1, 2
+
+KIND_INDEX = {kind: i for i, kind in enumerate(KINDS)}
+
+
+def table_score(score, ply):
+    """
+    Valor para a tabela de transposição. Vitórias e derrotas são contadas a
+    partir da raiz (WIN_SCORE - ply); na tabela passam a contar a partir da
+    própria posição, que pode aparecer de novo em outro ply.
+    """
+    if score >= MATE_SCORE:
+        return score + ply
+    if score <= -MATE_SCORE:
+        return score - ply
+    return score
+
+
+def search_score(value, ply):
+    """Valor lido da tabela de transposição de volta para o ply atual (inverso de table_score)."""
+    if value >= MATE_SCORE:
+        return value - ply
+    if value <= -MATE_SCORE:
+        return value + ply
+    return value
+
+
+class SearchTimeout(Exception):
+    """O orçamento da busca acabou (interrompe a profundidade em andamento)."""
+
+
+class Position:
+    """Peças dos dois lados num tabuleiro: tile -> tipo, para ROOM e HERO"""
+    def __init__(self, tables, walls, room=(), hero=()):
+        self.tables = tables
+        self.walls = walls
+        self.pieces = ({}, {})
+        for side, group in ((ROOM, room), (HERO, hero)):
+            for square, kind in group:
+                if kind in KIND_INDEX and not (walls >> square) & 1:
+                    self.pieces[side][square] = kind
+
+    @classmethod
+    def from_world(cls, board, room_pieces, hero_pieces):
+        """Posição a partir das peças do jogo (o tile de cada uma vem do Board)."""
+        square = board.square
+        room = [(square(piece), piece.kind) for piece in room_pieces]
+        hero = [(square(piece), piece.kind) for piece in hero_pieces]
+        return cls(board.tables, board.walls,
+                   [entry for entry in room if entry[0] is not None],
+                   [entry for entry in hero if entry[0] is not None])
+
+
+class TacticalSearch:
+    """
+    Busca alfa-beta de um tabuleiro (o mesmo MoveTables para todas as salas).
+    As chaves de Zobrist são sorteadas uma vez; a tabela de transposição é
+    esvaziada a cada escolha.
+    """
+    def __init__(self, tables, table_size=TABLE_SIZE):
+        self.tables = tables
+        self.table_size = table_size
+        self.table = {}     # chave -> (profundidade, valor, tipo, melhor lance)
+        # Chaves de Zobrist de semente fixa: a mesma posição tem a mesma chave em qualquer execução
+        rng = random.Random(f"zobrist:{tables.width}x{tables.height}")
+        self.keys = [[[rng.getrandbits(64) for _ in range(tables.size)] for _ in KINDS] for _ in (ROOM, HERO)]
+        self.side_key = rng.getrandbits(64)
+        # Estatísticas da última escolha
+        self.nodes = 0
+        self.depth = 0
+
+    # -----------------------------
+    # Escolha do lance
+    # -----------------------------
+    def choose(self, position, origin, side=ROOM, budget=None, max_nodes=None, max_depth=MAX_DEPTH):
+        """
+        Melhor destino (tile) para a peça de 'side' que está em 'origin';
+        None para ficar onde está. 'budget' (segundos) e 'max_nodes' limitam
+        a busca; com os dois em None, só 'max_depth'.
+        """
+        if origin not in position.pieces[side]:
+            return None
+        self._setup(position, side)
+        self.deadline = None if budget is None else time.perf_counter() + budget
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.depth = 0
+        # Cada escolha começa com a tabela vazia: o lance só depende da posição e do orçamento
+        self.table.clear()
+
+        # Na raiz só a peça que pensa se mexe; ficar parada (None) também é um lance
+        root_moves = [None] + self._moves(side, origin)
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                best, score = self._search_root(root_moves, side, depth)
+            except SearchTimeout:
+                break
+            self.depth = depth
+            # O melhor desta profundidade é o primeiro a ser tentado na próxima
+            root_moves.remove(best)
+            root_moves.insert(0, best)
+            if abs(score) >= MATE_SCORE:
+                break   # Vitória (ou derrota) inevitável já encontrada
+        return None if best is None else best[1]
+
+    def _setup(self, position, side):
+        self.walls = position.walls
+        self.pieces = ({**position.pieces[ROOM]}, {**position.pieces[HERO]})
+        self.occupancy = [0, 0]
+        self.material = [0, 0]
+        key = 0 if side == ROOM else self.side_key
+        for owner in (ROOM, HERO):
+            keys = self.keys[owner]
+            for square, kind in self.pieces[owner].items():
+                self.occupancy[owner] |= 1 << square
+                self.material[owner] += PIECE_VALUES[kind]
+                key ^= keys[KIND_INDEX[kind]][square]
+        self.key = key
+
+    def _search_root(self, moves, side, depth):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best, best_score = moves[0], None
+        for move in moves:
+            if move is None:
+                self.key ^= self.side_key
+                score = -self._negamax(1 - side, depth - 1, -beta, -alpha, 1)
+                self.key ^= self.side_key
+            else:
+                captured = self._make(side, move)
+                score = -self._negamax(1 - side, depth - 1, -beta, -alpha, 1)
+                self._unmake(side, move, captured)
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+            alpha = max(alpha, score)
+        return best, best_score
+
+    # -----------------------------
+    # Busca
+    # -----------------------------
+    def _negamax(self, side, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchTimeout
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        if not self.pieces[side]:
+            return -WIN_SCORE + ply
+        if not self.pieces[1 - side]:
+            return WIN_SCORE - ply
+        if depth <= 0:
+            return self._evaluate(side)
+
+        key = self.key
+        entry = self.table.get(key)
+        hint = None
+        if entry is not None:
+            entry_depth, value, kind, hint = entry
+            if entry_depth >= depth:
+                value = search_score(value, ply)
+                if kind == EXACT:
+                    return value
+                if kind == LOWER and value >= beta:
+                    return value
+                if kind == UPPER and value <= alpha:
+                    return value
+
+        moves = self._moves(side)
+        if not moves:
+            return self._evaluate(side)
+        if hint is not None and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        original_alpha = alpha
+        best, best_move = None, None
+        for move in moves:
+            captured = self._make(side, move)
+            score = -self._negamax(1 - side, depth - 1, -beta, -alpha, ply + 1)
+            self._unmake(side, move, captured)
+            if best is None or score > best:
+                best, best_move = score, move
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+
+        if best <= original_alpha:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        table = self.table
+        if key not in table and len(table) >= self.table_size:
+            del table[next(iter(table))]    # Tabela cheia: sai a entrada mais antiga
+        table[key] = (depth, table_score(best, ply), kind, best_move)
+        return best
+
+    def _moves(self, side, only=None):
+        """
+        Lances (origem, destino) do lado 'side' (ou só da peça em 'only'),
+        capturas primeiro: vítima mais valiosa, atacante menos valioso.
+        """
+        tables, walls = self.tables, self.walls
+        own, other = self.occupancy[side], self.occupancy[1 - side]
+        occupied = walls | own | other
+        enemies = self.pieces[1 - side]
+        origins = self.pieces[side].items() if only is None else ((only, self.pieces[side][only]),)
+        captures, quiet = [], []
+        for square, kind in origins:
+            if kind == "pawn":
+                targets = (tables.diagonal_steps[square] & other) | (tables.orthogonal_steps[square] & ~occupied)
+            else:
+                targets = tables.attacks(kind, square, occupied, walls) & ~own
+            for target in iter_bits(targets):
+                victim = enemies.get(target)
+                if victim is None:
+                    quiet.append((square, target))
+                else:
+                    captures.append((PIECE_VALUES[kind] - 10 * PIECE_VALUES[victim], square, target))
+        captures.sort()
+        return [(square, target) for _, square, target in captures] + quiet
+
+    def _make(self, side, move):
+        """Faz o lance; devolve o tipo da peça capturada (ou None)."""
+        origin, target = move
+        own, enemies = self.pieces[side], self.pieces[1 - side]
+        kind = own.pop(origin)
+        own[target] = kind
+        self.occupancy[side] ^= (1 << origin) | (1 << target)
+        keys = self.keys[side][KIND_INDEX[kind]]
+        key = self.key ^ keys[origin] ^ keys[target] ^ self.side_key
+        captured = enemies.pop(target, None)
+        if captured is not None:
+            self.occupancy[1 - side] ^= 1 << target
+            self.material[1 - side] -= PIECE_VALUES[captured]
+            key ^= self.keys[1 - side][KIND_INDEX[captured]][target]
+        self.key = key
+        return captured
+
+    def _unmake(self, side, move, captured):
+        origin, target = move
+        own = self.pieces[side]
+        kind = own.pop(target)
+        own[origin] = kind
+        self.occupancy[side] ^= (1 << origin) | (1 << target)
+        keys = self.keys[side][KIND_INDEX[kind]]
+        key = self.key ^ keys[origin] ^ keys[target] ^ self.side_key
+        if captured is not None:
+            self.pieces[1 - side][target] = captured
+            self.occupancy[1 - side] |= 1 << target
+            self.material[1 - side] += PIECE_VALUES[captured]
+            key ^= self.keys[1 - side][KIND_INDEX[captured]][target]
+        self.key = key
+
+    def _evaluate(self, side):
+        """Valor da posição para 'side': material e ameaças."""
+        return (self.material[side] - self.material[1 - side]
+                + THREAT_BONUS * (self._threats(side) - self._threats(1 - side)))
+
+    def _threats(self, side):
+        """Quantas peças do adversário estão atacadas por 'side'."""
+        tables, walls = self.tables, self.walls
+        other = self.occupancy[1 - side]
+        occupied = walls | self.occupancy[side] | other
+        attacked = 0
+        for square, kind in self.pieces[side].items():
+            attacked |= tables.attacks(kind, square, occupied, walls)
+        return bin(attacked & other).count("1")
+
+
+# -----------------------------
+# Pedido de decisão (para rodar fora da thread principal)
+# -----------------------------
+class ThinkRequest:
+    """
+    Tudo o que uma escolha precisa, sem referências às peças do jogo: pode
+    ser copiado para outro processo e não muda se o jogo seguir.
+    """
+    __slots__ = ("width", "height", "walls", "room", "hero", "origin", "budget", "max_nodes")
+
+    def __init__(self, position, origin, budget=None, max_nodes=None):
+        self.width = position.tables.width
+        self.height = position.tables.height
+        self.walls = position.walls
+        self.room = tuple(position.pieces[ROOM].items())
+        self.hero = tuple(position.pieces[HERO].items())
+        self.origin = origin
+        self.budget = budget
+        self.max_nodes = max_nodes
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+# Uma TacticalSearch por thread (a busca guarda estado enquanto roda)
+_local = threading.local()
+
+
+def decide(request):
+    """Centro (pixels) do tile escolhido para a peça em request.origin; None para ficar parada."""
+    tables = move_tables(request.width, request.height)
+    searches = getattr(_local, "searches", None)
+    if searches is None:
+        searches = _local.searches = {}
+    search = searches.get((tables.width, tables.height))
+    if search is None:
+        search = searches[(tables.width, tables.height)] = TacticalSearch(tables)
+    position = Position(tables, request.walls, request.room, request.hero)
+    target = search.choose(position, request.origin, budget=request.budget, max_nodes=request.max_nodes)
+    return None if target is None else tables.center(target)
@@ -0,0 +1,26 @@
+"""
+Configuração comum dos testes: o jogo roda sem janela (ver headless.py)
+
+Rodar da pasta do jogo:
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if GAME_DIR not in sys.path:
+    sys.path.insert(0, GAME_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def headless():
+    """Display falso do pygame e imagens do jogo registradas, uma vez por sessão."""
+    from headless import init_headless
+
+    cwd = os.getcwd()
+    os.chdir(GAME_DIR)
+    init_headless()
+    yield
+    os.chdir(cwd)
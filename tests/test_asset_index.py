@@ -0,0 +1,50 @@
+"""Índice das imagens (asset_index.py) e o manifesto"""
+import os
+
+from asset_index import AssetIndex
+
+
+def make_tree(root):
+    os.makedirs(root / "rook" / "rook_down")
+    (root / "rook" / "rook_down" / "00.png").write_bytes(b"")
+    (root / "rook" / "rook_down" / "01.png").write_bytes(b"")
+
+
+def age(path, seconds):
+    """Deixa a data de 'path' 'seconds' segundos no passado."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+def test_manifest_in_sync_is_used(tmp_path):
+    make_tree(tmp_path)
+    manifest = tmp_path / "manifest.json"
+    AssetIndex.scan(tmp_path).save_manifest(manifest)
+    # Um manifesto "mentiroso" mas mais novo que as pastas é lido sem varrer nada
+    manifest.write_text('{"folders": {"": {"dirs": [], "files": ["only.png"]}}}')
+    assert AssetIndex.load(tmp_path, manifest).files("") == ("only.png",)
+
+
+def test_stale_manifest_is_rebuilt(tmp_path):
+    make_tree(tmp_path)
+    manifest = tmp_path / "manifest.json"
+    AssetIndex.scan(tmp_path).save_manifest(manifest)
+    age(manifest, 60)
+    (tmp_path / "rook" / "rook_down" / "02.png").write_bytes(b"")
+
+    index = AssetIndex.load(tmp_path, manifest)
+    assert index.files("rook/rook_down") == ("00.png", "01.png", "02.png")
+    # ... e regravado: a próxima carga usa o manifesto novo
+    assert AssetIndex.load(tmp_path, manifest).folders == index.folders
+
+
+def test_manifest_with_missing_folder_is_rebuilt(tmp_path):
+    make_tree(tmp_path)
+    manifest = tmp_path / "manifest.json"
+    AssetIndex.scan(tmp_path).save_manifest(manifest)
+    for name in os.listdir(tmp_path / "rook" / "rook_down"):
+        os.remove(tmp_path / "rook" / "rook_down" / name)
+    os.rmdir(tmp_path / "rook" / "rook_down")
+    age(tmp_path / "rook", 60)      # Só a pasta que sumiu denuncia a mudança
+
+    assert not AssetIndex.load(tmp_path, manifest).has_folder("rook/rook_down")
@@ -0,0 +1,86 @@
+"""Lances em bitboards (chess_moves.py) num tabuleiro 5x5 com muros"""
+from types import SimpleNamespace
+
+import pytest
+
+from chess_moves import Board, iter_bits, move_tables
+from pathfinding import TILE
+
+SIZE = 5
+# Muros em (2, 1), (3, 3) e (4, 3); a peça testada fica no centro (2, 2)
+WALLS = [(2, 1), (3, 3), (4, 3)]
+
+
+def square(x, y):
+    return y * SIZE + x
+
+
+def mask(*tiles):
+    result = 0
+    for x, y in tiles:
+        result |= 1 << square(x, y)
+    return result
+
+
+def tiles(bits):
+    return {divmod(bit, SIZE)[::-1] for bit in iter_bits(bits)}
+
+
+@pytest.fixture
+def tables():
+    return move_tables(SIZE, SIZE)
+
+
+@pytest.mark.parametrize("kind, count", [
+    ("pawn", 3),        # 4 diagonais vizinhas menos o muro em (3, 3)
+    ("knight", 7),      # 8 saltos menos o muro em (4, 3)
+    ("rook", 6),        # para cima o muro em (2, 1) fecha a coluna
+    ("bishop", 6),      # a diagonal de (3, 3) começa num muro
+    ("queen", 12),
+])
+def test_attack_counts(tables, kind, count):
+    walls = mask(*WALLS)
+    attacks = tables.attacks(kind, square(2, 2), walls, walls)
+    assert bin(attacks).count("1") == count
+    assert not attacks & walls
+
+
+def test_pawn_walks_orthogonally(tables):
+    walls = mask(*WALLS)
+    assert tiles(tables.reach("pawn", square(2, 2), walls)) == {(2, 3), (1, 2), (3, 2)}
+
+
+def test_slider_stops_at_piece_and_can_capture_it(tables):
+    walls = mask(*WALLS)
+    occupied = walls | mask((1, 2))
+    attacks = tables.attacks("rook", square(2, 2), occupied, walls)
+    assert tiles(attacks) == {(1, 2), (2, 3), (2, 4), (3, 2), (4, 2)}
+    assert tiles(tables.reach("rook", square(2, 2), occupied)) == {(2, 3), (2, 4), (3, 2), (4, 2)}
+
+
+def test_knight_jumps_over_walls(tables):
+    walls = mask((1, 2), (2, 1), (1, 1))
+    assert (1, 0) in tiles(tables.attacks("knight", square(2, 2), walls, walls))
+
+
+def piece(kind, x, y):
+    return SimpleNamespace(kind=kind, actor=SimpleNamespace(pos=(x * TILE + TILE // 2, y * TILE + TILE // 2)))
+
+
+def test_board_attackers(tables):
+    hero = piece("rook", 2, 2)
+    room = [
+        piece("rook", 2, 4),    # pela coluna
+        piece("bishop", 0, 0),  # pela diagonal
+        piece("knight", 0, 1),
+        piece("pawn", 3, 1),    # diagonal vizinha
+        piece("rook", 2, 0),    # atrás do muro em (2, 1)
+        piece("queen", 0, 4),   # diagonal bloqueada pela peça em (1, 3)
+        piece("pawn", 1, 3),    # diagonal vizinha
+        piece("knight", 4, 4),  # não alcança
+    ]
+    board = Board(tables, mask(*WALLS), room, [hero])
+    assert {(p.kind, *p.actor.pos) for p in board.attackers(hero)} == {
+        (p.kind, *p.actor.pos) for p in (room[0], room[1], room[2], room[3], room[6])
+    }
+    assert board.attackers_mask(board.square(hero)) == mask((2, 4), (0, 0), (0, 1), (3, 1), (1, 3))
@@ -0,0 +1,32 @@
+"""Peças de xadrez (chess_pieces.py)"""
+import random
+
+
+def walk_to(piece, goal, speed=4):
+    piece.move_to(goal)
+    while piece.goal is not None:
+        piece.update_position(speed)
+        piece.animate_sprite()
+
+
+def test_thinking_piece_stops_walking_at_the_goal():
+    from chess_pieces import ThinkingPiece
+
+    piece = ThinkingPiece(96, 96, "rook", rng=random.Random(1))
+    walk_to(piece, (160, 96))
+    assert piece.actor.pos == (160, 96)
+    assert not piece.moving
+    assert piece.timeline.frames == piece.forward_seq[-1:]
+
+
+def test_thinking_piece_finish_move_stops_walking():
+    from chess_pieces import ThinkingPiece
+
+    piece = ThinkingPiece(96, 96, "rook", rng=random.Random(1))
+    piece.move_to((96, 224))
+    piece.update_position(4)
+    piece.animate_sprite()
+    assert piece.timeline.frames is piece.sprites["down"]
+    piece.finish_move()
+    assert piece.actor.pos == (96, 224)
+    assert piece.timeline.frames == piece.forward_seq[-1:]
@@ -0,0 +1,102 @@
+"""Grade de portas e salas em memória do MapManager (map_manager.py)"""
+from array import array
+
+import pytest
+
+from map_manager import DOOR_BITS, DOOR_DOWN, DOOR_LEFT, DOOR_RIGHT, DOOR_UP, OPPOSITE_BIT, MapManager
+
+# Grades degeneradas (uma sala, uma linha, uma coluna), uma pequena e uma de um milhão de salas
+SIZES = [(1, 1), (1, 9), (9, 1), (12, 7), (1000, 1000)]
+
+
+def generated(rows, cols, loop_chance=None, seed=7):
+    options = {} if loop_chance is None else {"loop_chance": loop_chance}
+    map_manager = MapManager(grid_rows=rows, grid_cols=cols, seed=seed, **options)
+    map_manager.generate_rooms()
+    return map_manager
+
+
+def reachable(map_manager):
+    """Quantas salas uma busca em largura a partir da sala 0 alcança, seguindo os bits de porta."""
+    grid, cols = map_manager.door_grid, map_manager.grid_cols
+    steps = {DOOR_UP: -cols, DOOR_DOWN: cols, DOOR_LEFT: -1, DOOR_RIGHT: 1}
+    seen = bytearray(len(grid))
+    seen[0] = 1
+    queue = array("l", [0])
+    for cell in queue:     # A fila cresce durante o laço
+        bits = grid[cell]
+        for bit, step in steps.items():
+            if bits & bit and not seen[cell + step]:
+                seen[cell + step] = 1
+                queue.append(cell + step)
+    return len(queue)
+
+
+def asymmetric_doors(map_manager):
+    """Portas sem a porta oposta na sala vizinha (ou que saem da grade): lista de (sala, bit)."""
+    grid, rows, cols = map_manager.door_grid, map_manager.grid_rows, map_manager.grid_cols
+    wrong = []
+    for cell, bits in enumerate(grid):
+        if not bits:
+            continue
+        r, c = divmod(cell, cols)
+        for bit, inside, neighbor in ((DOOR_UP, r > 0, cell - cols), (DOOR_DOWN, r < rows - 1, cell + cols),
+                                      (DOOR_LEFT, c > 0, cell - 1), (DOOR_RIGHT, c < cols - 1, cell + 1)):
+            if bits & bit and not (inside and grid[neighbor] & OPPOSITE_BIT[bit]):
+                wrong.append((cell, bit))
+    return wrong
+
+
+@pytest.mark.parametrize("rows, cols", SIZES)
+def test_every_room_is_reachable_and_doors_are_symmetric(rows, cols):
+    map_manager = generated(rows, cols)
+    assert len(map_manager.door_grid) == rows * cols
+    assert reachable(map_manager) == rows * cols
+    assert asymmetric_doors(map_manager) == []
+
+
+@pytest.mark.parametrize("rows, cols", SIZES[:-1])
+def test_without_loops_the_doors_form_a_spanning_tree(rows, cols):
+    map_manager = generated(rows, cols, loop_chance=0)
+    doors = sum(bin(bits).count("1") for bits in map_manager.door_grid) // 2
+    assert doors == rows * cols - 1
+    assert reachable(map_manager) == rows * cols
+
+
+def test_door_view_matches_the_bits():
+    map_manager = generated(12, 7)
+    for r in range(12):
+        for c in range(7):
+            view = map_manager.doors(r, c)
+            bits = map_manager.door_grid[r * 7 + c]
+            assert dict(view) == {direction: bool(bits & bit) for direction, bit in DOOR_BITS.items()}
+            assert [direction for direction, _, _ in map_manager.open_neighbors(r, c)] == \
+                [direction for direction, is_open in view.items() if is_open]
+
+
+def test_evicted_room_keeps_its_pieces_and_pinned_room_stays():
+    map_manager = generated(3, 3)
+    map_manager.max_resident_halls = 2
+    first = map_manager.get_hall(0, 0)
+    pieces = [object(), object()]
+    first.entities, first.last_simulated, first.populated = pieces, 12.5, True
+    map_manager.pinned.add((0, 1))
+    pinned = map_manager.get_hall(0, 1)
+
+    # (0, 0) é a menos usada: sai primeiro e as peças dela ficam guardadas
+    map_manager.get_hall(1, 0)
+    assert list(map_manager.resident) == [(0, 1), (1, 0)]
+    assert map_manager.stashed[(0, 0)] == (pieces, 12.5)
+    # A sala fixada nunca sai, mesmo sendo a menos usada; (1, 0) nunca foi povoada
+    map_manager.get_hall(1, 1)
+    assert list(map_manager.resident) == [(0, 1), (1, 1)]
+    assert map_manager.get_hall(0, 1) is pinned
+    assert (1, 0) not in map_manager.stashed
+
+    # De volta a (0, 0): sala nova, com as mesmas peças e o mesmo instante da última simulação
+    again = map_manager.get_hall(0, 0)
+    assert again is not first
+    assert again.populated and again.last_simulated == 12.5
+    assert again.entities is pieces
+    assert (0, 0) not in map_manager.stashed
+    assert list(map_manager.resident) == [(0, 1), (0, 0)]
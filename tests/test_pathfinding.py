@@ -0,0 +1,101 @@
+"""Grade de navegação (pathfinding.py) num mapa pequeno com muros e uma porta"""
+from collections import deque
+
+from pathfinding import DOOR, FLOOR, TILE, WALL, NavGrid
+
+# '#' muro, '.' piso, 'D' porta; o tile (7, 1) fica cercado de muros
+ROOM = (
+    "#########",
+    "#...#.#.#",
+    "#.#.#.###",
+    "#.#...#.#",
+    "#.###.#.D",
+    "#.......#",
+    "#########",
+)
+CELLS = {"#": WALL, ".": FLOOR, "D": DOOR}
+
+
+def grid():
+    return NavGrid(len(ROOM[0]), len(ROOM), [CELLS[char] for row in ROOM for char in row])
+
+
+def center(tx, ty):
+    return (tx * TILE + TILE // 2, ty * TILE + TILE // 2)
+
+
+def bfs_steps(grid, start, goal):
+    """Passos do caminho mais curto, por uma busca em largura independente da NavGrid."""
+    steps = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell == goal:
+            return steps[cell]
+        for neighbor in grid.neighbors(cell):
+            if neighbor not in steps:
+                steps[neighbor] = steps[cell] + 1
+                queue.append(neighbor)
+    return None
+
+
+def test_astar_path_is_as_short_as_bfs():
+    nav = grid()
+    walkable = [cell for cell, value in enumerate(nav.cells) if value != WALL]
+    for start in walkable:
+        for goal in walkable:
+            path = nav.find_path(nav.center(start), nav.center(goal))
+            steps = bfs_steps(nav, start, goal)
+            if steps is None:
+                assert path is None
+            else:
+                assert len(path) == steps
+                assert path == [] or path[-1] == nav.center(goal)
+                # Cada passo vai para um tile vizinho que não é muro
+                previous = start
+                for point in path:
+                    cell = nav.cell_at(*point)
+                    assert cell in nav.neighbors(previous)
+                    previous = cell
+
+
+def test_path_to_walled_in_goal_is_none_and_cached():
+    nav = grid()
+    calls = []
+    astar = nav._astar
+    nav._astar = lambda start, goal: calls.append((start, goal)) or astar(start, goal)
+
+    start, goal = center(1, 1), center(7, 1)
+    assert nav.find_path(start, goal) is None
+    assert nav.find_path(start, goal) is None
+    assert len(calls) == 1
+    assert nav._paths[(nav.cell_at(*start), nav.cell_at(*goal))] is None
+    # Destino em cima de um muro: nem chega a buscar
+    assert nav.find_path(start, center(0, 0)) is None
+    assert len(calls) == 1
+
+
+def test_set_cell_clears_paths_and_flows():
+    nav = grid()
+    start, goal = center(1, 1), center(7, 1)
+    assert nav.find_path(start, goal) is None
+    assert not nav.flow_field(goal).reachable(*start)
+    assert nav._paths and nav._flows
+
+    # Abre o muro embaixo do tile cercado: ele passa a ligar com o corredor da direita
+    nav.set_cell(7, 2, FLOOR)
+    assert not nav._paths and not nav._flows
+    assert len(nav.find_path(start, goal)) == bfs_steps(nav, nav.cell_at(*start), nav.cell_at(*goal))
+    assert nav.flow_field(goal).reachable(*start)
+
+
+def test_patrol_limits_stop_at_walls_and_doors():
+    nav = grid()
+    # Linha 5: piso de x=1 a x=7; coluna 5: piso de y=1 a y=5
+    limits = nav.patrol_limits(*center(5, 5))
+    assert limits["horizontal"] == (center(1, 5)[0], center(7, 5)[0])
+    assert limits["vertical"] == (center(5, 1)[1], center(5, 5)[1])
+    # A porta em (8, 4) interrompe a faixa do corredor da direita
+    limits = nav.patrol_limits(*center(7, 4))
+    assert limits["horizontal"] == (center(7, 4)[0], center(7, 4)[0])
+    assert limits["vertical"] == (center(7, 3)[1], center(7, 5)[1])
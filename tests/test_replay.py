@@ -0,0 +1,45 @@
+"""Uma partida gravada reproduz os mesmos estados, do início ou do meio do jogo"""
+import random
+
+import pytest
+
+CHECKPOINT_TICKS = 60
+
+
+def record(seed, ticks, before=0, tactical=True):
+    """Roda 'before' ticks sem gravar e grava os 'ticks' seguintes. Devolve (gravação, mundo gravado)."""
+    from headless import random_input
+    from replay import Recorder, Recording
+    from world import World, TICK
+
+    world = World(grid_rows=8, grid_cols=8, seed=seed, tactical=tactical)
+    inputs = random_input(random.Random(seed))
+    for _ in range(before):
+        world.tick(next(inputs))
+    recorder = Recorder(world, checkpoint_ticks=CHECKPOINT_TICKS)
+    for _ in range(ticks):
+        recorder.tick(next(inputs), TICK)
+    return Recording(recorder.encode()), world
+
+
+@pytest.mark.parametrize("seed, tactical", [(1, True), (2, True), (2, False)])
+def test_fresh_recording_replays(seed, tactical):
+    from replay import replay, state_hash
+
+    recording, world = record(seed, 1200, tactical=tactical)
+    assert not recording.initial_save
+    assert recording.tactical == tactical
+    replayed, _ = replay(recording)
+    assert len(recording.checkpoints) == 1200 // CHECKPOINT_TICKS
+    assert state_hash(replayed) == state_hash(world)
+
+
+@pytest.mark.parametrize("seed", [2, 3, 4, 5])
+def test_mid_game_recording_replays(seed):
+    from replay import replay, state_hash
+
+    recording, world = record(seed, 1200, before=600)
+    assert recording.initial_save
+    replayed, _ = replay(recording)
+    assert replayed.ticks == world.ticks
+    assert state_hash(replayed) == state_hash(world)
@@ -0,0 +1,63 @@
+"""Próxima porta e distância entre salas (room_graph.py)"""
+import random
+
+import pytest
+
+from map_manager import DIRECTION_OFFSETS, MapManager
+from room_graph import RoomGraph
+
+
+def walk(graph, map_manager, r, c, target_r, target_c):
+    """Segue next_hop de (r, c) até o destino; devolve quantas portas atravessou."""
+    doors = 0
+    while (r, c) != (target_r, target_c):
+        direction = graph.next_hop(r, c, target_r, target_c)
+        assert direction is not None
+        assert map_manager.doors(r, c)[direction]
+        dr, dc = DIRECTION_OFFSETS[direction]
+        r, c = r + dr, c + dc
+        doors += 1
+        # Cada porta deixa a peça uma sala mais perto
+        assert graph.distance(r, c, target_r, target_c) == graph.distance(r - dr, c - dc, target_r, target_c) - 1
+    assert graph.next_hop(r, c, target_r, target_c) is None
+    return doors
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 9), (9, 1), (6, 5)])
+def test_next_hop_reaches_every_target_in_distance_steps(rows, cols):
+    map_manager = MapManager(grid_rows=rows, grid_cols=cols, seed=3)
+    graph = RoomGraph(map_manager)
+    rooms = [(r, c) for r in range(rows) for c in range(cols)]
+    for target in rooms:
+        for room in rooms:
+            distance = graph.distance(*room, *target)
+            assert distance >= 0
+            assert walk(graph, map_manager, *room, *target) == distance
+
+
+def test_next_hop_on_a_million_rooms():
+    map_manager = MapManager(grid_rows=1000, grid_cols=1000, seed=3)
+    graph = RoomGraph(map_manager)
+    rng = random.Random(3)
+    target = (rng.randrange(1000), rng.randrange(1000))
+    assert -1 not in graph.distances_to(*target).distance
+    for _ in range(20):
+        room = (rng.randrange(1000), rng.randrange(1000))
+        assert walk(graph, map_manager, *room, *target) == graph.distance(*room, *target)
+    # Todas as consultas do mesmo destino vieram de uma única busca
+    assert graph.searches == 1
+
+
+def test_searches_are_cached_per_target_until_invalidated():
+    map_manager = MapManager(grid_rows=5, grid_cols=5, seed=3)
+    graph = RoomGraph(map_manager, max_targets=2)
+    graph.next_hop(0, 0, 4, 4)
+    graph.next_hop(1, 2, 4, 4)
+    assert graph.searches == 1
+    graph.next_hop(0, 0, 2, 2)
+    graph.next_hop(0, 0, 3, 3)     # Descarta a busca de (4, 4), a menos usada
+    graph.next_hop(0, 0, 4, 4)
+    assert graph.searches == 4
+    graph.invalidate()
+    graph.next_hop(0, 0, 4, 4)
+    assert graph.searches == 5
@@ -0,0 +1,102 @@
+"""Salvar, carregar e continuar deve dar o mesmo jogo que não parar"""
+import random
+
+import pytest
+
+ROWS = COLS = 8
+
+
+def run_and_save(seed, ticks, until=None):
+    """Roda 'ticks' ticks (e depois até 'until(world)', se dado) e devolve (world, entrada, bytes salvos)."""
+    from headless import random_input
+    from savegame import encode, take_snapshot
+    from world import World, THINK_NODES
+
+    world = World(grid_rows=ROWS, grid_cols=COLS, seed=seed, tactical=True, think_nodes=THINK_NODES)
+    inputs = random_input(random.Random(seed))
+    for _ in range(ticks):
+        world.tick(next(inputs))
+    if until is not None:
+        while not until(world):
+            world.tick(next(inputs))
+    return world, inputs, encode(take_snapshot(world))
+
+
+def loaded(seed, data):
+    from savegame import SaveFile
+    from world import World, THINK_NODES
+
+    world = World(grid_rows=ROWS, grid_cols=COLS, seed=seed, tactical=True, think_nodes=THINK_NODES)
+    SaveFile(data).restore(world)
+    return world
+
+
+def first_divergence(a, b, inputs, ticks):
+    """Primeiro tick em que os dois mundos diferem (None se não diferirem)."""
+    from replay import state_hash
+
+    for tick in range(ticks):
+        if state_hash(a) != state_hash(b):
+            return tick
+        controls = next(inputs)
+        a.tick(controls)
+        b.tick(controls)
+    return None
+
+
+@pytest.mark.parametrize("seed", [2, 3, 4, 5])
+def test_load_and_continue_matches_uninterrupted_run(seed):
+    original, inputs, data = run_and_save(seed, 600)
+    assert first_divergence(original, loaded(seed, data), inputs, 1500) is None
+
+
+def test_load_during_room_transition():
+    original, inputs, data = run_and_save(3, 300, until=lambda world: world.transition_active)
+    restored = loaded(3, data)
+    assert restored.transition_active
+    assert first_divergence(original, restored, inputs, 600) is None
+
+
+def test_save_of_loaded_game_matches_uninterrupted_run():
+    from savegame import encode, take_snapshot
+
+    original, inputs, data = run_and_save(4, 3000)
+    twice = loaded(4, encode(take_snapshot(loaded(4, data))))
+    assert first_divergence(original, twice, inputs, 600) is None
+
+
+def test_pending_room_recoded_with_other_name_table():
+    from savegame import RawRoom, SaveFile, build_piece, piece_state
+
+    _, _, data = run_and_save(1, 3000)
+    saved = SaveFile(data)
+    assert saved.rooms
+
+    def states(raw):
+        return [piece_state(build_piece(record, raw.names)) for record in raw.records()]
+
+    names = {"outro nome": 0}
+    for _, raw in saved.rooms.values():
+        data = raw.recode(lambda name: names.setdefault(name, len(names)))
+        assert states(RawRoom(data, raw.count, list(names))) == states(raw)
+
+
+def test_queued_save_runs_when_previous_finishes(tmp_path):
+    import threading
+
+    from savegame import Autosaver, SaveFile
+
+    world, _, _ = run_and_save(2, 120)
+    path = tmp_path / "save.dat"
+    autosaver = Autosaver(world, str(path), interval=30)
+    # Um salvamento "em andamento" que só termina quando liberado
+    release = threading.Event()
+    autosaver._thread = threading.Thread(target=release.wait)
+    autosaver._thread.start()
+
+    assert not autosaver.save(queue=True)
+    assert autosaver.pending and not autosaver.poll()
+    release.set()
+    autosaver.wait()
+    assert not autosaver.pending and autosaver.saves == 1
+    assert SaveFile.read(str(path)).header[8] == world.ticks
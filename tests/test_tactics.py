@@ -0,0 +1,77 @@
+"""Busca do modo tático (tactics.py) num tabuleiro pequeno"""
+from chess_moves import move_tables
+from tactics import MATE_SCORE, WIN_SCORE, Position, TacticalSearch, search_score, table_score
+from world import THINK_NODES
+
+WIDTH = HEIGHT = 8
+
+
+def square(x, y):
+    return y * WIDTH + x
+
+
+def choose(room, hero, origin, walls=0):
+    tables = move_tables(WIDTH, HEIGHT)
+    search = TacticalSearch(tables)
+    target = search.choose(Position(tables, walls, room, hero), origin, max_nodes=THINK_NODES)
+    assert search.nodes <= THINK_NODES
+    return target
+
+
+def test_captures_the_last_piece():
+    # Sem peças, o herói perdeu: a torre captura já
+    rook = square(0, 0)
+    assert choose([(rook, "rook")], [(square(0, 7), "knight")], rook) == square(0, 7)
+
+
+def test_wall_blocks_the_capture():
+    rook = square(0, 0)
+    target = choose([(rook, "rook")], [(square(0, 7), "knight")], rook, walls=1 << square(0, 3))
+    assert target != square(0, 7)
+
+
+def test_takes_a_free_piece():
+    bishop = square(2, 2)
+    hero = [(square(5, 5), "rook"), (square(7, 0), "pawn")]
+    assert choose([(bishop, "bishop")], hero, bishop) == square(5, 5)
+
+
+def test_leaves_a_defended_piece():
+    # O peão está defendido pela torre: a dama não troca 900 por 100
+    queen = square(3, 3)
+    hero = [(square(5, 5), "pawn"), (square(5, 7), "rook")]
+    assert choose([(queen, "queen")], hero, queen) != square(5, 5)
+
+
+def test_mate_scores_stored_relative_to_the_position():
+    # Vitória achada dois plies abaixo de uma posição vista no ply 3...
+    found = WIN_SCORE - 5
+    stored = table_score(found, 3)
+    # ... vale a mesma distância quando a posição aparece de novo no ply 1
+    assert search_score(stored, 1) == WIN_SCORE - 3
+    assert search_score(table_score(-found, 3), 1) == -(WIN_SCORE - 3)
+    assert table_score(MATE_SCORE - 1, 3) == MATE_SCORE - 1
+
+
+def thinking_world(tactical):
+    """Mundo com algumas ThinkingPiece na sala atual, depois de 4 ciclos de THINK_TICKS."""
+    import random
+
+    from chess_pieces import ThinkingPiece
+    from world import NO_INPUT, THINK_TICKS, World
+
+    world = World(grid_rows=4, grid_cols=4, seed=1234, tactical=tactical, think_nodes=THINK_NODES)
+    rng = random.Random(1234)
+    thinkers = [ThinkingPiece(rng.randrange(128, world.width - 128), rng.randrange(128, world.height - 128),
+                              rng.choice(("pawn", "rook", "queen", "knight")), rng=world.rng) for _ in range(6)]
+    for piece in thinkers:
+        world.add_piece(piece)
+    start = [piece.actor.pos for piece in thinkers]
+    for _ in range(4 * THINK_TICKS):
+        world.tick(NO_INPUT)
+    return [piece for piece, pos in zip(thinkers, start) if piece.actor.pos != pos]
+
+
+def test_thinking_pieces_only_move_in_tactical_mode():
+    assert not thinking_world(tactical=False)
+    assert thinking_world(tactical=True)
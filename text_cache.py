@@ -0,0 +1,60 @@
+"""
+Cache das superfícies de texto (HUD e menu)
+
+O screen.draw.text do PGZero rasteriza a fonte (ou monta a chave do cache
+interno do ptext com todos os parâmetros) a cada chamada, ou seja, 60 vezes
+por segundo para cada texto na tela. Aqui cada texto é renderizado uma única
+vez por combinação (texto, tamanho da fonte, cor) e a superfície pronta é
+reaproveitada até sair do cache (as menos usadas recentemente saem primeiro).
+
+Pensado para textos de uma linha, como os do HUD e os botões do menu.
+"""
+from collections import OrderedDict
+
+from pgzero import ptext
+
+# Quantas superfícies de texto ficam guardadas
+DEFAULT_MAX_TEXTS = 128
+
+
+class TextCache:
+    """(texto, tamanho da fonte, cor) -> superfície renderizada, com descarte LRU"""
+    def __init__(self, max_texts=DEFAULT_MAX_TEXTS):
+        self.max_texts = max_texts
+        self.surfaces = OrderedDict()
+        self.renders = 0    # Quantas vezes o texto foi de fato rasterizado
+
+    def get(self, text, fontsize, color):
+        """Superfície do texto, renderizada só se ainda não estiver no cache."""
+        key = (text, fontsize, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        # cache=False: o ptext não precisa guardar outra cópia
+        surface = self.surfaces[key] = ptext.getsurf(text, fontsize=fontsize, color=color, cache=False)
+        self.renders += 1
+        if len(self.surfaces) > self.max_texts:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def draw(self, screen, text, fontsize, color, center=None, topleft=None):
+        """
+        Desenha o texto centralizado em 'center' ou a partir de 'topleft'
+        (mesmo posicionamento do screen.draw.text).
+        """
+        surface = self.get(text, fontsize, color)
+        if center is not None:
+            x = int(round(center[0] - 0.5 * surface.get_width()))
+            y = int(round(center[1] - 0.5 * surface.get_height()))
+        else:
+            x, y = topleft
+        screen.blit(surface, (x, y))
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# Cache compartilhado pelo HUD e pelo menu
+text_cache = TextCache()
@@ -1,9 +1,30 @@
 #!/usr/bin/python
+"""
+Remove a cor de fundo de todos os PNGs de uma pasta (e subpastas)
+
+A comparação de cores é feita de uma vez sobre o array da imagem (NumPy),
+os arquivos são processados em paralelo (um processo por núcleo) e um cache
+com o hash de cada entrada fica na pasta de saída: rodar de novo só refaz
+as imagens que mudaram (ou cuja tolerância mudou).
+"""
 import os
 import sys
+import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:  # Sem NumPy: usa o laço pixel a pixel (bem mais lento)
+    np = None
+
+# Arquivo, dentro da pasta de saída, com o hash de cada imagem já processada
+CACHE_FILE = ".transparentar_cache.json"
+# Mude quando o algoritmo mudar, para invalidar o cache antigo
+CACHE_VERSION = 1
+
 
 def remove_background_color(input_path, output_path, tolerance=30, msg_indent="   |            "):
     """
@@ -15,37 +36,99 @@ def remove_background_color(input_path, output_path, tolerance=30, msg_indent="
       input_path: Caminho da imagem de entrada.
       output_path: Caminho para salvar a imagem processada.
       tolerance: Valor máximo para a diferença entre os canais (R, G, B).
-      msg_indent: Indentação (com marcador) para as mensagens exibidas.
+      msg_indent: Indentação (com marcador) para as mensagens exibidas; None não exibe nada.
+
+    Retorna a cor de fundo encontrada.
     """
     img = Image.open(input_path).convert("RGBA")
     bg_color = img.getpixel((0, 0))
-    print(f"{msg_indent}[Processando] {os.path.basename(input_path)} – cor de fundo: {bg_color}")
-
-    new_data = []
-    for pixel in img.getdata():
-        r, g, b, a = pixel
-        if (abs(r - bg_color[0]) < tolerance and
-            abs(g - bg_color[1]) < tolerance and
-            abs(b - bg_color[2]) < tolerance):
-            new_data.append((r, g, b, 0))
-        else:
-            new_data.append((r, g, b, a))
-    img.putdata(new_data)
+    if msg_indent is not None:
+        print(f"{msg_indent}[Processando] {os.path.basename(input_path)} – cor de fundo: {bg_color}")
+
+    if np is not None:
+        pixels = np.array(img)
+        # Diferença de cada canal RGB para a cor de fundo (int16 para não estourar)
+        diff = np.abs(pixels[..., :3].astype(np.int16) - np.array(bg_color[:3], dtype=np.int16))
+        pixels[(diff < tolerance).all(axis=-1), 3] = 0
+        img = Image.fromarray(pixels, "RGBA")
+    else:
+        new_data = []
+        for pixel in img.getdata():
+            r, g, b, a = pixel
+            if (abs(r - bg_color[0]) < tolerance and
+                abs(g - bg_color[1]) < tolerance and
+                abs(b - bg_color[2]) < tolerance):
+                new_data.append((r, g, b, 0))
+            else:
+                new_data.append((r, g, b, a))
+        img.putdata(new_data)
     img.save(output_path)
-    print(f"{msg_indent}[Salvo] {os.path.basename(output_path)}")
+    if msg_indent is not None:
+        print(f"{msg_indent}[Salvo] {os.path.basename(output_path)}")
+    return bg_color
+
+
+def file_hash(path):
+    """Hash (SHA-256) do conteúdo do arquivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cache(output_folder):
+    """Lê o cache da pasta de saída ({caminho relativo: {"hash", "tolerance"}})."""
+    path = os.path.join(output_folder, CACHE_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
 
+def save_cache(output_folder, files):
+    path = os.path.join(output_folder, CACHE_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f, indent=1, sort_keys=True)
 
-def process_folder(input_folder, output_folder, tolerance=30):
+
+def _process_job(job):
+    """Executado nos processos do pool: (entrada, saída, tolerância) -> cor de fundo ou erro."""
+    input_path, output_path, tolerance = job
+    try:
+        return remove_background_color(input_path, output_path, tolerance, msg_indent=None), None
+    except Exception as error:  # O erro de um arquivo não derruba os demais
+        return None, f"{type(error).__name__}: {error}"
+
+
+def process_folder(input_folder, output_folder, tolerance=30, jobs=None, force=False):
     """
     Percorre recursivamente a pasta input_folder e suas subpastas, 
     processa todos os arquivos PNG e salva a saída mantendo a estrutura original dentro de output_folder.
     
-    Exibe a estrutura em árvore. Para cada arquivo, após imprimir sua linha (com "├──"),
-    as mensagens de processamento são exibidas em linhas imediatamente abaixo, 
-    com uma indentação extra iniciada por "   |            ".
+    Exibe a estrutura em árvore. Para cada arquivo, logo abaixo da sua linha (com "├──"),
+    vem uma linha com o resultado, indentada com "|": "[Processado] cor de fundo: ...",
+    "[Sem mudanças] mantido do cache" ou "[Erro] ...". No fim, uma linha resume quantos
+    arquivos foram processados, quantos ficaram sem mudanças e quantos deram erro.
+
+    Os arquivos são processados em paralelo por 'jobs' processos (padrão: um por núcleo).
+    Arquivos cujo conteúdo e tolerância não mudaram desde a última execução (e cuja saída
+    ainda existe) são pulados, a menos que 'force' seja verdadeiro.
     """
     input_folder = os.path.abspath(input_folder)
     output_folder = os.path.abspath(output_folder)
+    cache = {} if force else load_cache(output_folder)
+    new_cache = {}
+
+    # Primeiro monta a árvore e a lista de trabalhos; as linhas são exibidas na
+    # ordem original à medida que os resultados chegam
+    lines = []      # ("pasta", texto) ou ("arquivo", texto, indentação, trabalho ou None)
+    pending = []    # trabalhos (entrada, saída, tolerância) a processar
+    keys = []       # (caminho relativo, hash) de cada trabalho
 
     for dirpath, dirnames, filenames in os.walk(input_folder):
         # Ordena para exibição consistente
@@ -59,23 +142,68 @@ def process_folder(input_folder, output_folder, tolerance=30):
 
         # Nome da pasta: se for raiz, usamos o nome da pasta de entrada
         folder_name = os.path.basename(input_folder) if relative == "." else os.path.basename(dirpath)
-        print(f"{indent}{folder_name}/")
+        lines.append(("pasta", f"{indent}{folder_name}/"))
 
         # Cria o correspondente diretório na pasta de saída
         output_dir = os.path.join(output_folder, relative) if relative != "." else output_folder
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Para cada arquivo PNG, imprime a linha e processa o arquivo
+        # Para cada arquivo PNG, registra a linha e, se mudou, o trabalho
         for filename in filenames:
             if filename.lower().endswith(".png"):
                 file_indent = indent + "├── "
-                print(f"{file_indent}{filename}")
                 # Nova indentação para as mensagens, com vertical "|"
                 child_indent = indent + "|        "
                 input_path = os.path.join(dirpath, filename)
                 output_path = os.path.join(output_dir, filename)
-                remove_background_color(input_path, output_path, tolerance, msg_indent=child_indent)
+                key = os.path.relpath(input_path, input_folder).replace(os.sep, "/")
+                digest = file_hash(input_path)
+                entry = {"hash": digest, "tolerance": tolerance}
+                if cache.get(key) == entry and os.path.exists(output_path):
+                    new_cache[key] = entry
+                    lines.append(("arquivo", f"{file_indent}{filename}", child_indent, None))
+                    continue
+                job = (input_path, output_path, tolerance)
+                pending.append(job)
+                keys.append((key, entry))
+                lines.append(("arquivo", f"{file_indent}{filename}", child_indent, job))
+
+    jobs = jobs or os.cpu_count() or 1
+    processed = failed = 0
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(pending) > 1 else None
+    try:
+        if executor is not None:
+            results = executor.map(_process_job, pending, chunksize=max(1, len(pending) // (jobs * 8)))
+        else:
+            results = map(_process_job, pending)
+        results = iter(results)
+        key_iter = iter(keys)
+        for line in lines:
+            if line[0] == "pasta":
+                print(line[1])
+                continue
+            _, text, child_indent, job = line
+            print(text)
+            if job is None:
+                print(f"{child_indent}[Sem mudanças] mantido do cache")
+                continue
+            bg_color, error = next(results)
+            key, entry = next(key_iter)
+            if error is not None:
+                failed += 1
+                print(f"{child_indent}[Erro] {error}")
+                continue
+            processed += 1
+            new_cache[key] = entry
+            print(f"{child_indent}[Processado] cor de fundo: {bg_color}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        save_cache(output_folder, new_cache)
+
+    skipped = len(lines) - processed - failed - sum(1 for line in lines if line[0] == "pasta")
+    print(f"{processed} processada(s), {skipped} sem mudanças, {failed} com erro.")
 
 
 def main():
@@ -92,6 +220,14 @@ def main():
         "--tolerance", type=int, default=30,
         help="Valor da tolerância para remoção do fundo (padrão: 30)."
     )
+    parser.add_argument(
+        "--jobs", type=int, default=None,
+        help="Quantidade de processos em paralelo (padrão: um por núcleo)."
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Ignora o cache e processa todas as imagens de novo."
+    )
     args = parser.parse_args()
 
     if not os.path.isdir(args.folder):
@@ -110,7 +246,7 @@ def main():
     else:
         print(f"Pasta de saída já existe: {output_folder}")
 
-    process_folder(input_folder, output_folder, args.tolerance)
+    process_folder(input_folder, output_folder, args.tolerance, jobs=args.jobs, force=args.force)
 
 
 if __name__ == "__main__":
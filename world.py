@@ -0,0 +1,837 @@
+"""
+Estado do mundo e lógica de cada tick
+
+Tudo o que antes ficava em variáveis globais do main.py (mapa, salas, peças,
+transições e lutas) mora aqui, numa instância de World. O World não usa
+'screen', 'keyboard' nem 'music' do PGZero: a entrada chega por um objeto
+Controls a cada tick e o desenho só acontece quando alguém chama draw(screen).
+Assim o mesmo código roda dentro da janela (main.py) ou sem janela (headless.py).
+
+As peças não controladas moram nas salas (Hall.entities). Só a sala atual é
+simulada e desenhada; as outras ficam paradas e, quando o herói volta a
+entrar nelas, recebem uma atualização grosseira pelo tempo que passou
+(catch_up). Assim o custo de um tick depende da população de uma sala, não
+do labirinto inteiro.
+
+A lógica anda em ticks de duração fixa (FixedStepLoop), independentes da taxa
+de quadros; o desenho interpola as posições entre o tick anterior e o atual.
+"""
+import random
+from itertools import chain
+
+from animation import AnimationClock
+from chess_pieces import Piece, ActivePiece, ThinkingPiece, PieceAndante, ChasingPiece, DIRECTIONS
+from fight_manager import Fight
+from map_manager import MapManager, DIRECTION_OFFSETS
+from patrol_batch import PatrolBatch, PATROL_TYPES, numpy_available
+from profiler import NULL_PROFILER
+from room_graph import RoomGraph, OPPOSITE_SIDE
+from chess_moves import Board
+from tactics import Position, ThinkRequest, decide
+from text_cache import text_cache
+
+# Dimensões da tela/sala em pixels
+WIDTH, HEIGHT = 1280, 704
+
+# Definindo um threshold (valor em pixels) que determina a "zona de ativação" da porta
+DOOR_THRESHOLD = 50
+
+# Frequência padrão da lógica (ticks por segundo) e a duração de um tick
+LOGIC_HZ = 60
+TICK = 1 / LOGIC_HZ
+
+# Velocidades em pixels por segundo (antes eram 3, 2 e 40 pixels por frame a 60 fps)
+PLAYER_SPEED = 180
+NPC_SPEED = 120
+TRANSITION_SPEED = 2400
+
+# Margem (pixels) além da borda da tela em que uma peça ainda conta como visível:
+# o centro do Actor pode estar fora da tela com parte do sprite aparecendo
+VISIBLE_MARGIN = 96
+
+# Quantidade mínima e máxima de peças criadas em cada sala (exceto a inicial)
+ROOM_POPULATION = (0, 4)
+PIECE_KINDS = ("pawn", "rook", "queen", "knight", "bishop")
+# Tipos que têm a animação de rotação (pasta <kind>_turn) usada pelas ThinkingPiece
+THINKING_KINDS = ("pawn", "rook", "queen", "knight")
+
+# Tempo (segundos) que uma peça perseguidora leva para atravessar uma sala atrás do herói
+ROOM_HOP_TIME = 3.0
+
+# Modo tático (ver tactics.py; desligado por padrão, ver World(tactical=...)): a cada
+# THINK_TICKS ticks, cada ThinkingPiece parada escolhe um lance; cada uma pensa num
+# tick diferente, então um tick faz no máximo uma busca
+THINK_TICKS = 60
+# Orçamento de cada busca: em segundos (jogo normal; a profundidade acompanha a máquina)
+# ou em nós (partidas gravadas: o mesmo lance em qualquer máquina, ver replay.py)
+THINK_BUDGET = 0.004
+THINK_NODES = 300
+
+# Máximo de ticks por quadro: se um quadro demorar demais, o resto do atraso é descartado
+# em vez de o jogo tentar recuperar tudo de uma vez (e ficar ainda mais lento)
+MAX_STEPS_PER_FRAME = 5
+
+
+class Controls:
+    """
+    Teclas pressionadas em um tick.
+    Tem os mesmos nomes de atributo do 'keyboard' do PGZero, então as peças
+    aceitam qualquer um dos dois.
+    """
+    __slots__ = ("left", "right", "up", "down", "tab")
+
+    def __init__(self, left=False, right=False, up=False, down=False, tab=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.tab = tab
+
+    @classmethod
+    def from_keyboard(cls, keyboard):
+        """Copia o estado atual do teclado do PGZero."""
+        return cls(keyboard.left, keyboard.right, keyboard.up, keyboard.down, keyboard.tab)
+
+
+# Nenhuma tecla pressionada
+NO_INPUT = Controls()
+
+
+class FixedStepLoop:
+    """
+    Acumulador de passo fixo: recebe o tempo real de cada quadro e roda
+    quantos ticks de 'step' segundos couberem nele. O que sobra fica para o
+    próximo quadro e vira 'alpha' (0 a 1), a fração do tick seguinte já
+    decorrida, usada para interpolar o desenho.
+    'world' é o World ou qualquer objeto com o mesmo tick(controls, dt)
+    (ex.: o replay.Recorder).
+    """
+    def __init__(self, world, hz=LOGIC_HZ, max_steps=MAX_STEPS_PER_FRAME):
+        self.world = world
+        self.step = 1 / hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step, 1.0)
+
+    def reset(self):
+        """Descarta o tempo acumulado (ex.: enquanto o menu está aberto)."""
+        self.accumulator = 0.0
+
+    def advance(self, frame_time, controls=NO_INPUT):
+        """Roda os ticks que cabem em 'frame_time' segundos e devolve quantos rodaram."""
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            self.world.tick(controls, self.step)
+            self.accumulator -= self.step
+            steps += 1
+        if steps == self.max_steps and self.accumulator >= self.step:
+            # Atrasado demais: o jogo desacelera em vez de travar
+            self.accumulator = self.accumulator % self.step
+        return steps
+
+
+class Pursuer:
+    """
+    Peça que saiu da sala atrás do herói. Fora da sala atual ela não é
+    simulada: só muda de sala a cada ROOM_HOP_TIME segundos, pela porta que
+    o RoomGraph indica, até chegar à sala do herói.
+    """
+    __slots__ = ("piece", "r", "c", "side", "next_move")
+
+    def __init__(self, piece, r, c, side, next_move):
+        self.piece = piece
+        self.r = r
+        self.c = c
+        self.side = side            # Parede da sala (r, c) por onde a peça aparece ao chegar
+        self.next_move = next_move  # Tempo do mundo da próxima troca de sala
+
+
+class World:
+    """Mapa, salas, peças, transição entre salas e lutas"""
+    def __init__(self, grid_rows=4, grid_cols=4, width=WIDTH, height=HEIGHT, profiler=NULL_PROFILER, seed=None,
+                 batch_patrols=None, tactical=False, think_budget=THINK_BUDGET, think_nodes=None,
+                 ai_jobs=None):
+        """
+        batch_patrols: atualiza as peças que patrulham em lote, com NumPy (ver patrol_batch.py).
+                       None = usa o lote se o NumPy estiver instalado.
+        tactical:      modo tático: as ThinkingPiece escolhem lances de xadrez (ver _think).
+                       Desligado, elas só giram paradas, como antes.
+        think_budget:  segundos de cada busca do modo tático.
+        think_nodes:   se dado, limita cada busca a este número de nós em vez do tempo.
+        ai_jobs:       AIJobs (ver ai_jobs.py) onde as buscas rodam, fora do tick;
+                       None = a busca roda dentro do tick.
+        """
+        self.width = width
+        self.height = height
+        # Mede o tempo de cada fase do tick/draw (ver profiler.py); desligado por padrão
+        self.profiler = profiler
+        if batch_patrols is None:
+            batch_patrols = numpy_available()
+        self.patrols = PatrolBatch() if batch_patrols else None
+
+        # Tempo de jogo simulado (segundos); as salas guardam quando foram simuladas pela última vez
+        self.time = 0.0
+        # Relógio das animações: troca as imagens só das peças visíveis (ver animation.py)
+        self.animation = AnimationClock()
+
+        # Lutas em andamento e as peças que estão lutando (ficam paradas até a luta acabar)
+        self.fights = []
+        self.fighting = set()
+        # Pares de peças que se tocavam no último tick (para disparar o contato só quando começa)
+        self.contacts = set()
+
+        # Instancia o MapManager e gera a grade de portas; as salas (halls) são criadas sob demanda
+        self.map_manager = MapManager(grid_rows=grid_rows, grid_cols=grid_cols, seed=seed)
+        self.map_manager.generate_rooms()
+        # Sorteios da simulação (ex.: a rotação das ThinkingPiece): derivados da semente do
+        # mapa e nunca do módulo random, para que a mesma semente e a mesma entrada repitam o jogo
+        self.rng = random.Random(f"{self.map_manager.seed}:world")
+        # Próxima porta em direção a qualquer sala (para perseguir o herói pelo labirinto)
+        self.room_graph = RoomGraph(self.map_manager)
+        # Peças que perseguem o herói entre as salas (ver Pursuer)
+        self.pursuers = []
+        # Bitboard da sala atual e o tick em que foi montado (ver board)
+        self._board = None
+        self._board_key = None
+        # Modo tático, o orçamento das buscas e o pool onde elas rodam (ver _think)
+        self.tactical = tactical
+        self.think_budget = think_budget
+        self.think_nodes = think_nodes
+        self.ai_jobs = ai_jobs
+
+        # Seleciona uma sala inicial aleatória
+        self.current_r = self.map_manager.rng.randrange(grid_rows)
+        self.current_c = self.map_manager.rng.randrange(grid_cols)
+        self.start_room = (self.current_r, self.current_c)
+        self.current_room = self._enter_room(self.current_r, self.current_c)
+        self._wake_room(self.current_room, self.current_r, self.current_c)
+        self._activate_room(self.current_room)
+        print(f"Sala inicial escolhida: room_{self.current_r}_{self.current_c}")
+
+        # --------------------------------
+        # Cria personagens/peças de xadrez
+        # --------------------------------
+        self.active_pieces = [
+            ActivePiece(width // 2, height // 2 + 170, 'pawn'),
+            ActivePiece(width // 2 + 270, height // 2, 'rook'),
+            ActivePiece(width // 2 - 30, height // 2, 'queen'),
+            ActivePiece(width // 2, height // 2 - 30, 'knight'),
+            ActivePiece(width // 2, height // 2 - 70, 'bishop'),
+        ]
+
+        self.active_piece_index = 0
+        self.active_piece = self.active_pieces[self.active_piece_index]
+        self.switch_delay = 0
+
+        # --- Variáveis de transição ---
+        self.transition_active = False      # Flag indicando se uma transição está em andamento
+        self.transition_direction = None    # "up", "down", "left" ou "right"
+        self.transition_progress = 0        # Acumulador de pixels deslocados na animação
+        self.prev_transition_progress = 0   # Progresso no tick anterior (para interpolar o slide)
+        self.transition_speed = TRANSITION_SPEED  # Velocidade de transição (pixels por segundo)
+        self.target_room = None
+        self.target_r = None
+        self.target_c = None
+
+        self.ticks = 0
+
+    @property
+    def pieces(self):
+        """Peças não controladas da sala atual."""
+        return self.current_room.entities
+
+    @pieces.setter
+    def pieces(self, pieces):
+        self.current_room.entities = pieces
+
+    def add_piece(self, piece):
+        """Coloca uma peça não controlada na sala atual."""
+        self.pieces.append(piece)
+        self._fit_patrols(self.current_room, (piece,))
+        if self.patrols is not None and isinstance(piece, PATROL_TYPES):
+            self.patrols.add(piece, NPC_SPEED)
+        return piece
+
+    # -----------------------------
+    # Peças de cada sala
+    # -----------------------------
+    def _spawn_pieces(self, r, c):
+        """
+        Peças criadas na primeira visita à sala (r, c). Vêm da semente da sala,
+        então o mesmo mapa tem sempre a mesma população.
+        """
+        width, height = self.width, self.height
+        if (r, c) == self.start_room:
+            return [
+                ThinkingPiece(width // 2 - 30, height // 2 - 170, 'pawn', rng=self.rng),
+                ThinkingPiece(width // 2 - 270, height // 2, 'rook', rng=self.rng),
+                PieceAndante(width // 2 - 90, height // 2, 'queen'),
+                PieceAndante(width // 2, height // 2 - 60, 'knight', 'down'),
+                Piece(width // 2, height // 2 + 40, 'bishop'),
+            ]
+
+        rng = random.Random(self.map_manager.room_seed(r, c) + ":pieces")
+        pieces = []
+        for _ in range(rng.randint(*ROOM_POPULATION)):
+            # Longe dos muros (2 tiles) para não nascer encostada numa porta
+            x = rng.randrange(2, width // 64 - 2) * 64 + 32
+            y = rng.randrange(2, height // 64 - 2) * 64 + 32
+            roll = rng.random()
+            if roll < 0.4:
+                pieces.append(PieceAndante(x, y, rng.choice(PIECE_KINDS), rng.choice(DIRECTIONS)))
+            elif roll < 0.8:
+                pieces.append(ThinkingPiece(x, y, rng.choice(THINKING_KINDS), rng=self.rng))
+            elif roll < 0.9:
+                pieces.append(Piece(x, y, rng.choice(PIECE_KINDS)))
+            else:
+                pieces.append(ChasingPiece(x, y, rng.choice(PIECE_KINDS)))
+        return pieces
+
+    def _fit_patrols(self, hall, pieces):
+        """O vai e vem das patrulhas fica entre os muros da sala (ver NavGrid.patrol_limits)."""
+        navigation = hall.navigation()
+        for piece in pieces:
+            if isinstance(piece, PATROL_TYPES):
+                piece.patrol_limits = navigation.patrol_limits(*piece.actor.pos)
+
+    def _wake_room(self, hall, r, c):
+        """
+        Prepara a sala para voltar a ser vista: cria as peças na primeira visita
+        ou aplica a atualização grosseira pelo tempo em que ficou parada.
+        """
+        if not hall.populated:
+            hall.entities = self._spawn_pieces(r, c)
+            hall.populated = True
+            self._fit_patrols(hall, hall.entities)
+        else:
+            self._fit_patrols(hall, hall.entities)
+            elapsed = self.time - hall.last_simulated
+            if elapsed > 0:
+                for piece in hall.entities:
+                    if piece not in self.fighting:
+                        piece.catch_up(elapsed, NPC_SPEED)
+            # Peças derrotadas enquanto o herói estava fora saem da sala
+            hall.entities = [piece for piece in hall.entities if piece.active]
+        hall.last_simulated = self.time
+        for piece in hall.entities:
+            piece.prev_pos = None
+        # Atualiza as imagens de uma vez (a sala aparece já durante a transição)
+        self.animation.apply(piece for piece in hall.entities if piece not in self.fighting)
+
+    def _activate_room(self, hall):
+        """A sala passa a ser simulada: suas patrulhas entram no lote."""
+        if self.patrols is not None:
+            for piece in hall.entities:
+                if isinstance(piece, PATROL_TYPES) and piece.active and piece not in self.fighting:
+                    self.patrols.add(piece, NPC_SPEED)
+
+    def _deactivate_room(self, hall):
+        """A sala deixa de ser simulada: sai do lote e do hash espacial e guarda o instante."""
+        if self.patrols is not None:
+            for piece in hall.entities:
+                self.patrols.remove(piece)
+        self._unindex_pieces(hall)
+        hall.last_simulated = self.time
+        # Lances em andamento terminam já: a sala adormecida não anda
+        for piece in hall.entities:
+            if isinstance(piece, ThinkingPiece):
+                piece.finish_move()
+        if self.ai_jobs is not None:
+            self.ai_jobs.cancel_all()   # As decisões pedidas eram para esta sala
+
+    def move_to_room(self, r, c):
+        """Troca a sala atual de uma vez, sem o slide (ex.: ao carregar um jogo salvo)."""
+        self._deactivate_room(self.current_room)
+        self.current_r, self.current_c = r, c
+        self.current_room = self._enter_room(r, c)
+        self._wake_room(self.current_room, r, c)
+        self._activate_room(self.current_room)
+        self.contacts = set()
+
+    # -----------------------------
+    # Transição entre salas
+    # -----------------------------
+    def _enter_room(self, r, c):
+        """
+        Torna (r, c) a sala atual: fixa-a na memória do MapManager e
+        pré-carrega as vizinhas ligadas por porta.
+        """
+        hall = self.map_manager.get_hall(r, c)
+        self.map_manager.pinned = {(r, c)}
+        self.map_manager.prefetch(r, c)
+        return hall
+
+    def initiate_transition(self, direction):
+        """
+        Configura os parâmetros iniciais para iniciar a transição entre salas.
+        """
+        # Calcula as coordenadas da sala destino com base na direção
+        target_r, target_c = self.current_r, self.current_c
+        if direction == "up":
+            target_r -= 1
+        elif direction == "down":
+            target_r += 1
+        elif direction == "left":
+            target_c -= 1
+        elif direction == "right":
+            target_c += 1
+
+        if not self.map_manager.has_room(target_r, target_c):
+            # Se não existir sala na direção desejada, não há transição
+            return
+
+        self.transition_active = True
+        self.transition_direction = direction
+        self.transition_progress = 0
+        self.prev_transition_progress = 0
+        self.target_room = self.map_manager.get_hall(target_r, target_c)
+        self.target_r, self.target_c = target_r, target_c
+        # As duas salas aparecem na tela durante o slide: nenhuma pode ser descartada
+        self.map_manager.pinned = {(self.current_r, self.current_c), (target_r, target_c)}
+        # A sala de destino já aparece no slide, com as peças onde devem estar agora
+        self._wake_room(self.target_room, target_r, target_c)
+
+    def finish_transition(self):
+        """
+        Conclui a transição, definindo a nova sala atual e reposicionando o jogador.
+        """
+        self.transition_active = False
+        self.transition_progress = 0
+        # A sala antiga adormece (as peças do jogador acompanham o herói)
+        self._deactivate_room(self.current_room)
+        # ... e quem persegue o herói sai atrás dele
+        self._release_pursuers(self.current_room, self.current_r, self.current_c, self.transition_direction)
+        self.current_r, self.current_c = self.target_r, self.target_c
+        self.current_room = self._enter_room(self.current_r, self.current_c)
+        self._activate_room(self.current_room)
+        self.contacts = set()
+        if self.pursuers:
+            # A busca até a nova sala é feita já, junto da troca de sala, e não num tick de jogo
+            self.room_graph.distances_to(self.current_r, self.current_c)
+
+        # Posiciona o active_piece na nova sala – um pouco distante da porta oposta àquela que foi usada,
+        # longe o bastante (tile da porta + meio sprite) para não encostar nela e voltar de sala
+        actor = self.active_piece.actor
+        gap_x = 64 + actor.width // 2 + 4
+        gap_y = 64 + actor.height // 2 + 4
+        if self.transition_direction == "up":
+            new_pos = (self.width // 2, self.height - gap_y)
+        elif self.transition_direction == "down":
+            new_pos = (self.width // 2, gap_y)
+        elif self.transition_direction == "left":
+            new_pos = (self.width - gap_x, self.height // 2)
+        else:
+            new_pos = (gap_x, self.height // 2)
+
+        actor.pos = new_pos
+        # Teletransporte: não interpola a partir da posição na sala antiga
+        for group in (self.active_pieces, self.pieces):
+            for piece in group:
+                piece.prev_pos = None
+        print(f"Transição concluída. Nova sala: room_{self.current_r}_{self.current_c}.")
+
+    # -----------------------------
+    # Perseguição entre salas
+    # -----------------------------
+    def _release_pursuers(self, hall, r, c, exit_side):
+        """As ChasingPiece da sala que o herói deixou saem da sala e passam a segui-lo."""
+        chasers = [piece for piece in hall.entities
+                   if isinstance(piece, ChasingPiece) and piece.active and piece not in self.fighting]
+        if not chasers:
+            return
+        hall.entities = [piece for piece in hall.entities if piece not in chasers]
+        for piece in chasers:
+            self.pursuers.append(Pursuer(piece, r, c, exit_side, self.time + ROOM_HOP_TIME))
+
+    def _advance_pursuers(self):
+        """
+        Cada perseguidor cuja vez chegou atravessa uma sala em direção ao herói
+        (uma leitura no RoomGraph) e, ao chegar à sala atual, entra pela porta.
+        """
+        now = self.time
+        current = (self.current_r, self.current_c)
+        arrived = []
+        for pursuer in self.pursuers:
+            if pursuer.next_move > now:
+                continue
+            if (pursuer.r, pursuer.c) != current:
+                direction = self.room_graph.next_hop(pursuer.r, pursuer.c, *current)
+                if direction is not None:
+                    dr, dc = DIRECTION_OFFSETS[direction]
+                    pursuer.r += dr
+                    pursuer.c += dc
+                    pursuer.side = OPPOSITE_SIDE[direction]
+            if (pursuer.r, pursuer.c) == current:
+                arrived.append(pursuer)
+            else:
+                pursuer.next_move = now + ROOM_HOP_TIME
+        if not arrived:
+            return
+        self.pursuers = [pursuer for pursuer in self.pursuers if pursuer not in arrived]
+        gap = 64 + 32   # Tile da porta + meio tile: a peça aparece logo depois da porta
+        entrances = {
+            "up": (self.width // 2, gap), "down": (self.width // 2, self.height - gap),
+            "left": (gap, self.height // 2), "right": (self.width - gap, self.height // 2),
+        }
+        for pursuer in arrived:
+            piece = pursuer.piece
+            piece.actor.pos = entrances[pursuer.side]
+            piece.prev_pos = None
+            self.add_piece(piece)
+
+    def _advance_transition(self, dt):
+        """Avança o slide de transição e conclui quando a sala inteira passou."""
+        self.prev_transition_progress = self.transition_progress
+        self.transition_progress += self.transition_speed * dt
+        total_distance = self.height if self.transition_direction in ("up", "down") else self.width
+        if self.transition_progress >= total_distance:
+            self.finish_transition()
+
+    def _check_doors(self):
+        """
+        Inicia a transição se o herói estiver na zona de ativação de uma porta
+        habilitada ou encostado em uma das portas da sala atual.
+        """
+        actor = self.active_piece.actor
+        doors = self.current_room.doors
+        if doors.get("up") and actor.y < DOOR_THRESHOLD:
+            self.initiate_transition("up")
+        elif doors.get("down") and actor.y > self.height - DOOR_THRESHOLD:
+            self.initiate_transition("down")
+        elif doors.get("left") and actor.x < DOOR_THRESHOLD:
+            self.initiate_transition("left")
+        elif doors.get("right") and actor.x > self.width - DOOR_THRESHOLD:
+            self.initiate_transition("right")
+        if self.transition_active:
+            return
+
+        # Só as portas nas células do hash espacial ao redor do herói são testadas
+        actor_rect = (actor.left, actor.top, actor.width, actor.height)
+        for door in self.current_room.spatial.query(actor_rect, "door"):
+            # A direção já está armazenada em door.direction
+            self.initiate_transition(door.direction)
+            break
+
+    def visible_pieces(self):
+        """
+        Peças que aparecem na tela: ativas, fora de luta (quem luta aparece na
+        animação da luta) e com o sprite ao menos em parte dentro da sala.
+        """
+        fighting = self.fighting
+        low_x, high_x = -VISIBLE_MARGIN, self.width + VISIBLE_MARGIN
+        low_y, high_y = -VISIBLE_MARGIN, self.height + VISIBLE_MARGIN
+        for group in (self.active_pieces, self.pieces):
+            for piece in group:
+                if not piece.active or piece in fighting:
+                    continue
+                x, y = piece.actor.pos
+                if low_x < x < high_x and low_y < y < high_y:
+                    yield piece
+
+    def board(self):
+        """
+        Posição da sala atual como bitboard (ver chess_moves.py): ataques,
+        alcance e "quem ataca esta peça". Montado na primeira consulta de cada
+        tick e reaproveitado pelas demais.
+        """
+        key = (self.ticks, self.current_room)
+        if self._board_key != key:
+            fighting = self.fighting
+            self._board = Board.from_hall(
+                self.current_room,
+                enemies=[piece for piece in self.pieces if piece.active and piece not in fighting],
+                friends=[piece for piece in self.active_pieces if piece.active and piece not in fighting],
+            )
+            self._board_key = key
+        return self._board
+
+    def _think(self):
+        """
+        Turno do modo tático: no tick k de cada ciclo de THINK_TICKS, a k-ésima
+        ThinkingPiece da sala, se estiver parada, escolhe um lance de xadrez e
+        começa a andar até o tile de destino.
+
+        Com o pool de decisões (ai_jobs), a busca roda fora do tick e a
+        resposta é aplicada num tick seguinte; até lá, ou se o prazo vencer,
+        a peça continua girando parada. Com orçamento em nós (partida
+        gravada) a busca roda sempre dentro do tick, para o resultado não
+        depender de quando a resposta chega.
+        """
+        fighting = self.fighting
+        jobs = self.ai_jobs if self.think_nodes is None else None
+        if jobs is not None:
+            for piece, goal in jobs.collect(self.ticks):
+                if (goal is not None and piece.goal is None and piece.active
+                        and piece not in fighting and piece in self.pieces):
+                    piece.move_to(goal)
+
+        slot = self.ticks % THINK_TICKS
+        thinkers = [piece for piece in self.pieces
+                    if isinstance(piece, ThinkingPiece) and piece.active and piece not in fighting]
+        if slot >= len(thinkers):
+            return
+        piece = thinkers[slot]
+        if piece.goal is not None or (jobs is not None and piece in jobs):
+            return
+        board = self.board()
+        origin = board.square(piece)
+        if origin is None:
+            return
+        position = Position.from_world(
+            board,
+            [other for other in self.pieces if other.active and other not in fighting],
+            [other for other in self.active_pieces if other.active and other not in fighting],
+        )
+        if self.think_nodes is not None:
+            request = ThinkRequest(position, origin, max_nodes=self.think_nodes)
+        else:
+            request = ThinkRequest(position, origin, budget=self.think_budget)
+        if jobs is not None:
+            jobs.post(piece, self.ticks, decide, request)
+            return
+        goal = decide(request)
+        if goal is not None:
+            piece.move_to(goal)
+
+    # -----------------------------
+    # Colisões entre peças
+    # -----------------------------
+    def _index_pieces(self):
+        """Atualiza a posição das peças no hash espacial da sala atual."""
+        spatial = self.current_room.spatial
+        for group in (self.active_pieces, self.pieces):
+            for piece in group:
+                if piece.active and piece not in self.fighting:
+                    spatial.move(piece, piece.footprint(), "piece")
+                else:
+                    spatial.remove(piece)
+
+    def _unindex_pieces(self, hall):
+        for group in (self.active_pieces, self.pieces):
+            for piece in group:
+                hall.spatial.remove(piece)
+
+    def touching(self, piece, layer="piece"):
+        """O que a peça está tocando na camada dada ("piece", "wall" ou "door")."""
+        spatial = self.current_room.spatial
+        if piece not in spatial:
+            return []
+        return spatial.touching(piece, layer)
+
+    def _check_contacts(self):
+        """Dispara on_contact para cada par de peças que acabou de se encostar."""
+        self._index_pieces()
+        contacts = self.current_room.spatial.contacts("piece")
+        new_contacts = contacts - self.contacts
+        self.contacts = contacts
+        if not new_contacts:
+            return
+        # Ordem fixa (a das listas de peças), não a do conjunto: uma peça que encosta em
+        # duas outras no mesmo tick luta sempre com a mesma, em qualquer execução
+        order = {piece: i for i, piece in enumerate(chain(self.active_pieces, self.pieces))}
+        rank = order.__getitem__
+        pairs = sorted((sorted(pair, key=rank) for pair in new_contacts), key=lambda pair: (rank(pair[0]), rank(pair[1])))
+        for a, b in pairs:
+            self.on_contact(a, b)
+
+    def on_contact(self, a, b):
+        """
+        Duas peças se encostaram. Se uma delas é controlada pelo jogador e a
+        outra não, começa uma luta (a peça do jogador é a vencedora).
+        """
+        if a in self.fighting or b in self.fighting:
+            return
+        a_is_player = isinstance(a, ActivePiece)
+        if a_is_player == isinstance(b, ActivePiece):
+            return
+        winner, loser = (a, b) if a_is_player else (b, a)
+        self.start_fight(winner, loser)
+
+    # -----------------------------
+    # Lutas
+    # -----------------------------
+    def start_fight(self, winner, loser):
+        """Começa uma luta entre duas peças e a registra no mundo."""
+        fight = Fight(winner, loser)
+        self.fights.append(fight)
+        self.fighting.update((winner, loser))
+        if self.patrols is not None:
+            # Quem luta fica parado: sai do lote de patrulha enquanto a luta durar
+            self.patrols.remove(winner)
+            self.patrols.remove(loser)
+        return fight
+
+    def _update_fights(self, dt):
+        for fight in self.fights:
+            fight.update(dt)
+        if any(not fight.active for fight in self.fights):
+            for fight in self.fights:
+                if not fight.active:
+                    self.fighting.difference_update((fight.winner, fight.loser))
+                    if (self.patrols is not None and fight.winner in self.pieces
+                            and isinstance(fight.winner, PATROL_TYPES)):
+                        self.patrols.add(fight.winner, NPC_SPEED)
+            self.fights = [fight for fight in self.fights if fight.active]
+            # Peças derrotadas (inativas) da sala atual saem do jogo; as de outras salas
+            # (luta que continuou depois que o herói saiu) saem quando a sala acordar
+            for piece in self.pieces:
+                if not piece.active:
+                    self.current_room.spatial.remove(piece)
+            self.pieces = [piece for piece in self.pieces if piece.active]
+
+    # -----------------------------
+    # Tick
+    # -----------------------------
+    def tick(self, controls=NO_INPUT, dt=TICK):
+        """
+        Avança o mundo em um tick de lógica.
+
+        :param controls: teclas pressionadas (Controls ou o 'keyboard' do PGZero).
+        :param dt: duração do tick em segundos.
+        """
+        self.ticks += 1
+        self.time += dt
+
+        if self.transition_active:
+            # Durante a transição só o slide anda
+            self._advance_transition(dt)
+            return
+
+        # Posições no início do tick: o desenho interpola a partir delas
+        for group in (self.active_pieces, self.pieces):
+            for piece in group:
+                piece.prev_pos = piece.actor.pos
+
+        phase = self.profiler.phase
+
+        with phase("input"):
+            if controls.tab and self.switch_delay <= 0:
+                self.active_piece_index = (self.active_piece_index + 1) % len(self.active_pieces)
+                self.active_piece = self.active_pieces[self.active_piece_index]
+                self.switch_delay = 0.3
+
+            if self.switch_delay > 0:
+                self.switch_delay -= dt
+
+        fighting = self.fighting
+        with phase("active_piece"):
+            if self.active_piece not in fighting:
+                self.active_piece.update_position(speed=PLAYER_SPEED * dt, controls=controls, dt=dt)
+
+        # Atualizações das peças controladas
+        with phase("idle"):
+            for piece in self.active_pieces:
+                if piece != self.active_piece and piece not in fighting:
+                    piece.update_idle(dt)
+
+        # Atualizações automáticas para as peças não controladas
+        with phase("npcs"):
+            patrols = self.patrols
+            if patrols is not None:
+                # Todas as patrulhas andam num único passo vetorizado
+                patrols.step(dt)
+                patrols.sync(dt)
+            if self.tactical:
+                self._think()
+            npc_step = NPC_SPEED * dt
+            # Quem persegue o herói usa um único campo de fluxo (em cache na sala)
+            target = self.active_piece.actor.pos
+            chase_flow = None
+            chase_ready = False
+            for piece in self.pieces:
+                if piece not in fighting:
+                    if isinstance(piece, ChasingPiece):
+                        if not chase_ready:
+                            chase_flow = self.current_room.navigation().flow_field(target)
+                            chase_ready = True
+                        piece.chase(chase_flow, target)
+                    if patrols is None or piece not in patrols:
+                        piece.update_position(speed=npc_step, dt=dt)
+                    piece.animate_sprite(dt)
+
+            if self.pursuers:
+                self._advance_pursuers()
+
+        with phase("fights"):
+            self._update_fights(dt)
+
+        # Peças que se encostaram podem começar uma luta
+        with phase("contacts"):
+            self._check_contacts()
+
+        # Verifica a chegada do active_piece às portas da sala atual
+        with phase("doors"):
+            self._check_doors()
+
+        with phase("animation"):
+            self.animation.advance(dt)
+            self.animation.apply(self.visible_pieces())
+
+    # -----------------------------
+    # Desenho
+    # -----------------------------
+    def draw(self, screen, alpha=1.0):
+        """
+        Desenha a sala (ou as duas salas durante a transição), as peças e as lutas.
+        'alpha' é a fração já decorrida do próximo tick (ver FixedStepLoop):
+        as peças e o slide são desenhados entre o estado anterior e o atual.
+        """
+        phase = self.profiler.phase
+        if self.transition_active:
+            with phase("room_draw"):
+                self._draw_transition(screen, alpha)
+            return
+
+        with phase("room_draw"):
+            self.current_room.draw(screen)
+
+        # Informações na tela
+        with phase("hud"):
+            text_cache.draw(screen, f"Ativo: {self.active_piece.kind} - TAB muda para outro - ESC para voltar",
+                            fontsize=30, color="yellow", center=(400, 50))
+
+        with phase("pieces_draw"):
+            # Desenha as peças ativas (quem está lutando aparece na animação da luta)
+            for piece in self.active_pieces:
+                if piece not in self.fighting:
+                    piece.draw(alpha)
+
+            # Desenha as peças não controladas
+            for piece in self.pieces:
+                if piece not in self.fighting:
+                    piece.draw(alpha)
+
+            # Desenha as lutas em andamento
+            for fight in self.fights:
+                fight.draw()
+
+    def _draw_transition(self, screen, alpha=1.0):
+        # Calcula os deslocamentos para o efeito de slide
+        previous = self.prev_transition_progress
+        progress = previous + (self.transition_progress - previous) * alpha
+        if self.transition_direction == "up":
+            current_offset = (0, progress)
+            target_offset = (0, progress - self.height)
+        elif self.transition_direction == "down":
+            current_offset = (0, -progress)
+            target_offset = (0, self.height - progress)
+        elif self.transition_direction == "left":
+            current_offset = (progress, 0)
+            target_offset = (progress - self.width, 0)
+        elif self.transition_direction == "right":
+            current_offset = (-progress, 0)
+            target_offset = (self.width - progress, 0)
+        else:
+            current_offset = (0, 0)
+            target_offset = (0, 0)
+
+        # Desenha as duas salas com seus respectivos offsets, cada uma com suas peças
+        for room, offset in ((self.current_room, current_offset), (self.target_room, target_offset)):
+            room.draw(screen, offset=offset)
+            for piece in room.entities:
+                if piece not in self.fighting:
+                    piece.draw(offset=offset)